@@ -0,0 +1,131 @@
+"""Aggregations computed in SQL so callers only receive result rows.
+
+Each function takes an open connection; DatabaseManager exposes them as
+habit_streaks(), financial_summary(), metric_trends() and
+rolling_metric_averages().
+"""
+
+# Gaps and islands: a running count of missed records numbers the runs, so
+# every completed record in a streak shares an island with the records since
+# the last miss. A trailing miss starts an island with no completed records,
+# which makes the current streak 0.
+HABIT_STREAKS_SQL = '''
+    WITH marked AS (
+        SELECT CASE WHEN completed THEN 1 ELSE 0 END AS done,
+               SUM(CASE WHEN completed THEN 0 ELSE 1 END)
+                   OVER (ORDER BY date, id ROWS UNBOUNDED PRECEDING) AS island
+        FROM habits
+        WHERE habit_name = ?
+    ),
+    islands AS (
+        SELECT island, COUNT(*) AS records, SUM(done) AS length
+        FROM marked
+        GROUP BY island
+    )
+    SELECT COALESCE(SUM(records), 0),
+           COALESCE(SUM(length), 0),
+           COALESCE(MAX(length), 0),
+           COALESCE((SELECT length FROM islands ORDER BY island DESC LIMIT 1), 0)
+    FROM islands
+'''
+
+FINANCIAL_SUMMARY_SQL = '''
+    SELECT month, month_key,
+           COALESCE(SUM(CASE WHEN type = 'income' THEN amount END), 0) AS total_income,
+           COALESCE(SUM(CASE WHEN type = 'expense' THEN amount END), 0) AS total_expenses,
+           COALESCE(SUM(CASE WHEN type = 'savings' THEN amount END), 0) AS total_savings
+    FROM financial_data
+    {where}
+    GROUP BY month, month_key
+    ORDER BY month_key, month
+'''
+
+# Averages of the newest `days` records against the `days` records before them
+METRIC_TRENDS_SQL = '''
+    WITH latest AS (
+        SELECT value, ROW_NUMBER() OVER (ORDER BY date DESC, id DESC) AS position
+        FROM metrics
+        WHERE metric_name = ?
+        ORDER BY date DESC, id DESC
+        LIMIT ?
+    )
+    SELECT AVG(CASE WHEN position <= ? THEN value END),
+           AVG(CASE WHEN position > ? THEN value END)
+    FROM latest
+'''
+
+# The window runs over the metric's whole history so the first rows of a
+# date range still average over the records just before it.
+ROLLING_METRIC_AVERAGES_SQL = '''
+    SELECT date, value, rolling_average
+    FROM (
+        SELECT date, id, value,
+               AVG(value) OVER (ORDER BY date, id ROWS BETWEEN ? PRECEDING AND CURRENT ROW)
+                   AS rolling_average
+        FROM metrics
+        WHERE metric_name = ?
+    )
+    WHERE (? IS NULL OR date >= ?) AND (? IS NULL OR date < ?)
+    ORDER BY date, id
+'''
+
+
+def habit_streaks(conn, habit_name):
+    total, completed, max_streak, current_streak = conn.execute(
+        HABIT_STREAKS_SQL, (habit_name,)
+    ).fetchone()
+    return {
+        'current_streak': current_streak,
+        'max_streak': max_streak,
+        'completion_rate': completed / total if total else 0
+    }
+
+
+def financial_summary(conn, month=None):
+    """Income, expense and savings totals per month, oldest month first."""
+    if month:
+        query, params = FINANCIAL_SUMMARY_SQL.format(where='WHERE month = ?'), (month,)
+    else:
+        query, params = FINANCIAL_SUMMARY_SQL.format(where=''), ()
+
+    summaries = []
+    for month, month_key, income, expenses, savings in conn.execute(query, params):
+        summaries.append({
+            'month': month,
+            'month_key': month_key,
+            'total_income': income,
+            'total_expenses': expenses,
+            'total_savings': savings,
+            'net_worth_change': income - expenses
+        })
+    return summaries
+
+
+def metric_trends(conn, metric_name, days=7):
+    recent_avg, previous_avg = conn.execute(
+        METRIC_TRENDS_SQL, (metric_name, days * 2, days, days)
+    ).fetchone()
+    # Both windows need at least one record to compare
+    if recent_avg is None or previous_avg is None:
+        return {'trend': 'insufficient_data', 'change': 0}
+
+    change = recent_avg - previous_avg
+    trend = 'improving' if change > 0 else 'declining' if change < 0 else 'stable'
+    return {
+        'trend': trend,
+        'change': change,
+        'recent_average': recent_avg,
+        'previous_average': previous_avg
+    }
+
+
+def rolling_metric_averages(conn, metric_name, window=7, start=None, end=None):
+    """Each record of metric_name with the mean of it and the window - 1 records before it."""
+    rows = conn.execute(
+        ROLLING_METRIC_AVERAGES_SQL,
+        (max(window - 1, 0), metric_name, start, start, end, end)
+    )
+    return [
+        {'date': date, 'value': value, 'rolling_average': average}
+        for date, value, average in rows
+    ]
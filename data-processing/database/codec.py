@@ -0,0 +1,233 @@
+"""Optional compression for the large markdown body columns.
+
+With a codec configured, DatabaseManager stores each body of at least
+threshold UTF-8 bytes as a BLOB of a magic prefix naming the codec followed
+by the compressed text; shorter bodies stay plain TEXT. Plain text never
+starts with a NUL byte, so a stored value is decoded only when it is a BLOB
+carrying a known prefix, and a database may freely mix compressed and plain
+rows (turning compression on or off needs no migration).
+
+Bodies are decompressed only when a query selects them: header-only listing
+queries never pay for it, getters decode the body column as rows are read,
+and SQL sees the text through the body_text() function registered on every
+DatabaseManager connection. The search index keeps bodies in their stored
+form and, while a codec is configured or compressed bodies remain, reads
+them through body_text() too (see database/search.py). Only then does any
+other connection that writes content, thoughts, projects or principles or
+runs a search, such as the sqlite3 shell, need to call register(conn) first;
+a database without compression works with stock SQLite.
+
+    python -m database.codec [--db PATH] [--codec zlib] [--threshold BYTES]
+
+benchmarks compressed against plain storage on a copy of the database.
+"""
+import argparse
+import shutil
+import sqlite3
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+from database import search
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# table -> body columns the codec applies to
+COMPRESSED_COLUMNS = {
+    'content': ('content',),
+    'thoughts': ('content',),
+    'projects': ('content',),
+    'events': ('content',),
+}
+BODY_COLUMN_NAMES = frozenset(column for columns in COMPRESSED_COLUMNS.values() for column in columns)
+
+# Every column holding a copy of a body, as stored, for the benchmark
+STORED_BODY_COLUMNS = {**COMPRESSED_COLUMNS, 'search_documents': ('body',)}
+
+DEFAULT_THRESHOLD = 1024
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 9
+
+# Every codec a stored value may carry, whether or not it can be used here
+MAGIC = {
+    'zlib': b'\x00zl1',
+    'zstd': b'\x00zs1',
+}
+MAGIC_LENGTH = 4
+
+# codec -> (compress, decompress) for the codecs available here
+CODECS = {
+    'zlib': (lambda data: zlib.compress(data, ZLIB_LEVEL), zlib.decompress),
+}
+if zstandard is not None:
+    CODECS['zstd'] = (
+        lambda data: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+    )
+
+_CODEC_BY_MAGIC = {magic: codec for codec, magic in MAGIC.items()}
+
+
+def check_codec(codec):
+    """Raise ValueError unless codec is None or usable here."""
+    if codec is None or codec in CODECS:
+        return
+    if codec in MAGIC:
+        raise ValueError(f"Compression codec {codec} needs the zstandard package")
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+
+def encode(text, codec, threshold=DEFAULT_THRESHOLD):
+    """The stored form of a body: compressed when it is long enough to be worth it."""
+    if codec is None or not isinstance(text, str):
+        return text
+    data = text.encode('utf-8')
+    if len(data) < threshold:
+        return text
+    compress, _ = CODECS[codec]
+    packed = MAGIC[codec] + compress(data)
+    # Incompressible text is kept as it is
+    return packed if len(packed) < len(data) else text
+
+
+def decode(value):
+    """The text of a stored body, whichever way it was stored."""
+    if not isinstance(value, bytes):
+        return value
+    codec = _CODEC_BY_MAGIC.get(value[:MAGIC_LENGTH])
+    if codec is None:
+        return value
+    if codec not in CODECS:
+        raise ValueError(f"Body is {codec}-compressed; install the zstandard package to read it")
+    _, decompress = CODECS[codec]
+    return decompress(value[MAGIC_LENGTH:]).decode('utf-8')
+
+
+def register(conn):
+    """Make body_text(value) available to SQL run on conn."""
+    conn.create_function('body_text', 1, decode, deterministic=True)
+
+
+def recompress(conn, codec, threshold=DEFAULT_THRESHOLD):
+    """Re-encode every stored body with codec (None stores them all as plain text).
+
+    Returns the number of rows rewritten.
+    """
+    check_codec(codec)
+    if codec is not None:
+        search.use_body_text(conn, True)
+    rewritten = 0
+    for table, columns in COMPRESSED_COLUMNS.items():
+        for column in columns:
+            updates = []
+            for row_id, value in conn.execute(f'SELECT id, {column} FROM {table}'):
+                stored = encode(decode(value), codec, threshold)
+                if stored != value:
+                    updates.append((stored, row_id))
+            # Only the stored form changes, so the triggers reindex the same text
+            conn.executemany(f'UPDATE {table} SET {column} = ? WHERE id = ?', updates)
+            rewritten += len(updates)
+    if codec is None:
+        search.use_body_text(conn, False)
+    return rewritten
+
+
+def _read_bodies(db_path, repeat):
+    """Seconds to read and decode every body, best of repeat runs."""
+    conn = sqlite3.connect(db_path)
+    register(conn)
+    best = None
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for table, columns in COMPRESSED_COLUMNS.items():
+                for column in columns:
+                    for (value,) in conn.execute(f'SELECT {column} FROM {table}'):
+                        decode(value)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        conn.close()
+    return best
+
+
+def _body_bytes(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return sum(
+            conn.execute(f'SELECT COALESCE(SUM(length(CAST({column} AS BLOB))), 0) FROM {table}').fetchone()[0]
+            for table, columns in STORED_BODY_COLUMNS.items() for column in columns
+        )
+    finally:
+        conn.close()
+
+
+def benchmark(db_path, codec, threshold=DEFAULT_THRESHOLD, repeat=5):
+    """Compare plain and compressed copies of the database at db_path.
+
+    Returns {'plain': {...}, codec: {...}} with the file size, stored body
+    bytes (search_documents included) and best read-and-decode time of all
+    bodies for each copy.
+    """
+    check_codec(codec)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, copy_codec in (('plain', None), (codec, codec)):
+            copy = Path(tmp) / f'{label}.db'
+            shutil.copyfile(db_path, copy)
+            conn = sqlite3.connect(copy)
+            register(conn)
+            try:
+                recompress(conn, copy_codec, threshold)
+                # Rewritten rows leave extra FTS segments behind; merge them
+                # and compact both copies so file sizes reflect what is stored
+                conn.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+                conn.commit()
+                conn.execute('VACUUM')
+            finally:
+                conn.close()
+            results[label] = {
+                'file_bytes': copy.stat().st_size,
+                'body_bytes': _body_bytes(copy),
+                'read_seconds': _read_bodies(copy, repeat),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark body compression on a copy of the database")
+    parser.add_argument("--db", help="Database path (defaults to config.yaml)")
+    parser.add_argument("--codec", default="zlib", choices=sorted(CODECS), help="Codec to compare against plain storage")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD, help="Smallest body in bytes to compress")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed read passes; the best one is reported")
+    args = parser.parse_args()
+
+    if args.db:
+        db_path = args.db
+    else:
+        from config import Config
+        db_path = Config().get_database_path()
+
+    if not Path(db_path).exists():
+        print(f"No database at {db_path}")
+        return
+
+    results = benchmark(db_path, args.codec, args.threshold, args.repeat)
+    plain = results['plain']
+    print(f"{'storage':<8} {'file KB':>10} {'bodies KB':>10} {'read ms':>9}")
+    for label, result in results.items():
+        print(f"{label:<8} {result['file_bytes'] / 1024:>10.1f} {result['body_bytes'] / 1024:>10.1f} "
+              f"{result['read_seconds'] * 1000:>9.2f}")
+    compressed = results[args.codec]
+    if plain['file_bytes']:
+        print(f"File size: {compressed['file_bytes'] / plain['file_bytes']:.0%} of plain")
+    if plain['body_bytes']:
+        print(f"Body bytes: {compressed['body_bytes'] / plain['body_bytes']:.0%} of plain")
+
+
+if __name__ == "__main__":
+    main()
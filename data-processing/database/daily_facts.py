@@ -0,0 +1,102 @@
+"""One row of facts per day, drawn from every day-keyed table.
+
+daily_facts holds, for each date with any data, the habit completion ratio,
+the mean of each metric, Anki review counts and time, and the number of
+thought captures. DatabaseManager refreshes only the days a write touched,
+after the rollups for those days, so a day or a range of days is a single
+primary-key read.
+"""
+import json
+from datetime import date, timedelta
+
+# Tables whose writes change daily facts, and the column holding each row's date
+SOURCES = {
+    'habits': 'date',
+    'metrics': 'date',
+    'anki_reviews': 'review_date',
+    'thoughts': 'timestamp',
+}
+
+COLUMNS = ('date', 'habits_total', 'habits_completed', 'habit_completion',
+           'metrics', 'reviews', 'review_time_ms', 'captures')
+
+# Habit, metric and review facts come from the day rollups; captures are
+# counted from thoughts, whose timestamp index covers the day's range.
+_REFRESH_SQL = '''
+    INSERT INTO daily_facts (date, habits_total, habits_completed, habit_completion,
+                             metrics, reviews, review_time_ms, captures)
+    SELECT :day, h.total, h.completed, CAST(h.completed AS REAL) / NULLIF(h.total, 0),
+           m.metrics, a.reviews, a.time_spent_ms, c.captures
+    FROM (SELECT SUM(records) AS total, SUM(completed) AS completed
+          FROM habit_rollups WHERE period = 'day' AND bucket = :day) AS h,
+         (SELECT json_group_object(name, mean) AS metrics
+          FROM metric_rollups WHERE period = 'day' AND bucket = :day) AS m,
+         (SELECT SUM(reviews) AS reviews, SUM(time_spent_ms) AS time_spent_ms
+          FROM anki_rollups WHERE period = 'day' AND bucket = :day) AS a,
+         (SELECT COUNT(*) AS captures
+          FROM thoughts WHERE timestamp >= :day AND timestamp < :next_day) AS c
+    WHERE h.total IS NOT NULL OR a.reviews IS NOT NULL OR c.captures > 0 OR m.metrics != '{}'
+'''
+
+
+def create_tables(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_facts (
+            date TEXT PRIMARY KEY,
+            habits_total INTEGER,
+            habits_completed INTEGER,
+            habit_completion REAL,
+            metrics TEXT,
+            reviews INTEGER,
+            review_time_ms INTEGER,
+            captures INTEGER
+        ) WITHOUT ROWID
+    ''')
+
+
+def refresh(conn, days):
+    """Recompute the facts of the given YYYY-MM-DD days.
+
+    Must run after the rollups of those days are current.
+    """
+    for day in sorted({day for day in days if day}):
+        next_day = (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+        conn.execute('DELETE FROM daily_facts WHERE date = ?', (day,))
+        conn.execute(_REFRESH_SQL, {'day': day, 'next_day': next_day})
+
+
+def rebuild(conn):
+    """Recompute every day from the rollups and thoughts."""
+    conn.execute('DELETE FROM daily_facts')
+    days = {bucket for (bucket,) in conn.execute(
+        "SELECT bucket FROM habit_rollups WHERE period = 'day' "
+        "UNION SELECT bucket FROM metric_rollups WHERE period = 'day' "
+        "UNION SELECT bucket FROM anki_rollups WHERE period = 'day'"
+    )}
+    for (timestamp,) in conn.execute('SELECT DISTINCT substr(timestamp, 1, 10) FROM thoughts'):
+        try:
+            days.add(date.fromisoformat(timestamp).isoformat())
+        except (TypeError, ValueError):
+            continue
+    refresh(conn, days)
+
+
+def range_query(start=None, end=None):
+    """SQL and params for the facts of days in [start, end), oldest first."""
+    where, params = [], []
+    if start is not None:
+        where.append('date >= ?')
+        params.append(start)
+    if end is not None:
+        where.append('date < ?')
+        params.append(end)
+    return f'''
+        SELECT * FROM daily_facts
+        {'WHERE ' + ' AND '.join(where) if where else ''}
+        ORDER BY date
+    ''', tuple(params)
+
+
+def parse(row):
+    row['metrics'] = json.loads(row['metrics']) if row['metrics'] else {}
+    return row
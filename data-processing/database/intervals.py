@@ -0,0 +1,163 @@
+"""Interval index over dated ranges: events and book reading periods.
+
+periods holds one row per dated range, and period_index is a one-dimensional
+integer R*Tree over its first and last day numbers, so overlap ("what
+happened this week") and stabbing ("what was going on on 2025-03-14")
+queries are logarithmic instead of scans. Triggers on the source tables keep
+both in step with every write. Ranges are whole days, inclusive at both ends.
+"""
+import heapq
+from datetime import date
+
+# kind -> (source table, condition, start expression, end expression, public expression, label expression).
+# {row} is "new" inside the triggers and the source table name when backfilling.
+INTERVAL_SOURCES = {
+    'event': (
+        'events', '1',
+        '{row}.start_date', 'COALESCE({row}.end_date, {row}.start_date)',
+        '{row}.public', '{row}.title',
+    ),
+    'book': (
+        'content', "{row}.type = 'book' AND json_valid({row}.metadata)",
+        "json_extract({row}.metadata, '$.reading_start')",
+        "COALESCE(json_extract({row}.metadata, '$.reading_end'), json_extract({row}.metadata, '$.reading_start'))",
+        '{row}.public', '{row}.title',
+    ),
+}
+
+_DAY = "CAST(julianday(date({value})) AS INTEGER)"
+
+
+def day_number(value):
+    """The day number period_index uses for a date or ISO datetime string."""
+    return date.fromisoformat(str(value)[:10]).toordinal() + 1721424
+
+
+def _period_statements(kind, row):
+    """SQL that adds the period of one source row, or of every row when row is the table."""
+    table, condition, start, end, public, label = [
+        part.format(row=row) for part in INTERVAL_SOURCES[kind]
+    ]
+    start_day, end_day = _DAY.format(value=start), _DAY.format(value=end)
+    source = f' FROM {table}' if row == table else ''
+    select_source = f"AND source_id = {row}.id" if row == 'new' else ''
+    return (
+        f'''INSERT INTO periods (kind, source_id, public, start_date, end_date, label, start_day, end_day)
+            SELECT '{kind}', {row}.id, CASE WHEN {public} THEN 1 ELSE 0 END,
+                   date(min({start_day}, {end_day}) + 0.5), date(max({start_day}, {end_day}) + 0.5), {label},
+                   min({start_day}, {end_day}), max({start_day}, {end_day}){source}
+            WHERE {condition} AND {start_day} IS NOT NULL AND {end_day} IS NOT NULL''',
+        f'''INSERT INTO period_index (id, start_day, end_day)
+            SELECT id, start_day, end_day FROM periods
+            WHERE kind = '{kind}' {select_source}''',
+    )
+
+
+def _remove_statements(kind, row):
+    return (
+        f"DELETE FROM period_index WHERE id IN (SELECT id FROM periods WHERE kind = '{kind}' AND source_id = {row}.id)",
+        f"DELETE FROM periods WHERE kind = '{kind}' AND source_id = {row}.id",
+    )
+
+
+def create_tables(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS periods (
+            id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            source_id TEXT NOT NULL,
+            public BOOLEAN,
+            start_date TEXT NOT NULL,
+            end_date TEXT NOT NULL,
+            label TEXT,
+            start_day INTEGER NOT NULL,
+            end_day INTEGER NOT NULL,
+            UNIQUE (kind, source_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS period_index USING rtree_i32(
+            id, start_day, end_day
+        )
+    ''')
+
+    # As with places, the insert trigger drops any earlier period first
+    # because INSERT OR REPLACE does not fire the delete trigger.
+    kinds_by_table = {}
+    for kind, (table, *_) in INTERVAL_SOURCES.items():
+        kinds_by_table.setdefault(table, []).append(kind)
+
+    for table, kinds in kinds_by_table.items():
+        remove_new = [sql for kind in kinds for sql in _remove_statements(kind, 'new')]
+        remove_old = [sql for kind in kinds for sql in _remove_statements(kind, 'old')]
+        add = [sql for kind in kinds for sql in _period_statements(kind, 'new')]
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_periods_ai AFTER INSERT ON {table} BEGIN
+                {';'.join(remove_new + add)};
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_periods_au AFTER UPDATE ON {table} BEGIN
+                {';'.join(remove_old + add)};
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_periods_ad AFTER DELETE ON {table} BEGIN
+                {';'.join(remove_old)};
+            END
+        ''')
+
+
+def rebuild(conn):
+    """Refill periods and the interval R*Tree from the source tables."""
+    conn.execute('DELETE FROM period_index')
+    conn.execute('DELETE FROM periods')
+    for kind, (table, *_) in INTERVAL_SOURCES.items():
+        for statement in _period_statements(kind, table):
+            conn.execute(statement)
+
+
+def overlap_query(start, end=None, kinds=None, include_private=False):
+    """SQL and params for the periods overlapping the days start..end (inclusive).
+
+    Without end this is a stabbing query for the single day start.
+    """
+    where = ['i.start_day <= ?', 'i.end_day >= ?']
+    params = [day_number(end or start), day_number(start)]
+    if kinds:
+        unknown = set(kinds) - set(INTERVAL_SOURCES)
+        if unknown:
+            raise ValueError(f"Unknown period kinds: {', '.join(sorted(unknown))}")
+        where.append(f"p.kind IN ({', '.join('?' * len(kinds))})")
+        params.extend(kinds)
+    if not include_private:
+        where.append('p.public = 1')
+    return f'''
+        SELECT p.kind, p.source_id AS id, p.start_date, p.end_date, p.label
+        FROM period_index i
+        JOIN periods p ON p.id = i.id
+        WHERE {' AND '.join(where)}
+        ORDER BY p.start_day, p.end_day, p.kind, p.source_id
+    ''', tuple(params)
+
+
+def annotate(days, periods):
+    """Pair each day with the periods covering it.
+
+    days must be ascending ISO dates and periods ordered by start date; both
+    are walked once, keeping the periods still open in a heap keyed on their
+    end date.
+    """
+    periods = iter(periods)
+    upcoming = next(periods, None)
+    active = []
+    counter = 0
+    for day in days:
+        while upcoming is not None and upcoming['start_date'] <= day:
+            heapq.heappush(active, (upcoming['end_date'], counter, upcoming))
+            counter += 1
+            upcoming = next(periods, None)
+        while active and active[0][0] < day:
+            heapq.heappop(active)
+        covering = sorted((entry[2] for entry in active), key=lambda period: (period['start_date'], period['id']))
+        yield day, covering
@@ -0,0 +1,135 @@
+"""File manifest for incremental builds.
+
+file_manifest records, per parser, every source it read on the last run: a
+file, or a folder whose files make up one entity (a book, a project). Each
+entry keeps the total size and newest mtime of the source's files and a hash
+of their content, and manifest_rows lists the (table, id) rows it emitted.
+
+A parser pass runs inside DatabaseManager.scan() and opens each source with
+DatabaseManager.source(). A source whose size and mtime match its entry, or
+whose content hash still does after a touch, is reported unchanged and not
+parsed again. A parsed source replaces its entry and the rows it no longer
+emits are deleted; sources the pass never opened count as removed and their
+rows go too. A row is only deleted once no source lists it.
+"""
+import hashlib
+import stat
+from pathlib import Path
+
+# incremental: skip unchanged sources; full: parse everything but keep the
+# manifest current; off: leave the manifest alone (partial, date-filtered runs)
+MANIFEST_MODES = ('incremental', 'full', 'off')
+DEFAULT_MODE = 'incremental'
+
+
+class Source:
+    """One source being parsed and the rows it emits."""
+
+    def __init__(self, path, files):
+        self.path = str(path)
+        self.files = files
+        self.unchanged = False
+        # (table, id) pairs emitted by the last parse, and by this one
+        self.previous = set()
+        self.rows = set()
+
+
+def create_tables(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS file_manifest (
+            parser TEXT NOT NULL,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            PRIMARY KEY (parser, path)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS manifest_rows (
+            parser TEXT NOT NULL,
+            path TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            row_id TEXT NOT NULL,
+            PRIMARY KEY (parser, path, table_name, row_id)
+        ) WITHOUT ROWID
+    ''')
+
+
+def signature(path_stat, file_stats):
+    """(total size, newest mtime_ns) of a source, from the stat results of its path and files.
+
+    A folder's own mtime counts too, so adding or removing a file shows.
+    """
+    stats = list(file_stats)
+    size = sum(file_stat.st_size for file_stat in stats)
+    if stat.S_ISDIR(path_stat.st_mode):
+        stats.append(path_stat)
+    return size, max((file_stat.st_mtime_ns for file_stat in stats), default=0)
+
+
+def content_hash(files):
+    digest = hashlib.sha1()
+    for file in files:
+        data = Path(file).read_bytes()
+        digest.update(f'{Path(file).name}\0{len(data)}\0'.encode('utf-8'))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def load(conn, parser):
+    """{path: (size, mtime_ns, content_hash)} for every source parser read last run."""
+    return {
+        path: (size, mtime_ns, stored_hash)
+        for path, size, mtime_ns, stored_hash in conn.execute(
+            'SELECT path, size, mtime_ns, content_hash FROM file_manifest WHERE parser = ?', (parser,)
+        )
+    }
+
+
+def rows_of(conn, parser, path):
+    return set(conn.execute(
+        'SELECT table_name, row_id FROM manifest_rows WHERE parser = ? AND path = ?', (parser, path)
+    ))
+
+
+def record(conn, parser, source, size, mtime_ns, source_hash):
+    """Replace the entry and emitted rows of a parsed source."""
+    conn.execute(
+        'INSERT OR REPLACE INTO file_manifest (parser, path, size, mtime_ns, content_hash) '
+        'VALUES (?, ?, ?, ?, ?)',
+        (parser, source.path, size, mtime_ns, source_hash)
+    )
+    conn.execute('DELETE FROM manifest_rows WHERE parser = ? AND path = ?', (parser, source.path))
+    conn.executemany(
+        'INSERT INTO manifest_rows (parser, path, table_name, row_id) VALUES (?, ?, ?, ?)',
+        [(parser, source.path, table, row_id) for table, row_id in source.rows]
+    )
+
+
+def touch(conn, parser, path, size, mtime_ns):
+    """Store a new size and mtime for a source whose content is unchanged."""
+    conn.execute(
+        'UPDATE file_manifest SET size = ?, mtime_ns = ? WHERE parser = ? AND path = ?',
+        (size, mtime_ns, parser, path)
+    )
+
+
+def forget(conn, parser, path):
+    """Drop a removed source's entry and return the rows it listed."""
+    rows = rows_of(conn, parser, path)
+    conn.execute('DELETE FROM file_manifest WHERE parser = ? AND path = ?', (parser, path))
+    conn.execute('DELETE FROM manifest_rows WHERE parser = ? AND path = ?', (parser, path))
+    return rows
+
+
+def orphans(conn, rows):
+    """{table: [id, ...]} for the given (table, id) rows no source lists any more."""
+    orphaned = {}
+    for table, row_id in sorted(rows):
+        listed = conn.execute(
+            'SELECT 1 FROM manifest_rows WHERE table_name = ? AND row_id = ? LIMIT 1', (table, row_id)
+        ).fetchone()
+        if listed is None:
+            orphaned.setdefault(table, []).append(row_id)
+    return orphaned
@@ -0,0 +1,151 @@
+"""Versioned schema migrations.
+
+Each file in migrations/ is named NNNN_description.py and defines
+upgrade(conn). The highest applied version is recorded in the
+schema_version table, so an existing database is brought up to date in
+place instead of being rebuilt from the vault.
+
+Run from data-processing/ to upgrade the configured database by hand:
+
+    python -m database.migrate            # apply pending migrations
+    python -m database.migrate --status   # list applied and pending ones
+"""
+import argparse
+import importlib.util
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from database import codec
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.py$')
+
+
+def load_migrations():
+    """Return (version, name, module) for every migration file, lowest version first."""
+    migrations = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.py")):
+        match = MIGRATION_FILE.match(path.name)
+        if not match:
+            continue
+        spec = importlib.util.spec_from_file_location(f"database.migrations.{path.stem}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        migrations.append((int(match.group(1)), match.group(2), module))
+
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration version in {MIGRATIONS_DIR}")
+    return migrations
+
+
+def latest_version():
+    return max((version for version, _, _ in load_migrations()), default=0)
+
+
+def column_names(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def add_column(conn, table, column, column_type):
+    """ALTER TABLE ... ADD COLUMN, skipped when the column already exists."""
+    if column not in column_names(conn, table):
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+
+
+def _ensure_version_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_date TEXT NOT NULL
+        )
+    ''')
+
+
+def current_version(conn):
+    _ensure_version_table(conn)
+    return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()[0]
+
+
+def _record(conn, version, name):
+    conn.execute(
+        'INSERT INTO schema_version (version, name, applied_date) VALUES (?, ?, ?)',
+        (version, name, datetime.now().isoformat())
+    )
+
+
+def stamp(conn):
+    """Mark every migration as applied, for a database created with the current schema."""
+    current = current_version(conn)
+    for version, name, _ in load_migrations():
+        if version > current:
+            _record(conn, version, name)
+    conn.commit()
+
+
+def migrate(conn, logger=None):
+    """Apply pending migrations in order, each in its own transaction.
+
+    A failing migration is rolled back and re-raised; the ones before it stay
+    applied, so the next run resumes from there. Returns the names applied.
+    """
+    conn.commit()
+    current = current_version(conn)
+    applied = []
+    for version, name, module in load_migrations():
+        if version <= current:
+            continue
+        conn.execute('BEGIN')
+        try:
+            module.upgrade(conn)
+            _record(conn, version, name)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(f"{version:04d}_{name}")
+        if logger:
+            logger.info(f"Applied migration {version:04d}_{name}")
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upgrade the website database schema")
+    parser.add_argument("--db", help="Database path (defaults to config.yaml)")
+    parser.add_argument("--status", action="store_true", help="Only list applied and pending migrations")
+    args = parser.parse_args()
+
+    if args.db:
+        db_path = args.db
+    else:
+        from config import Config
+        db_path = Config().get_database_path()
+
+    if not Path(db_path).exists():
+        print(f"No database at {db_path}; main.py creates it at the latest schema version")
+        return
+
+    conn = sqlite3.connect(db_path)
+    # Triggers and backfills read bodies through body_text()
+    codec.register(conn)
+    try:
+        current = current_version(conn)
+        if args.status:
+            for version, name, _ in load_migrations():
+                state = "applied" if version <= current else "pending"
+                print(f"{version:04d}_{name}: {state}")
+            return
+
+        applied = migrate(conn)
+        for name in applied:
+            print(f"Applied {name}")
+        print(f"Schema is at version {current_version(conn)}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Add projects.links for the external links shown on project pages."""
+from database.migrate import add_column
+
+
+def upgrade(conn):
+    add_column(conn, 'projects', 'links', 'TEXT')
@@ -0,0 +1,12 @@
+"""Add financial_data.month_key, a sortable "YYYY-MM" form of month, and backfill it."""
+from database.migrate import add_column
+from database.schema import _month_key
+
+
+def upgrade(conn):
+    add_column(conn, 'financial_data', 'month_key', 'TEXT')
+    rows = conn.execute('SELECT id, month FROM financial_data WHERE month_key IS NULL').fetchall()
+    conn.executemany(
+        'UPDATE financial_data SET month_key = ? WHERE id = ?',
+        [(_month_key(month), row_id) for row_id, month in rows]
+    )
@@ -0,0 +1,13 @@
+"""Add the content_hash column that hash-checked upserts compare against.
+
+Existing rows keep a NULL hash, so the next build rewrites each of them once.
+"""
+from database.migrate import add_column
+
+TABLES = ('content', 'habits', 'financial_data', 'metrics', 'communities',
+          'anki_reviews', 'thoughts', 'events', 'principles', 'projects')
+
+
+def upgrade(conn):
+    for table in TABLES:
+        add_column(conn, table, 'content_hash', 'TEXT')
@@ -0,0 +1,8 @@
+"""Fill the habit, metric and Anki rollup tables from the rows already stored."""
+from database import rollups
+
+
+def upgrade(conn):
+    rollups.create_tables(conn.cursor())
+    for table in rollups.ROLLUPS:
+        rollups.rebuild(conn, table)
@@ -0,0 +1,7 @@
+"""Index the content, thoughts, projects and principles already stored for full-text search."""
+from database import search
+
+
+def upgrade(conn):
+    search.create_tables(conn.cursor())
+    search.rebuild(conn)
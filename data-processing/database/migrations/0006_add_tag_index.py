@@ -0,0 +1,7 @@
+"""Link the tags of rows already stored into the normalized tags/entity_tags tables."""
+from database import tag_index
+
+
+def upgrade(conn):
+    tag_index.create_tables(conn.cursor())
+    tag_index.rebuild(conn)
@@ -0,0 +1,7 @@
+"""Fill the principle_closure table from the principles already stored."""
+from database import principle_tree
+
+
+def upgrade(conn):
+    principle_tree.create_tables(conn.cursor())
+    principle_tree.rebuild(conn)
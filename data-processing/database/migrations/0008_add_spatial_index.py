@@ -0,0 +1,7 @@
+"""Index the coordinates of events and thoughts already stored in the places R*Tree."""
+from database import spatial
+
+
+def upgrade(conn):
+    spatial.create_tables(conn.cursor())
+    spatial.rebuild(conn)
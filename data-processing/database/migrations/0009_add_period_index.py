@@ -0,0 +1,7 @@
+"""Index the date ranges of events and book reading periods already stored."""
+from database import intervals
+
+
+def upgrade(conn):
+    intervals.create_tables(conn.cursor())
+    intervals.rebuild(conn)
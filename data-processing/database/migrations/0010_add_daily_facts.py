@@ -0,0 +1,7 @@
+"""Fill daily_facts from the rollups and thoughts already stored."""
+from database import daily_facts
+
+
+def upgrade(conn):
+    daily_facts.create_tables(conn.cursor())
+    daily_facts.rebuild(conn)
@@ -0,0 +1,9 @@
+"""Read bodies through body_text() in the search triggers, so compressed bodies are indexed as text."""
+from database import search
+
+
+def upgrade(conn):
+    for table, _ in search.SEARCH_SOURCES.values():
+        conn.execute(f'DROP TRIGGER IF EXISTS {table}_search_ai')
+        conn.execute(f'DROP TRIGGER IF EXISTS {table}_search_au')
+    search.create_tables(conn.cursor())
@@ -0,0 +1,6 @@
+"""Add the file manifest; it starts empty, so the next build parses every source."""
+from database import manifest
+
+
+def upgrade(conn):
+    manifest.create_tables(conn.cursor())
@@ -0,0 +1,17 @@
+"""Keep search bodies in their stored form and index them through the search_text view.
+
+search_documents held a decoded copy of every body, undoing compression.
+The search tables are recreated in the new shape and refilled.
+"""
+from database import search
+
+
+def upgrade(conn):
+    for table, _ in search.SEARCH_SOURCES.values():
+        for suffix in ('ai', 'au', 'ad'):
+            conn.execute(f'DROP TRIGGER IF EXISTS {table}_search_{suffix}')
+    conn.execute('DROP TABLE IF EXISTS search_index')
+    conn.execute('DROP VIEW IF EXISTS search_text')
+    conn.execute('DROP TABLE IF EXISTS search_documents')
+    search.create_tables(conn.cursor(), decode=search.stores_compressed(conn))
+    search.rebuild(conn)
@@ -0,0 +1,118 @@
+"""Closure table for the principles hierarchy.
+
+principle_closure holds one row per (ancestor, descendant) pair, including
+each principle paired with itself at depth 0, so a subtree, an ancestor
+chain or a depth-limited slice is a single indexed query. A principle's id
+is derived from its parent id, so a stored principle never moves; the
+triggers below only have to link rows as they are inserted and unlink them
+as they are deleted.
+"""
+
+MAX_DEPTH = 64
+
+
+def create_tables(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS principle_closure (
+            ancestor_id TEXT NOT NULL,
+            descendant_id TEXT NOT NULL,
+            depth INTEGER NOT NULL,
+            PRIMARY KEY (ancestor_id, descendant_id)
+        )
+    ''')
+
+    # Link the new principle below its parent's ancestors, then hang any
+    # children stored before it (and their subtrees) below it and those
+    # ancestors. INSERT OR IGNORE keeps a re-inserted principle idempotent.
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS principles_closure_ai AFTER INSERT ON principles BEGIN
+            INSERT OR IGNORE INTO principle_closure (ancestor_id, descendant_id, depth)
+            VALUES (new.id, new.id, 0);
+            INSERT OR IGNORE INTO principle_closure (ancestor_id, descendant_id, depth)
+            SELECT ancestor_id, new.id, depth + 1
+            FROM principle_closure
+            WHERE descendant_id = new.parent_id;
+            INSERT OR IGNORE INTO principle_closure (ancestor_id, descendant_id, depth)
+            SELECT above.ancestor_id, below.descendant_id, above.depth + 1 + below.depth
+            FROM principle_closure above
+            JOIN principles child ON child.parent_id = new.id
+            JOIN principle_closure below ON below.ancestor_id = child.id
+            WHERE above.descendant_id = new.id;
+        END
+    ''')
+    # Every path through the deleted principle goes away
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS principles_closure_ad AFTER DELETE ON principles BEGIN
+            DELETE FROM principle_closure
+            WHERE ancestor_id IN (SELECT ancestor_id FROM principle_closure WHERE descendant_id = old.id)
+              AND descendant_id IN (SELECT descendant_id FROM principle_closure WHERE ancestor_id = old.id);
+        END
+    ''')
+
+
+def rebuild(conn):
+    """Recompute the closure table from principles.parent_id."""
+    conn.execute('DELETE FROM principle_closure')
+    conn.execute(f'''
+        WITH RECURSIVE walk (ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM principles
+            UNION ALL
+            SELECT walk.ancestor_id, p.id, walk.depth + 1
+            FROM walk
+            JOIN principles p ON p.parent_id = walk.descendant_id
+            WHERE walk.depth < {MAX_DEPTH}
+        )
+        INSERT OR IGNORE INTO principle_closure (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, descendant_id, depth FROM walk
+    ''')
+
+
+def subtree_query(principle_id=None, max_depth=None, include_root=True):
+    """SQL and params for a principle and its descendants, shallowest first.
+
+    Without principle_id, every tree whose root has no parent is returned.
+    depth is counted from the subtree root.
+    """
+    if principle_id is None:
+        where, params = ['r.parent_id IS NULL'], []
+    else:
+        where, params = ['r.id = ?'], [principle_id]
+    if max_depth is not None:
+        where.append('c.depth <= ?')
+        params.append(max_depth)
+    if not include_root:
+        where.append('c.depth > 0')
+    return f'''
+        SELECT p.*, c.depth
+        FROM principles r
+        JOIN principle_closure c ON c.ancestor_id = r.id
+        JOIN principles p ON p.id = c.descendant_id
+        WHERE {' AND '.join(where)}
+        ORDER BY c.depth, p.level, p.title
+    ''', tuple(params)
+
+
+def ancestors_query(principle_id):
+    """SQL and params for the ancestors of a principle, root first."""
+    return '''
+        SELECT p.*, c.depth
+        FROM principle_closure c
+        JOIN principles p ON p.id = c.ancestor_id
+        WHERE c.descendant_id = ? AND c.depth > 0
+        ORDER BY c.depth DESC
+    ''', (principle_id,)
+
+
+def nest(rows):
+    """Turn rows ordered shallowest first into nested dicts with a children list.
+
+    Rows whose parent is not among the rows become roots.
+    """
+    nodes = {}
+    roots = []
+    for row in rows:
+        node = {**row, 'children': []}
+        nodes[node['id']] = node
+        parent = nodes.get(node['parent_id'])
+        (parent['children'] if parent else roots).append(node)
+    return roots
@@ -0,0 +1,179 @@
+"""Typed records for the rows the parsers write and the getters read back.
+
+One NamedTuple per table, with fields in the table's insert column order
+(see TABLES in schema.py). A record is a plain tuple underneath, with no
+per-instance dict of repeated string keys, so DatabaseManager binds it to
+SQL position by position; only the JSON fields listed in JSON_FIELDS are
+encoded on the way in. A JSON field left as None is stored as its empty
+value. Fields a parser may omit have defaults; the rest are always set.
+"""
+from typing import Any, NamedTuple, Optional
+
+
+class Content(NamedTuple):
+    id: str
+    title: str
+    type: str
+    public: bool
+    created_date: str
+    last_edited_date: str
+    content: str
+    metadata: Optional[dict] = None
+
+
+class Habit(NamedTuple):
+    id: str
+    date: str
+    habit_name: str
+    completed: bool
+    duration: Optional[int] = None
+    notes: str = ''
+    created_date: Optional[str] = None
+
+
+class FinancialEntry(NamedTuple):
+    id: str
+    month: str
+    category: str
+    subcategory: str
+    amount: float
+    type: str
+    created_date: str
+    metadata: Optional[dict] = None
+
+
+class Metric(NamedTuple):
+    id: str
+    date: str
+    metric_type: str
+    metric_name: str
+    value: float
+    unit: str
+    metadata: Optional[dict] = None
+    created_date: Optional[str] = None
+
+
+class Community(NamedTuple):
+    id: str
+    community_name: str
+    description: str
+    personal_affiliation: Optional[float] = None
+    what_ive_done: str = ''
+    related_notes: Optional[list] = None
+    blog_posts: Optional[list] = None
+    media_links: Optional[list] = None
+    website_sections: Optional[list] = None
+    projects: Optional[list] = None
+    events_attended: Optional[list] = None
+    contribution_level: Optional[str] = None
+    created_date: Optional[str] = None
+    metadata: Optional[dict] = None
+
+
+class AnkiReview(NamedTuple):
+    id: str
+    card_id: str
+    deck_name: str = ''
+    note_content: str = ''
+    review_date: Optional[str] = None
+    ease_button: Optional[int] = None
+    interval_days: Optional[int] = None
+    previous_interval_days: Optional[int] = None
+    ease_factor: Optional[int] = None
+    time_spent_ms: Optional[int] = None
+    review_type: Optional[int] = None
+    created_date: Optional[str] = None
+    metadata: Optional[dict] = None
+
+
+class Thought(NamedTuple):
+    id: str
+    capture_id: Optional[str] = None
+    timestamp: Optional[str] = None
+    content: str = ''
+    modalities: Optional[list] = None
+    context: Optional[list] = None
+    sources: Optional[list] = None
+    tags: Optional[list] = None
+    location_latitude: Optional[float] = None
+    location_longitude: Optional[float] = None
+    location_city: Optional[str] = None
+    location_country: Optional[str] = None
+    location_timezone: Optional[str] = None
+    processing_status: Optional[str] = None
+    created_date: Optional[str] = None
+    last_edited_date: Optional[str] = None
+    metadata: Optional[dict] = None
+
+
+class Event(NamedTuple):
+    id: str
+    title: str
+    location: str
+    start_date: Any
+    end_date: Any
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    event_type: Optional[str] = None
+    tags: Optional[list] = None
+    public: bool = False
+    content: str = ''
+    created_date: Any = None
+    last_edited_date: Any = None
+    metadata: Optional[dict] = None
+
+
+class Principle(NamedTuple):
+    id: str
+    title: str
+    content: str
+    parent_id: Optional[str] = None
+    level: Optional[int] = None
+    created_date: Optional[str] = None
+    last_edited_date: Optional[str] = None
+
+
+class Project(NamedTuple):
+    id: str
+    title: str
+    description: str = ''
+    tags: Optional[list] = None
+    content: str = ''
+    public: bool = False
+    created_date: Optional[str] = None
+    last_edited_date: Optional[str] = None
+    status: str = 'active'
+    links: Optional[list] = None
+    metadata: Optional[dict] = None
+
+
+# table -> record type
+RECORDS = {
+    'content': Content,
+    'habits': Habit,
+    'financial_data': FinancialEntry,
+    'metrics': Metric,
+    'communities': Community,
+    'anki_reviews': AnkiReview,
+    'thoughts': Thought,
+    'events': Event,
+    'principles': Principle,
+    'projects': Project,
+}
+
+_LIST_FIELDS = {
+    'communities': ('related_notes', 'blog_posts', 'media_links', 'website_sections',
+                    'projects', 'events_attended'),
+    'thoughts': ('modalities', 'context', 'sources', 'tags'),
+    'events': ('tags',),
+    'projects': ('tags', 'links'),
+}
+
+# table -> {JSON field: value stored when the field is None}
+JSON_FIELDS = {
+    table: {
+        **{field: [] for field in _LIST_FIELDS.get(table, ())},
+        **({'metadata': {}} if 'metadata' in record_type._fields else {}),
+    }
+    for table, record_type in RECORDS.items()
+}
@@ -0,0 +1,131 @@
+"""Per-day, per-ISO-week and per-month aggregates of habits, metrics and Anki reviews.
+
+DatabaseManager keeps the rollup tables current: every write to a source
+table marks the days it touched, and refresh() recomputes only those days
+and the weeks and months containing them. Day rows are aggregated from the
+source table; week and month rows are combined from the day rows.
+"""
+from datetime import date, timedelta
+
+PERIODS = ('day', 'week', 'month')
+
+# source table -> (rollup table, date column, group column,
+#                  ((column, type, day expression, combine expression), ...))
+ROLLUPS = {
+    'habits': ('habit_rollups', 'date', 'habit_name', (
+        ('records', 'INTEGER', 'COUNT(*)', 'SUM(records)'),
+        ('completed', 'INTEGER', 'SUM(CASE WHEN completed THEN 1 ELSE 0 END)', 'SUM(completed)'),
+    )),
+    'metrics': ('metric_rollups', 'date', 'metric_name', (
+        ('samples', 'INTEGER', 'COUNT(value)', 'SUM(samples)'),
+        ('total', 'REAL', 'TOTAL(value)', 'TOTAL(total)'),
+        ('min_value', 'REAL', 'MIN(value)', 'MIN(min_value)'),
+        ('max_value', 'REAL', 'MAX(value)', 'MAX(max_value)'),
+        ('mean', 'REAL', 'AVG(value)', 'TOTAL(total) / NULLIF(SUM(samples), 0)'),
+    )),
+    'anki_reviews': ('anki_rollups', 'review_date', 'deck_name', (
+        ('reviews', 'INTEGER', 'COUNT(*)', 'SUM(reviews)'),
+        ('time_spent_ms', 'INTEGER', 'COALESCE(SUM(time_spent_ms), 0)', 'SUM(time_spent_ms)'),
+    )),
+}
+
+
+def create_tables(cursor):
+    for rollup, _, _, measures in ROLLUPS.values():
+        columns = ',\n'.join(f'                {name} {column_type}' for name, column_type, _, _ in measures)
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {rollup} (
+                period TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                name TEXT NOT NULL,
+{columns},
+                PRIMARY KEY (period, bucket, name)
+            )
+        ''')
+
+
+def day_of(value):
+    """The YYYY-MM-DD day of a date or ISO datetime string, or None if it is not one."""
+    try:
+        return date.fromisoformat(str(value)[:10]).isoformat()
+    except ValueError:
+        return None
+
+
+def _bounds(day, period):
+    """The bucket key of day in period and its half-open [start, end) day range."""
+    day = date.fromisoformat(day)
+    if period == 'day':
+        return day.isoformat(), day, day + timedelta(days=1)
+    if period == 'week':
+        year, week, weekday = day.isocalendar()
+        start = day - timedelta(days=weekday - 1)
+        return f'{year}-W{week:02d}', start, start + timedelta(days=7)
+    start = day.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start.strftime('%Y-%m'), start, end
+
+
+def refresh(conn, table, days):
+    """Recompute the rollup rows of table that cover any of days."""
+    rollup, date_column, group_column, measures = ROLLUPS[table]
+    columns = ', '.join(name for name, _, _, _ in measures)
+    day_expressions = ', '.join(expression for _, _, expression, _ in measures)
+    combine_expressions = ', '.join(expression for _, _, _, expression in measures)
+
+    buckets = {period: {} for period in PERIODS}
+    for day in {day for day in days if day}:
+        for period in PERIODS:
+            key, start, end = _bounds(day, period)
+            buckets[period][key] = (start.isoformat(), end.isoformat())
+
+    for period in PERIODS:
+        if period == 'day':
+            source, bucket_column, aggregates = table, date_column, day_expressions
+            group = f"COALESCE({group_column}, '')"
+            extra = ''
+        else:
+            source, bucket_column, aggregates = rollup, 'bucket', combine_expressions
+            group = 'name'
+            extra = " AND period = 'day'"
+
+        for key, (start, end) in buckets[period].items():
+            conn.execute(f'DELETE FROM {rollup} WHERE period = ? AND bucket = ?', (period, key))
+            conn.execute(f'''
+                INSERT INTO {rollup} (period, bucket, name, {columns})
+                SELECT ?, ?, {group}, {aggregates}
+                FROM {source}
+                WHERE {bucket_column} >= ? AND {bucket_column} < ?{extra}
+                GROUP BY {group}
+            ''', (period, key, start, end))
+
+
+def rebuild(conn, table):
+    """Recompute every rollup row of table from scratch."""
+    rollup, date_column, _, _ = ROLLUPS[table]
+    conn.execute(f'DELETE FROM {rollup}')
+    days = [day_of(value) for (value,) in conn.execute(f'SELECT DISTINCT substr({date_column}, 1, 10) FROM {table}')]
+    refresh(conn, table, days)
+
+
+def rollup_query(table, period, start=None, end=None, name=None):
+    """SQL and params for the rollup rows of table in period, oldest bucket first.
+
+    start and end bound the bucket key, so they take the period's key format
+    (2025-08-01, 2025-W31 or 2025-08).
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Unknown rollup period: {period}")
+    rollup = ROLLUPS[table][0]
+    where = ['period = ?']
+    params = [period]
+    if start is not None:
+        where.append('bucket >= ?')
+        params.append(start)
+    if end is not None:
+        where.append('bucket < ?')
+        params.append(end)
+    if name is not None:
+        where.append('name = ?')
+        params.append(name)
+    return f"SELECT * FROM {rollup} WHERE {' AND '.join(where)} ORDER BY bucket, name", tuple(params)
@@ -1,17 +1,864 @@
 import sqlite3
 import json
+import hashlib
+from contextlib import contextmanager
+from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 
+from database import (
+    analytics, codec, daily_facts, intervals, manifest, migrate, principle_tree, records, rollups,
+    search, spatial, tag_index,
+)
+
+DEFAULT_BATCH_SIZE = 500
+FETCH_SIZE = 500
+
+# "upsert" rewrites a row only when its content hash changed; "replace" is the
+# old INSERT OR REPLACE behaviour that rewrites every row on every run.
+WRITE_MODES = ('upsert', 'replace')
+DEFAULT_WRITE_MODE = 'upsert'
+
+# Left out of the content hash: parsers stamp created_date with the parse time
+# when a note has none, which would make every run look like a change.
+HASH_EXCLUDED_COLUMNS = ('created_date',)
+
+# Bookkeeping columns that getters do not return.
+INTERNAL_COLUMNS = ('content_hash',)
+
+# Large text columns that header (listing) queries leave out; list pages only
+# need titles, dates and metadata, and fetch a body by id when they show it.
+BODY_COLUMNS = {
+    'content': ('content',),
+    'projects': ('content',),
+}
+
+# Named connection profiles, picked per script in config.yaml's database section.
+# "bulk-build" trades durability of the last few transactions for write speed;
+# a crash can only lose work that the next build recreates anyway.
+# "export-read" opens the file read-only and memory-maps it for fast scans.
+PROFILES = {
+    'default': {
+        'read_only': False,
+        'pragmas': {},
+    },
+    'bulk-build': {
+        'read_only': False,
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -65536,
+            'temp_store': 'MEMORY',
+        },
+    },
+    'export-read': {
+        'read_only': True,
+        'pragmas': {
+            'mmap_size': 268435456,
+            'cache_size': -32768,
+            'temp_store': 'MEMORY',
+            'query_only': 'ON',
+        },
+    },
+}
+DEFAULT_PROFILE = 'default'
+
+
+def _month_key(month):
+    """Turn a budget month like "August 2025" into a sortable "2025-08"."""
+    for fmt in ('%B %Y', '%b %Y', '%Y-%m'):
+        try:
+            return datetime.strptime(str(month).strip(), fmt).strftime('%Y-%m')
+        except ValueError:
+            continue
+    return None
+
+
+def _as_is(record):
+    return record
+
+
+def _row_builder(table):
+    """Build the function that turns a record of table into its insert values.
+
+    Records are already in column order, so only the JSON fields are touched;
+    a record without any is bound as it is.
+    """
+    fields = records.RECORDS[table]._fields
+    encoded = tuple(
+        (fields.index(field), json.dumps(empty))
+        for field, empty in records.JSON_FIELDS[table].items()
+    )
+    if not encoded:
+        return _as_is
+
+    def build(record):
+        values = list(record)
+        for position, empty in encoded:
+            value = values[position]
+            values[position] = empty if value is None else json.dumps(value)
+        return values
+    return build
+
+
+def _financial_row(record, _build=_row_builder('financial_data')):
+    # month_key is derived from month rather than carried on the record
+    return (*_build(record), _month_key(record.month))
+
+
+# Insert column order and row builder for every table written by the parsers.
+# Parsers hand over records (database/records.py) whose fields follow this
+# column order, so whole batches can be bound straight to executemany.
+TABLES = {
+    'content': (
+        ('id', 'title', 'type', 'public', 'created_date', 'last_edited_date', 'content', 'metadata'),
+        _row_builder('content'),
+    ),
+    'habits': (
+        ('id', 'date', 'habit_name', 'completed', 'duration', 'notes', 'created_date'),
+        _row_builder('habits'),
+    ),
+    'financial_data': (
+        ('id', 'month', 'category', 'subcategory', 'amount', 'type', 'created_date', 'metadata',
+         'month_key'),
+        _financial_row,
+    ),
+    'metrics': (
+        ('id', 'date', 'metric_type', 'metric_name', 'value', 'unit', 'metadata', 'created_date'),
+        _row_builder('metrics'),
+    ),
+    'communities': (
+        ('id', 'community_name', 'description', 'personal_affiliation', 'what_ive_done',
+         'related_notes', 'blog_posts', 'media_links', 'website_sections', 'projects',
+         'events_attended', 'contribution_level', 'created_date', 'metadata'),
+        _row_builder('communities'),
+    ),
+    'anki_reviews': (
+        ('id', 'card_id', 'deck_name', 'note_content', 'review_date', 'ease_button',
+         'interval_days', 'previous_interval_days', 'ease_factor', 'time_spent_ms',
+         'review_type', 'created_date', 'metadata'),
+        _row_builder('anki_reviews'),
+    ),
+    'thoughts': (
+        ('id', 'capture_id', 'timestamp', 'content', 'modalities', 'context', 'sources', 'tags',
+         'location_latitude', 'location_longitude', 'location_city', 'location_country',
+         'location_timezone', 'processing_status', 'created_date', 'last_edited_date', 'metadata'),
+        _row_builder('thoughts'),
+    ),
+    'events': (
+        ('id', 'title', 'location', 'start_date', 'end_date', 'latitude', 'longitude',
+         'event_type', 'tags', 'public', 'content', 'created_date', 'last_edited_date', 'metadata'),
+        _row_builder('events'),
+    ),
+    'principles': (
+        ('id', 'title', 'content', 'parent_id', 'level', 'created_date', 'last_edited_date'),
+        _row_builder('principles'),
+    ),
+    'projects': (
+        ('id', 'title', 'description', 'tags', 'content', 'public', 'created_date',
+         'last_edited_date', 'status', 'links', 'metadata'),
+        _row_builder('projects'),
+    ),
+}
+
+HASH_POSITIONS = {
+    table: tuple(i for i, column in enumerate(columns) if column not in HASH_EXCLUDED_COLUMNS)
+    for table, (columns, _) in TABLES.items()
+}
+
+# Row positions the compression codec applies to (see database/codec.py)
+CODEC_POSITIONS = {
+    table: tuple(TABLES[table][0].index(column) for column in columns)
+    for table, columns in codec.COMPRESSED_COLUMNS.items()
+}
+
+REPLACE_SQL = {
+    table: 'INSERT OR REPLACE INTO {} ({}, content_hash) VALUES ({})'.format(
+        table, ', '.join(columns), ', '.join('?' * (len(columns) + 1))
+    )
+    for table, (columns, _) in TABLES.items()
+}
+
+UPSERT_SQL = {
+    table: (
+        'INSERT INTO {table} ({columns}, content_hash) VALUES ({placeholders}) '
+        'ON CONFLICT(id) DO UPDATE SET {updates}, content_hash = excluded.content_hash '
+        'WHERE {table}.content_hash IS NOT excluded.content_hash'
+    ).format(
+        table=table,
+        columns=', '.join(columns),
+        placeholders=', '.join('?' * (len(columns) + 1)),
+        updates=', '.join(f'{column} = excluded.{column}' for column in columns if column != 'id'),
+    )
+    for table, (columns, _) in TABLES.items()
+}
+
+
+# Secondary indexes for the getters' filters and sort orders. Partial indexes
+# cover the "public = 1" filters so private rows never enter the index.
+INDEXES = {
+    'idx_content_public': 'content(public)',
+    'idx_content_public_type': 'content(type) WHERE public = 1',
+    'idx_habits_date_id': 'habits(date, id)',
+    'idx_habits_date_desc': 'habits(date DESC)',
+    'idx_habits_name_date_id': 'habits(habit_name, date, id)',
+    'idx_financial_month_desc': 'financial_data(month DESC)',
+    'idx_financial_month_key_id': 'financial_data(month_key, id)',
+    'idx_metrics_date_id': 'metrics(date, id)',
+    'idx_metrics_date_desc': 'metrics(date DESC)',
+    'idx_metrics_type_date_id': 'metrics(metric_type, date, id)',
+    'idx_metrics_type_date_desc': 'metrics(metric_type, date DESC)',
+    'idx_metrics_name_date_id': 'metrics(metric_name, date, id)',
+    'idx_communities_affiliation': 'communities(personal_affiliation DESC, community_name)',
+    'idx_anki_reviews_date_id': 'anki_reviews(review_date, id)',
+    'idx_anki_reviews_date_desc': 'anki_reviews(review_date DESC)',
+    'idx_thoughts_timestamp_id': 'thoughts(timestamp, id)',
+    'idx_thoughts_timestamp_desc': 'thoughts(timestamp DESC)',
+    'idx_events_public_start_id': 'events(start_date, id) WHERE public = 1',
+    'idx_events_public_start_desc': 'events(start_date DESC) WHERE public = 1',
+    'idx_principles_level_title': 'principles(level, title)',
+    'idx_principles_parent': 'principles(parent_id)',
+    'idx_principle_closure_descendant': 'principle_closure(descendant_id, depth)',
+    'idx_projects_public_title': 'projects(title) WHERE public = 1',
+    'idx_entity_tags_entity': 'entity_tags(entity_type, entity_id)',
+    'idx_manifest_rows_row': 'manifest_rows(table_name, row_id)',
+}
+
+# Tables served by iter_range()/get_page(): the column rows are ordered and
+# range-filtered on, plus any filter that always applies. Pages are keyed on
+# (order column, id), which the matching *_id indexes cover.
+RANGE_TABLES = {
+    'habits': ('date', None),
+    'metrics': ('date', None),
+    'anki_reviews': ('review_date', None),
+    'thoughts': ('timestamp', None),
+    'events': ('start_date', 'public = 1'),
+    'financial_data': ('month_key', None),
+}
+
+
+def _header_columns(table):
+    return ', '.join(c for c in TABLES[table][0] if c not in BODY_COLUMNS[table])
+
+
+# Base queries behind the get_* methods, shared with check_query_plans() so the
+# plans that get verified are the ones that actually run.
+GETTER_QUERIES = {
+    # Content is listed in table (rowid) order, as it was before the partial
+    # type index existed, so export order does not depend on the chosen plan
+    'content': 'SELECT * FROM content WHERE public = 1 ORDER BY rowid',
+    'content_by_type': 'SELECT * FROM content WHERE type = ? AND public = 1 ORDER BY rowid',
+    'content_headers': f"SELECT {_header_columns('content')} FROM content WHERE public = 1 ORDER BY rowid",
+    'content_headers_by_type': (
+        f"SELECT {_header_columns('content')} FROM content WHERE type = ? AND public = 1 ORDER BY rowid"
+    ),
+    'content_body': 'SELECT content FROM content WHERE id = ? AND public = 1',
+    'content_bodies': 'SELECT id, content FROM content WHERE public = 1 ORDER BY rowid',
+    'content_bodies_by_type': 'SELECT id, content FROM content WHERE type = ? AND public = 1 ORDER BY rowid',
+    # Ties on the sort column keep table (rowid) order, as before the
+    # composite (column, id) indexes existed; the *_desc indexes serve both
+    'habits': 'SELECT * FROM habits ORDER BY date DESC, rowid',
+    'financial_data': 'SELECT * FROM financial_data ORDER BY month DESC, rowid',
+    'financial_data_by_month': 'SELECT * FROM financial_data WHERE month = ?',
+    'metrics': 'SELECT * FROM metrics ORDER BY date DESC, rowid',
+    'metrics_by_type': 'SELECT * FROM metrics WHERE metric_type = ? ORDER BY date DESC, rowid',
+    'communities': 'SELECT * FROM communities ORDER BY personal_affiliation DESC, community_name ASC',
+    'anki_reviews': 'SELECT * FROM anki_reviews ORDER BY review_date DESC, rowid',
+    'thoughts': 'SELECT * FROM thoughts ORDER BY timestamp DESC, rowid',
+    'events': 'SELECT * FROM events WHERE public = 1 ORDER BY start_date DESC, rowid',
+    'principles': 'SELECT * FROM principles ORDER BY level, title',
+    'projects': 'SELECT * FROM projects WHERE public = 1 ORDER BY title',
+    'project_headers': f"SELECT {_header_columns('projects')} FROM projects WHERE public = 1 ORDER BY title",
+    'project_body': 'SELECT content FROM projects WHERE id = ? AND public = 1',
+    'project_bodies': 'SELECT id, content FROM projects WHERE public = 1 ORDER BY title',
+}
+
 class DatabaseManager:
-    def __init__(self, db_path="database/website.db"):
+    def __init__(self, db_path="database/website.db", batch_size=DEFAULT_BATCH_SIZE,
+                 write_mode=DEFAULT_WRITE_MODE, profile=DEFAULT_PROFILE,
+                 compression=None, compression_threshold=codec.DEFAULT_THRESHOLD,
+                 manifest_mode=manifest.DEFAULT_MODE):
+        if write_mode not in WRITE_MODES:
+            raise ValueError(f"Unknown write mode: {write_mode}")
+        if manifest_mode not in manifest.MANIFEST_MODES:
+            raise ValueError(f"Unknown manifest mode: {manifest_mode}")
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown database profile: {profile}")
+        codec.check_codec(compression)
         self.db_path = db_path
-        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-        self.init_database()
+        self.profile = profile
+        self.batch_size = batch_size
+        self.write_mode = write_mode
+        # Codec for large body columns written from now on; None stores plain text
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        # table -> {'inserted': n, 'updated': n, 'unchanged': n, 'deleted': n}
+        self.write_stats = {}
+        self.manifest_mode = manifest_mode
+        # parser -> {'new': n, 'changed': n, 'unchanged': n, 'removed': n}
+        self.source_stats = {}
+        self._scan = None
+        self._vault_index = None
+        self._source = None
+        self._conn = None
+        self._session_depth = 0
+        self._pending_writes = 0
+        self._atomic = False
+        self._buffers = {}
+        # A read-only profile can neither create the file nor change its schema
+        if not PROFILES[profile]['read_only']:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self.init_database()
+
+    def _connect(self):
+        settings = PROFILES[self.profile]
+        if settings['read_only']:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True)
+        else:
+            conn = sqlite3.connect(self.db_path)
+        for pragma, value in settings['pragmas'].items():
+            conn.execute(f'PRAGMA {pragma} = {value}')
+        codec.register(conn)
+        return conn
+
+    @contextmanager
+    def session(self, atomic=False):
+        """Hold one connection open and group writes into batch_size transactions.
+
+        Sessions nest: inner sessions reuse the outer connection and only the
+        outermost one flushes buffered rows, commits and closes it. An atomic
+        outermost session writes everything in one transaction instead, so an
+        error leaves the database as it was before the session.
+        """
+        if self._conn is None:
+            self._conn = self._connect()
+            self._pending_writes = 0
+            self._atomic = atomic
+        self._session_depth += 1
+        try:
+            yield self
+            if self._session_depth == 1:
+                self.flush()
+        except BaseException:
+            if self._session_depth == 1:
+                self._buffers.clear()
+                self._conn.rollback()
+            raise
+        else:
+            if self._session_depth == 1:
+                self._conn.commit()
+        finally:
+            self._session_depth -= 1
+            if self._session_depth == 0:
+                self._conn.close()
+                self._conn = None
+                self._pending_writes = 0
+                self._atomic = False
+
+    def commit(self):
+        """Flush buffered rows and commit the current session, if any."""
+        if self._conn is not None:
+            self.flush()
+            self._conn.commit()
+            self._pending_writes = 0
+
+    @contextmanager
+    def _connection(self):
+        if self._conn is not None:
+            # Reads inside a session must see rows that are still buffered
+            self.flush()
+            yield self._conn
+            return
+
+        conn = self._connect()
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _count_writes(self, count):
+        self._pending_writes += count
+        if self._pending_writes >= self.batch_size and not self._atomic:
+            self._conn.commit()
+            self._pending_writes = 0
+
+    def _write(self, query, params=()):
+        if self._conn is None:
+            with self._connection() as conn:
+                conn.execute(query, params)
+            return
+
+        # Keep statement order: buffered inserts go in before this write
+        self.flush()
+        self._conn.execute(query, params)
+        self._count_writes(1)
+
+    def insert_many(self, table, rows):
+        """Write records (see database/records.py) to table in one batch.
+
+        Rows are classified and written according to the configured write mode.
+        """
+        if self._source is not None:
+            rows = list(rows)
+            self._source.rows.update((table, record[0]) for record in rows)
+        self._insert_many(table, rows)
+
+    def _insert_many(self, table, rows):
+        _, build_row = TABLES[table]
+        hash_positions = HASH_POSITIONS[table]
+        # Keyed by id so a repeated id keeps only its last row, as REPLACE would
+        params = {}
+        # The hash is taken before compression, so changing the codec alone
+        # does not make stored rows look changed
+        encode_positions = CODEC_POSITIONS.get(table, ()) if self.compression else ()
+        for record in rows:
+            values = build_row(record)
+            hashed = repr([values[i] for i in hash_positions]).encode('utf-8')
+            if encode_positions:
+                values = list(values)
+                for i in encode_positions:
+                    values[i] = codec.encode(values[i], self.compression, self.compression_threshold)
+            params[values[0]] = (*values, hashlib.sha1(hashed).hexdigest())
+        if not params:
+            return
+
+        if self._conn is None:
+            with self._connection() as conn:
+                self._write_rows(conn, table, params)
+            return
+
+        if self._buffers.get(table):
+            self.flush(table)
+        self._count_writes(self._write_rows(self._conn, table, params))
+
+    def _table_stats(self, table):
+        return self.write_stats.setdefault(
+            table, {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+        )
+
+    def _write_rows(self, conn, table, params):
+        """Classify hashed rows against the stored hashes and write them.
+
+        Returns the number of rows actually written.
+        """
+        date_column = daily_facts.SOURCES.get(table)
+        # Day-keyed tables also fetch the stored date, so an update that moves
+        # a row to another day refreshes the day it left
+        date_select = f', {date_column}' if date_column else ''
+        stored = {}
+        stored_dates = {}
+        ids = list(params)
+        for start in range(0, len(ids), FETCH_SIZE):
+            chunk = ids[start:start + FETCH_SIZE]
+            placeholders = ', '.join('?' * len(chunk))
+            for row_id, content_hash, *stored_date in conn.execute(
+                f'SELECT id, content_hash{date_select} FROM {table} WHERE id IN ({placeholders})', chunk
+            ):
+                stored[row_id] = content_hash
+                if stored_date:
+                    stored_dates[row_id] = stored_date[0]
+
+        stats = self._table_stats(table)
+        changed = []
+        for row_id, row in params.items():
+            if row_id not in stored:
+                stats['inserted'] += 1
+                changed.append(row)
+            elif stored[row_id] != row[-1]:
+                stats['updated'] += 1
+                changed.append(row)
+            else:
+                stats['unchanged'] += 1
+
+        if self.write_mode == 'replace':
+            conn.executemany(REPLACE_SQL[table], params.values())
+            written = len(params)
+        else:
+            if changed:
+                conn.executemany(UPSERT_SQL[table], changed)
+            written = len(changed)
+
+        if date_column and changed:
+            date_position = TABLES[table][0].index(date_column)
+            days = {rollups.day_of(row[date_position]) for row in changed}
+            days.update(rollups.day_of(stored_dates[row[0]]) for row in changed if row[0] in stored_dates)
+            self._refresh_days(conn, table, days)
+        return written
+
+    @staticmethod
+    def _refresh_days(conn, table, days):
+        """Bring the per-day rollups and daily facts up to date for the days a write touched."""
+        if table in rollups.ROLLUPS:
+            rollups.refresh(conn, table, days)
+        daily_facts.refresh(conn, days)
+
+    def delete_missing(self, table, keep_ids):
+        """Delete the rows of table whose id is not in keep_ids."""
+        return self._delete_by_ids(table, keep_ids, 'NOT IN')
+
+    def delete_rows(self, table, ids):
+        """Delete the rows of table whose id is in ids."""
+        return self._delete_by_ids(table, ids, 'IN')
+
+    def _delete_by_ids(self, table, ids, membership):
+        with self._connection() as conn:
+            conn.execute('CREATE TEMP TABLE IF NOT EXISTS keep_ids (id TEXT PRIMARY KEY)')
+            conn.execute('DELETE FROM temp.keep_ids')
+            conn.executemany(
+                'INSERT OR IGNORE INTO temp.keep_ids (id) VALUES (?)',
+                [(row_id,) for row_id in ids]
+            )
+            date_column = daily_facts.SOURCES.get(table)
+            if date_column:
+                days = [rollups.day_of(value) for (value,) in conn.execute(
+                    f'SELECT DISTINCT {date_column} FROM {table} '
+                    f'WHERE id {membership} (SELECT id FROM temp.keep_ids)'
+                )]
+            deleted = conn.execute(
+                f'DELETE FROM {table} WHERE id {membership} (SELECT id FROM temp.keep_ids)'
+            ).rowcount
+            conn.execute('DELETE FROM temp.keep_ids')
+            if deleted and date_column:
+                self._refresh_days(conn, table, days)
+
+        self._table_stats(table)['deleted'] += deleted
+        if self._conn is not None:
+            self._count_writes(deleted)
+        return deleted
+
+    def buffer_insert(self, table, record):
+        """Queue a record for table and insert the queue once it reaches batch_size.
+
+        Outside a session the row is written immediately.
+        """
+        if self._source is not None:
+            self._source.rows.add((table, record[0]))
+        if self._conn is None:
+            self._insert_many(table, [record])
+            return
+
+        buffer = self._buffers.setdefault(table, [])
+        buffer.append(record)
+        if len(buffer) >= self.batch_size:
+            self.flush(table)
+
+    def flush(self, table=None):
+        """Write buffered rows for table, or for every table when omitted."""
+        tables = [table] if table else list(self._buffers)
+        for name in tables:
+            rows = self._buffers.pop(name, None)
+            if rows:
+                self._insert_many(name, rows)
+
+    def _source_stats(self, parser):
+        return self.source_stats.setdefault(
+            parser, {'new': 0, 'changed': 0, 'unchanged': 0, 'removed': 0}
+        )
+
+    @contextmanager
+    def scan(self, parser, vault_index=None):
+        """A session for one parser's pass over its sources, tracked in the file manifest.
+
+        Sources opened with source() inside the scan are checked against what
+        parser read last run (see manifest.py). When the scan ends, sources it
+        never opened are dropped from the manifest, along with the rows no
+        other source emits. Sources are compared by the stat results in
+        vault_index, the parser's VaultIndex, when given.
+        """
+        with self.session():
+            if self.manifest_mode == 'off':
+                yield self
+                return
+
+            self._scan = (parser, manifest.load(self._conn, parser), set())
+            self._vault_index = vault_index
+            try:
+                yield self
+                _, stored, seen = self._scan
+                removed = sorted(set(stored) - seen)
+                if removed:
+                    self._source_stats(parser)['removed'] += len(removed)
+                    self._forget_sources(parser, removed)
+            finally:
+                self._scan = None
+                self._vault_index = None
+
+    @contextmanager
+    def source(self, path, files=None):
+        """Open one source of the current scan: a file, or a folder made of files.
+
+        Yields a manifest.Source whose unchanged flag tells the parser it can
+        skip the source. Records inserted while it is open are the rows it
+        emits; on a clean exit they replace its manifest entry and the rows it
+        emitted last run but not this time are deleted. A source that raises
+        keeps its old entry, so the next run parses it again.
+        """
+        source = manifest.Source(path, list(files) if files is not None else [path])
+        if self._scan is None:
+            yield source
+            return
+
+        parser, stored, seen = self._scan
+        seen.add(source.path)
+        size, mtime_ns = self._signature(path, source.files)
+        entry = stored.get(source.path)
+        source_hash = None
+        if entry is not None and self.manifest_mode == 'incremental':
+            if entry[:2] == (size, mtime_ns):
+                source.unchanged = True
+            else:
+                source_hash = manifest.content_hash(source.files)
+                if source_hash == entry[2]:
+                    source.unchanged = True
+                    self._touch_source(parser, source.path, size, mtime_ns)
+
+        source.previous = manifest.rows_of(self._conn, parser, source.path)
+        if source.unchanged:
+            self._source_stats(parser)['unchanged'] += 1
+            yield source
+            return
+
+        if source_hash is None:
+            source_hash = manifest.content_hash(source.files)
+        self._source = source
+        try:
+            yield source
+        finally:
+            self._source = None
+
+        if entry is None:
+            status = 'new'
+        else:
+            status = 'changed' if source_hash != entry[2] else 'unchanged'
+        self._source_stats(parser)[status] += 1
+        self._record_source(parser, source, size, mtime_ns, source_hash)
+
+    def source_unchanged(self, path, files=None):
+        """Whether a source of the current scan still matches its entry by size and mtime.
+
+        A cheap look-ahead for parsers that load files before opening them
+        with source(), which stays the authority: a touched file with the
+        same content only shows as unchanged there.
+        """
+        if self._scan is None or self.manifest_mode != 'incremental':
+            return False
+        entry = self._scan[1].get(str(path))
+        if entry is None:
+            return False
+        return entry[:2] == self._signature(path, list(files) if files is not None else [path])
+
+    def _signature(self, path, files):
+        return manifest.signature(self._stat(path), [self._stat(file) for file in files])
+
+    def _stat(self, path):
+        # The scan's VaultIndex already statted every file it listed
+        entry = self._vault_index.entry(path) if self._vault_index is not None else None
+        return entry.stat if entry is not None else Path(path).stat()
+
+    # The manifest writes behind scan() and source(), kept apart from the
+    # decisions so a QueuedDatabaseManager can hand them to the writer
+    def _touch_source(self, parser, path, size, mtime_ns):
+        manifest.touch(self._conn, parser, path, size, mtime_ns)
+
+    def _record_source(self, parser, source, size, mtime_ns, source_hash):
+        manifest.record(self._conn, parser, source, size, mtime_ns, source_hash)
+        for table, ids in manifest.orphans(self._conn, source.previous - source.rows).items():
+            self.delete_rows(table, ids)
+
+    def _forget_sources(self, parser, paths):
+        removed = set()
+        for path in paths:
+            removed |= manifest.forget(self._conn, parser, path)
+        for table, ids in manifest.orphans(self._conn, removed).items():
+            self.delete_rows(table, ids)
+    
+    @staticmethod
+    def _limited(query, params, limit):
+        if limit:
+            return f'{query} LIMIT ?', (*params, limit)
+        return query, params
+
+    def _iter_query(self, query, params=(), chunk_size=FETCH_SIZE):
+        """Yield result rows as dicts, reading chunk_size rows at a time."""
+        with self._connection() as conn:
+            cursor = conn.execute(query, params)
+            columns = tuple(col[0] for col in cursor.description)
+            visible = [i for i, column in enumerate(columns) if column not in INTERNAL_COLUMNS]
+            pick = None
+            if len(visible) < len(columns):
+                columns = tuple(columns[i] for i in visible)
+                pick = itemgetter(*visible) if len(visible) > 1 else (lambda row: (row[visible[0]],))
+            # Only selected body columns can hold compressed values
+            bodies = [column for column in columns if column in codec.BODY_COLUMN_NAMES]
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    row = dict(zip(columns, pick(row) if pick else row))
+                    for column in bodies:
+                        if type(row[column]) is bytes:
+                            row[column] = codec.decode(row[column])
+                    yield row
+
+    def iter_records(self, table, limit=None, parse_json=True):
+        """Yield the rows of a table's getter query as its record type (see records.py).
+
+        Each record is made straight from the fetched tuple, with no per-row
+        dict. With parse_json=False the JSON fields keep their stored strings,
+        which is how the static export writes them.
+        """
+        record_type = records.RECORDS[table]
+        fields = record_type._fields
+        query = GETTER_QUERIES[table].replace('SELECT *', f"SELECT {', '.join(fields)}", 1)
+        bodies = [i for i, field in enumerate(fields) if field in codec.COMPRESSED_COLUMNS.get(table, ())]
+        json_fields = [i for i, field in enumerate(fields) if field in records.JSON_FIELDS[table]] if parse_json else []
+        make = record_type._make
+        with self._connection() as conn:
+            cursor = conn.execute(*self._limited(query, (), limit))
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    if bodies or json_fields:
+                        row = list(row)
+                        for i in bodies:
+                            if type(row[i]) is bytes:
+                                row[i] = codec.decode(row[i])
+                        for i in json_fields:
+                            if row[i] is not None:
+                                row[i] = json.loads(row[i])
+                    yield make(row)
+
+    def count(self, query_name, params=()):
+        """Count the rows a GETTER_QUERIES entry returns without fetching them."""
+        with self._connection() as conn:
+            query = f'SELECT COUNT(*) FROM ({GETTER_QUERIES[query_name]})'
+            return conn.execute(query, params).fetchone()[0]
+    
+    def _range_query(self, table, start, end, after, limit, columns, descending, **filters):
+        order_column, condition = RANGE_TABLES[table]
+        table_columns = TABLES[table][0]
+
+        if columns:
+            unknown = set(columns) - set(table_columns)
+            if unknown:
+                raise ValueError(f"Unknown columns for {table}: {', '.join(sorted(unknown))}")
+            # The page cursor needs the order column and id in every row
+            selected = list(dict.fromkeys([*columns, order_column, 'id']))
+        else:
+            selected = ['*']
+
+        where = [condition] if condition else []
+        params = []
+        for column, value in filters.items():
+            if column not in table_columns:
+                raise ValueError(f"Unknown filter column for {table}: {column}")
+            where.append(f'{column} = ?')
+            params.append(value)
+
+        # A cursor already lies inside the range, so it replaces the bound on
+        # its side and the page starts right after it in index order.
+        if start is not None and not (after and not descending):
+            where.append(f'{order_column} >= ?')
+            params.append(start)
+        if end is not None and not (after and descending):
+            where.append(f'{order_column} < ?')
+            params.append(end)
+        if after:
+            where.append(f"({order_column}, id) {'<' if descending else '>'} (?, ?)")
+            params.extend(after)
+
+        direction = 'DESC' if descending else 'ASC'
+        query = f"SELECT {', '.join(selected)} FROM {table}"
+        if where:
+            query += ' WHERE ' + ' AND '.join(where)
+        query += f' ORDER BY {order_column} {direction}, id {direction}'
+        return self._limited(query, tuple(params), limit)
+
+    def iter_range(self, table, start=None, end=None, after=None, limit=None,
+                   columns=None, descending=True, **filters):
+        """Yield rows of a time-ordered table (see RANGE_TABLES).
+
+        start/end bound the order column as a half-open range [start, end).
+        after is the (order value, id) of the last row of the previous page;
+        keyword filters are equality matches, e.g. metric_type='physiological'.
+        columns limits the projection (the order column and id are always kept).
+        """
+        query, params = self._range_query(
+            table, start, end, after, limit, columns, descending, **filters
+        )
+        return self._iter_query(query, params)
+
+    def get_page(self, table, page_size=100, **kwargs):
+        """Fetch one page from iter_range plus the cursor for the next page.
+
+        Returns {'rows': [...], 'next_after': (order value, id) or None}.
+        """
+        rows = list(self.iter_range(table, limit=page_size, **kwargs))
+        order_column = RANGE_TABLES[table][0]
+        next_after = None
+        if len(rows) == page_size:
+            next_after = (rows[-1][order_column], rows[-1]['id'])
+        return {'rows': rows, 'next_after': next_after}
     
     def init_database(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            fresh = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'content'"
+            ).fetchone() is None
+            self._create_tables(cursor)
+            # A new file already has every column, so it starts at the latest
+            # version; an older one is upgraded in place
+            if fresh:
+                migrate.stamp(conn)
+            else:
+                migrate.migrate(conn)
+            # Search reads bodies through body_text() only when some may be compressed
+            search.use_body_text(conn, self.compression is not None or search.stores_compressed(conn))
+            self._create_indexes(cursor)
+
+    def _create_indexes(self, cursor):
+        # Drop managed indexes that are no longer part of INDEXES
+        existing = [row[0] for row in cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx\\_%' ESCAPE '\\'"
+        )]
+        for name in existing:
+            if name not in INDEXES:
+                cursor.execute(f'DROP INDEX IF EXISTS {name}')
+
+        for name, definition in INDEXES.items():
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {definition}')
+
+    def check_query_plans(self):
+        """Run EXPLAIN QUERY PLAN for every getter query.
+
+        Returns a dict of query name -> plan details for queries that fall back
+        to a full table scan or a temporary B-tree sort; empty means all good.
+        """
+        queries = dict(GETTER_QUERIES)
+        for table in RANGE_TABLES:
+            query, _ = self._range_query(
+                table, start='', end=None, after=('', ''), limit=1, columns=None, descending=True
+            )
+            queries[f'{table}_page'] = query
+
+        problems = {}
+        with self._connection() as conn:
+            for name, query in queries.items():
+                params = [None] * query.count('?')
+                details = [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {query}', params)]
+                full_scan = any(d.startswith('SCAN ') and ' USING ' not in d for d in details)
+                temp_sort = any('USE TEMP B-TREE' in d for d in details)
+                if full_scan or temp_sort:
+                    problems[name] = details
+        return problems
+
+    def _create_tables(self, cursor):
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS content (
                 id TEXT PRIMARY KEY,
@@ -21,7 +868,8 @@ class DatabaseManager:
                 created_date TEXT,
                 last_edited_date TEXT,
                 content TEXT,
-                metadata TEXT
+                metadata TEXT,
+                content_hash TEXT
             )
         ''')
         
@@ -33,7 +881,8 @@ class DatabaseManager:
                 completed BOOLEAN,
                 duration INTEGER,
                 notes TEXT,
-                created_date TEXT
+                created_date TEXT,
+                content_hash TEXT
             )
         ''')
         
@@ -46,7 +895,9 @@ class DatabaseManager:
                 amount REAL,
                 type TEXT,
                 created_date TEXT,
-                metadata TEXT
+                metadata TEXT,
+                month_key TEXT,
+                content_hash TEXT
             )
         ''')
         
@@ -59,7 +910,8 @@ class DatabaseManager:
                 value REAL,
                 unit TEXT,
                 metadata TEXT,
-                created_date TEXT
+                created_date TEXT,
+                content_hash TEXT
             )
         ''')
         
@@ -78,7 +930,8 @@ class DatabaseManager:
                 events_attended TEXT,
                 contribution_level TEXT,
                 created_date TEXT,
-                metadata TEXT
+                metadata TEXT,
+                content_hash TEXT
             )
         ''')
         
@@ -96,7 +949,8 @@ class DatabaseManager:
                 time_spent_ms INTEGER,
                 review_type INTEGER,
                 created_date TEXT,
-                metadata TEXT
+                metadata TEXT,
+                content_hash TEXT
             )
         ''')
         
@@ -118,7 +972,8 @@ class DatabaseManager:
                 processing_status TEXT,
                 created_date TEXT,
                 last_edited_date TEXT,
-                metadata TEXT
+                metadata TEXT,
+                content_hash TEXT
             )
         ''')
         
@@ -137,7 +992,8 @@ class DatabaseManager:
                 content TEXT,
                 created_date TEXT,
                 last_edited_date TEXT,
-                metadata TEXT
+                metadata TEXT,
+                content_hash TEXT
             )
         ''')
 
@@ -149,7 +1005,8 @@ class DatabaseManager:
                 parent_id TEXT,
                 level INTEGER,
                 created_date TEXT,
-                last_edited_date TEXT
+                last_edited_date TEXT,
+                content_hash TEXT
             )
         ''')
 
@@ -165,399 +1022,339 @@ class DatabaseManager:
                 last_edited_date TEXT,
                 status TEXT,
                 links TEXT,
-                metadata TEXT
+                metadata TEXT,
+                content_hash TEXT
             )
         ''')
-        
-        conn.commit()
-        conn.close()
+
+        rollups.create_tables(cursor)
+        search.create_tables(cursor)
+        tag_index.create_tables(cursor)
+        principle_tree.create_tables(cursor)
+        spatial.create_tables(cursor)
+        intervals.create_tables(cursor)
+        daily_facts.create_tables(cursor)
+        manifest.create_tables(cursor)
     
-    def insert_content(self, data):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO content 
-            (id, title, type, public, created_date, last_edited_date, content, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['id'],
-            data['title'],
-            data['type'],
-            data['public'],
-            data['created_date'],
-            data['last_edited_date'],
-            data['content'],
-            json.dumps(data.get('metadata', {}))
-        ))
-        
-        conn.commit()
-        conn.close()
+    def insert_content(self, record):
+        self.insert_many('content', [record])
     
-    def insert_habit(self, data):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO habits 
-            (id, date, habit_name, completed, duration, notes, created_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['id'],
-            data['date'],
-            data['habit_name'],
-            data['completed'],
-            data.get('duration'),
-            data.get('notes', ''),
-            data['created_date']
-        ))
-        
-        conn.commit()
-        conn.close()
+    def insert_habit(self, record):
+        self.insert_many('habits', [record])
     
-    def insert_financial_data(self, data):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO financial_data 
-            (id, month, category, subcategory, amount, type, created_date, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['id'],
-            data['month'],
-            data['category'],
-            data['subcategory'],
-            data['amount'],
-            data['type'],
-            data['created_date'],
-            json.dumps(data.get('metadata', {}))
-        ))
-        
-        conn.commit()
-        conn.close()
+    def insert_financial_data(self, record):
+        self.insert_many('financial_data', [record])
     
-    def insert_metric(self, data):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO metrics 
-            (id, date, metric_type, metric_name, value, unit, metadata, created_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['id'],
-            data['date'],
-            data['metric_type'],
-            data['metric_name'],
-            data['value'],
-            data['unit'],
-            json.dumps(data.get('metadata', {})),
-            data['created_date']
-        ))
-        
-        conn.commit()
-        conn.close()
+    def insert_metric(self, record):
+        self.insert_many('metrics', [record])
     
-    def clear_principles(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM principles')
-        conn.commit()
-        conn.close()
-
-    def insert_principle(self, data):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO principles 
-            (id, title, content, parent_id, level, created_date, last_edited_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['id'],
-            data['title'],
-            data['content'],
-            data.get('parent_id'),
-            data['level'],
-            data['created_date'],
-            data['last_edited_date']
-        ))
-        
-        conn.commit()
-        conn.close()
+    def insert_principle(self, record):
+        self.insert_many('principles', [record])
+
+    def iter_content(self, content_type=None):
+        if content_type:
+            return self._iter_query(GETTER_QUERIES['content_by_type'], (content_type,))
+        return self._iter_query(GETTER_QUERIES['content'])
 
     def get_content(self, content_type=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        return list(self.iter_content(content_type))
+
+    def iter_content_headers(self, content_type=None):
+        """Like iter_content, without the body column (see BODY_COLUMNS)."""
         if content_type:
-            cursor.execute('SELECT * FROM content WHERE type = ? AND public = 1', (content_type,))
+            return self._iter_query(GETTER_QUERIES['content_headers_by_type'], (content_type,))
+        return self._iter_query(GETTER_QUERIES['content_headers'])
+
+    def get_content_headers(self, content_type=None):
+        return list(self.iter_content_headers(content_type))
+
+    def get_content_body(self, content_id):
+        """The body of one public content entry, or None."""
+        return self._fetch_body(GETTER_QUERIES['content_body'], content_id)
+
+    def iter_content_bodies(self, content_type=None):
+        """Yield (id, body) for the entries iter_content_headers lists."""
+        if content_type:
+            query, params = GETTER_QUERIES['content_bodies_by_type'], (content_type,)
         else:
-            cursor.execute('SELECT * FROM content WHERE public = 1')
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        return [dict(zip([col[0] for col in cursor.description], row)) for row in results]
-    
+            query, params = GETTER_QUERIES['content_bodies'], ()
+        for row in self._iter_query(query, params):
+            yield row['id'], row['content']
+
+    def _fetch_body(self, query, row_id):
+        with self._connection() as conn:
+            row = conn.execute(query, (row_id,)).fetchone()
+        return codec.decode(row[0]) if row else None
+
+    def iter_habits(self, limit=None):
+        return self._iter_query(*self._limited(GETTER_QUERIES['habits'], (), limit))
+
     def get_habits(self, limit=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        query = 'SELECT * FROM habits ORDER BY date DESC'
-        if limit:
-            query += f' LIMIT {limit}'
-        
-        cursor.execute(query)
-        results = cursor.fetchall()
-        conn.close()
-        
-        return [dict(zip([col[0] for col in cursor.description], row)) for row in results]
-    
-    def get_financial_data(self, month=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        return list(self.iter_habits(limit))
+
+    def iter_financial_data(self, month=None):
         if month:
-            cursor.execute('SELECT * FROM financial_data WHERE month = ?', (month,))
+            return self._iter_query(GETTER_QUERIES['financial_data_by_month'], (month,))
+        return self._iter_query(GETTER_QUERIES['financial_data'])
+
+    def get_financial_data(self, month=None):
+        return list(self.iter_financial_data(month))
+
+    def iter_metrics(self, metric_type=None, limit=None):
+        if metric_type:
+            query, params = GETTER_QUERIES['metrics_by_type'], (metric_type,)
         else:
-            cursor.execute('SELECT * FROM financial_data ORDER BY month DESC')
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        return [dict(zip([col[0] for col in cursor.description], row)) for row in results]
-    
+            query, params = GETTER_QUERIES['metrics'], ()
+        return self._iter_query(*self._limited(query, params, limit))
+
     def get_metrics(self, metric_type=None, limit=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        query = 'SELECT * FROM metrics'
-        params = []
-        
-        if metric_type:
-            query += ' WHERE metric_type = ?'
-            params.append(metric_type)
-        
-        query += ' ORDER BY date DESC'
-        
-        if limit:
-            query += f' LIMIT {limit}'
-        
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        conn.close()
-        
-        return [dict(zip([col[0] for col in cursor.description], row)) for row in results]
-    
-    def insert_community(self, data):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO communities 
-            (id, community_name, description, personal_affiliation, what_ive_done, related_notes, blog_posts, 
-             media_links, website_sections, projects, events_attended, contribution_level, 
-             created_date, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['id'],
-            data['community_name'],
-            data['description'],
-            data.get('personal_affiliation'),
-            data.get('what_ive_done', ''),
-            json.dumps(data.get('related_notes', [])),
-            json.dumps(data.get('blog_posts', [])),
-            json.dumps(data.get('media_links', [])),
-            json.dumps(data.get('website_sections', [])),
-            json.dumps(data.get('projects', [])),
-            json.dumps(data.get('events_attended', [])),
-            data.get('contribution_level'),
-            data['created_date'],
-            json.dumps(data.get('metadata', {}))
-        ))
-        
-        conn.commit()
-        conn.close()
+        return list(self.iter_metrics(metric_type, limit))
+
+    def iter_rollups(self, table, period='day', start=None, end=None, name=None):
+        """Yield the rollup rows of a habits, metrics or anki_reviews table for one period."""
+        return self._iter_query(*rollups.rollup_query(table, period, start, end, name))
+
+    def get_rollups(self, table, period='day', start=None, end=None, name=None):
+        return list(self.iter_rollups(table, period, start, end, name))
+
+    def rollup_buckets(self, table, period='day'):
+        """Distinct bucket keys that have rollup rows, oldest first."""
+        with self._connection() as conn:
+            return [bucket for (bucket,) in conn.execute(
+                f'SELECT DISTINCT bucket FROM {rollups.ROLLUPS[table][0]} WHERE period = ? ORDER BY bucket',
+                (period,)
+            )]
+
+    def search(self, text, kinds=None, types=None, tags=None, limit=20,
+               include_private=False, raw=False):
+        """Full-text search over content, thoughts, projects and principles.
+
+        Returns the best BM25 matches first, each with a highlighted title and
+        a snippet of the body around the match. text is matched word by word
+        unless raw is set, in which case it is passed to FTS5 as a query.
+        """
+        query, params = search.search_query(
+            text, kinds, types, tags, include_private, limit, raw
+        )
+        results = []
+        for result in self._iter_query(query, params):
+            result['tags'] = json.loads(result['tags']) if result['tags'] else []
+            results.append(result)
+        return results
+
+    def rebuild_search_index(self):
+        with self._connection() as conn:
+            search.rebuild(conn)
+
+    def recompress_bodies(self):
+        """Re-encode stored bodies with the current compression settings.
+
+        Returns the number of rows rewritten.
+        """
+        with self._connection() as conn:
+            return codec.recompress(conn, self.compression, self.compression_threshold)
+
+    def iter_tagged(self, tag, entity_type=None, include_private=False):
+        """Yield {'entity_type', 'entity_id'} for every entity carrying tag."""
+        return self._iter_query(*tag_index.tagged_query(tag, entity_type, include_private))
+
+    def get_tagged(self, tag, entity_type=None, include_private=False):
+        return list(self.iter_tagged(tag, entity_type, include_private))
+
+    def tag_counts(self, entity_type=None, include_private=False, limit=None):
+        query, params = tag_index.counts_query(entity_type, include_private)
+        return list(self._iter_query(*self._limited(query, params, limit)))
+
+    def related_tags(self, tag, entity_type=None, include_private=False, limit=10):
+        """Tags that share entities with tag, with how many entities they share."""
+        query, params = tag_index.related_query(tag, entity_type, include_private)
+        return list(self._iter_query(*self._limited(query, params, limit)))
+
+    def iter_tag_links(self, include_private=False):
+        """Yield {'tag', 'entity_type', 'entity_id'} ordered by tag."""
+        return self._iter_query(*tag_index.index_query(include_private))
+
+    def rebuild_tag_index(self):
+        with self._connection() as conn:
+            tag_index.rebuild(conn)
+
+    def iter_places_in_bbox(self, min_lat, min_lon, max_lat, max_lon, kinds=None, include_private=False):
+        """Yield located events and thoughts inside a bounding box, via the R*Tree."""
+        return self._iter_query(*spatial.bbox_query(min_lat, min_lon, max_lat, max_lon, kinds, include_private))
+
+    def get_places_in_bbox(self, min_lat, min_lon, max_lat, max_lon, kinds=None, include_private=False):
+        return list(self.iter_places_in_bbox(min_lat, min_lon, max_lat, max_lon, kinds, include_private))
+
+    def nearest_places(self, latitude, longitude, n=10, kinds=None, include_private=False):
+        """The n located events and thoughts closest to a point, nearest first.
+
+        Searches a box around the point and grows it until n places lie
+        within the box's inscribed circle, so only nearby candidates are read.
+        """
+        radius = 1.0
+        while True:
+            box = spatial.bbox_around(latitude, longitude, radius)
+            within = []
+            for place in self.iter_places_in_bbox(*box, kinds, include_private):
+                place['distance_km'] = spatial.distance_km(
+                    latitude, longitude, place['latitude'], place['longitude']
+                )
+                if place['distance_km'] <= radius:
+                    within.append(place)
+            if len(within) >= n or radius >= spatial.MAX_DISTANCE_KM:
+                within.sort(key=lambda place: place['distance_km'])
+                return within[:n]
+            radius = min(radius * 4, spatial.MAX_DISTANCE_KM)
+
+    def map_clusters(self, zooms=spatial.CLUSTER_ZOOMS, kinds=None, include_private=False):
+        """Grid clusters of located events and thoughts for each map zoom level."""
+        return spatial.cluster(self._iter_query(*spatial.all_places_query(kinds, include_private)), zooms)
+
+    def rebuild_spatial_index(self):
+        with self._connection() as conn:
+            spatial.rebuild(conn)
+
+    def iter_periods(self, start, end=None, kinds=None, include_private=False):
+        """Yield the events and book reading periods overlapping the days start..end.
+
+        Both ends are inclusive; without end, the periods covering the day start.
+        """
+        return self._iter_query(*intervals.overlap_query(start, end, kinds, include_private))
+
+    def get_periods(self, start, end=None, kinds=None, include_private=False):
+        return list(self.iter_periods(start, end, kinds, include_private))
+
+    def annotate_days(self, days, kinds=None, include_private=False):
+        """Yield (day, covering periods) for ascending ISO days with a single range query."""
+        days = list(days)
+        if not days:
+            return iter(())
+        periods = self.iter_periods(days[0], days[-1], kinds, include_private)
+        return intervals.annotate(days, periods)
+
+    def rebuild_period_index(self):
+        with self._connection() as conn:
+            intervals.rebuild(conn)
+
+    def iter_daily_facts(self, start=None, end=None):
+        """Yield the daily facts of days in [start, end), oldest first."""
+        return map(daily_facts.parse, self._iter_query(*daily_facts.range_query(start, end)))
+
+    def get_daily_facts(self, start=None, end=None):
+        return list(self.iter_daily_facts(start, end))
+
+    def get_daily_fact(self, day):
+        """The facts of one YYYY-MM-DD day, or None when nothing was recorded."""
+        with self._connection() as conn:
+            cursor = conn.execute('SELECT * FROM daily_facts WHERE date = ?', (day,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return daily_facts.parse(dict(zip((col[0] for col in cursor.description), row)))
+
+    def rebuild_daily_facts(self):
+        with self._connection() as conn:
+            daily_facts.rebuild(conn)
+
+    def habit_streaks(self, habit_name):
+        with self._connection() as conn:
+            return analytics.habit_streaks(conn, habit_name)
+
+    def financial_summary(self, month=None):
+        with self._connection() as conn:
+            return analytics.financial_summary(conn, month)
+
+    def metric_trends(self, metric_name, days=7):
+        with self._connection() as conn:
+            return analytics.metric_trends(conn, metric_name, days)
+
+    def rolling_metric_averages(self, metric_name, window=7, start=None, end=None):
+        with self._connection() as conn:
+            return analytics.rolling_metric_averages(conn, metric_name, window, start, end)
+
+    def insert_community(self, record):
+        self.insert_many('communities', [record])
     
+    def iter_communities(self):
+        return self._iter_query(GETTER_QUERIES['communities'])
+
     def get_communities(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM communities ORDER BY personal_affiliation DESC, community_name ASC')
-        results = cursor.fetchall()
-        conn.close()
-        
-        return [dict(zip([col[0] for col in cursor.description], row)) for row in results]
-    
-    def insert_anki_review(self, data):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO anki_reviews 
-            (id, card_id, deck_name, note_content, review_date, ease_button, 
-             interval_days, previous_interval_days, ease_factor, time_spent_ms, 
-             review_type, created_date, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['id'],
-            data['card_id'],
-            data.get('deck_name', ''),
-            data.get('note_content', ''),
-            data['review_date'],
-            data.get('ease_button'),
-            data.get('interval_days'),
-            data.get('previous_interval_days'),
-            data.get('ease_factor'),
-            data.get('time_spent_ms'),
-            data.get('review_type'),
-            data['created_date'],
-            json.dumps(data.get('metadata', {}))
-        ))
-        
-        conn.commit()
-        conn.close()
+        return list(self.iter_communities())
+
+    def insert_anki_review(self, record):
+        self.insert_many('anki_reviews', [record])
     
+    def iter_anki_reviews(self, limit=None):
+        return self._iter_query(*self._limited(GETTER_QUERIES['anki_reviews'], (), limit))
+
     def get_anki_reviews(self, limit=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        query = 'SELECT * FROM anki_reviews ORDER BY review_date DESC'
-        if limit:
-            query += f' LIMIT {limit}'
-        
-        cursor.execute(query)
-        results = cursor.fetchall()
-        conn.close()
-        
-        return [dict(zip([col[0] for col in cursor.description], row)) for row in results]
-    
-    def insert_thought(self, data):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        location = data.get('location', {})
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO thoughts 
-            (id, capture_id, timestamp, content, modalities, context, sources, tags,
-             location_latitude, location_longitude, location_city, location_country, 
-             location_timezone, processing_status, created_date, last_edited_date, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['id'],
-            data.get('capture_id'),
-            data.get('timestamp'),
-            data['content'],
-            json.dumps(data.get('modalities', [])),
-            json.dumps(data.get('context', [])),
-            json.dumps(data.get('sources', [])),
-            json.dumps(data.get('tags', [])),
-            location.get('latitude'),
-            location.get('longitude'),
-            location.get('city'),
-            location.get('country'),
-            location.get('timezone'),
-            data.get('processing_status'),
-            data['created_date'],
-            data['last_edited_date'],
-            json.dumps(data.get('metadata', {}))
-        ))
-        
-        conn.commit()
-        conn.close()
+        return list(self.iter_anki_reviews(limit))
+
+    def insert_thought(self, record):
+        self.insert_many('thoughts', [record])
     
+    def iter_thoughts(self, limit=None):
+        return self._iter_query(*self._limited(GETTER_QUERIES['thoughts'], (), limit))
+
     def get_thoughts(self, limit=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        query = 'SELECT * FROM thoughts ORDER BY timestamp DESC'
-        if limit:
-            query += f' LIMIT {limit}'
-        
-        cursor.execute(query)
-        results = cursor.fetchall()
-        conn.close()
-        
-        return [dict(zip([col[0] for col in cursor.description], row)) for row in results]
-    
-    def insert_event(self, data):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO events 
-            (id, title, location, start_date, end_date, latitude, longitude, 
-             event_type, tags, public, content, created_date, last_edited_date, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['id'],
-            data['title'],
-            data['location'],
-            data['start_date'],
-            data['end_date'],
-            data.get('latitude'),
-            data.get('longitude'),
-            data.get('event_type'),
-            json.dumps(data.get('tags', [])),
-            data.get('public', False),
-            data['content'],
-            data['created_date'],
-            data['last_edited_date'],
-            json.dumps(data.get('metadata', {}))
-        ))
-        
-        conn.commit()
-        conn.close()
+        return list(self.iter_thoughts(limit))
+
+    def insert_event(self, record):
+        self.insert_many('events', [record])
     
+    def iter_principles(self):
+        return self._iter_query(GETTER_QUERIES['principles'])
+
     def get_principles(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM principles ORDER BY level, title')
-        results = cursor.fetchall()
-        conn.close()
-        
-        return [dict(zip([col[0] for col in cursor.description], row)) for row in results]
-    
-    def insert_project(self, data):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO projects
-            (id, title, description, tags, content, public, created_date, last_edited_date, status, links, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['id'],
-            data['title'],
-            data.get('description', ''),
-            json.dumps(data.get('tags', [])),
-            data['content'],
-            data.get('public', False),
-            data['created_date'],
-            data['last_edited_date'],
-            data.get('status', 'active'),
-            json.dumps(data.get('links', [])),
-            json.dumps(data.get('metadata', {}))
-        ))
-        
-        conn.commit()
-        conn.close()
+        return list(self.iter_principles())
+
+    def iter_principle_subtree(self, principle_id=None, max_depth=None, include_root=True):
+        """Yield a principle and its descendants (or every tree when principle_id
+        is omitted), shallowest first, each with its depth below the root."""
+        return self._iter_query(*principle_tree.subtree_query(principle_id, max_depth, include_root))
+
+    def get_principle_subtree(self, principle_id=None, max_depth=None, include_root=True):
+        return list(self.iter_principle_subtree(principle_id, max_depth, include_root))
+
+    def get_principle_ancestors(self, principle_id):
+        """The chain of principles above principle_id, root first."""
+        return list(self._iter_query(*principle_tree.ancestors_query(principle_id)))
+
+    def get_principle_tree(self, principle_id=None, max_depth=None):
+        """Principles nested under their parents in 'children' lists."""
+        return principle_tree.nest(self.iter_principle_subtree(principle_id, max_depth))
+
+    def rebuild_principle_tree(self):
+        with self._connection() as conn:
+            principle_tree.rebuild(conn)
+
+    def insert_project(self, record):
+        self.insert_many('projects', [record])
     
+    def iter_projects(self):
+        return self._iter_projects(GETTER_QUERIES['projects'])
+
     def get_projects(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM projects WHERE public = 1 ORDER BY title')
-        results = cursor.fetchall()
-        conn.close()
-        
-        projects = []
-        for row in results:
-            project = dict(zip([col[0] for col in cursor.description], row))
+        return list(self.iter_projects())
+
+    def iter_project_headers(self):
+        """Like iter_projects, without the body column (see BODY_COLUMNS)."""
+        return self._iter_projects(GETTER_QUERIES['project_headers'])
+
+    def get_project_headers(self):
+        return list(self.iter_project_headers())
+
+    def get_project_body(self, project_id):
+        """The body of one public project, or None."""
+        return self._fetch_body(GETTER_QUERIES['project_body'], project_id)
+
+    def iter_project_bodies(self):
+        """Yield (id, body) for the projects iter_project_headers lists."""
+        for row in self._iter_query(GETTER_QUERIES['project_bodies']):
+            yield row['id'], row['content']
+
+    def _iter_projects(self, query):
+        for project in self._iter_query(query):
             # Parse JSON fields
             if project.get('tags'):
                 project['tags'] = json.loads(project['tags'])
@@ -565,20 +1362,10 @@ class DatabaseManager:
                 project['links'] = json.loads(project['links'])
             if project.get('metadata'):
                 project['metadata'] = json.loads(project['metadata'])
-            projects.append(project)
-        
-        return projects
+            yield project
+
+    def iter_events(self, limit=None):
+        return self._iter_query(*self._limited(GETTER_QUERIES['events'], (), limit))
 
     def get_events(self, limit=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        query = 'SELECT * FROM events WHERE public = 1 ORDER BY start_date DESC'
-        if limit:
-            query += f' LIMIT {limit}'
-        
-        cursor.execute(query)
-        results = cursor.fetchall()
-        conn.close()
-        
-        return [dict(zip([col[0] for col in cursor.description], row)) for row in results]
+        return list(self.iter_events(limit))
\ No newline at end of file
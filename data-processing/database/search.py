@@ -0,0 +1,281 @@
+"""FTS5 full-text search over content (including blog posts), thoughts, projects and principles.
+
+Triggers copy every written row of a source table into search_documents,
+one row per (kind, source_id), and search_index is an external-content
+FTS5 index over its title, body and tags columns kept in sync by triggers
+of its own. Source rows written by the parsers are therefore searchable as
+soon as they are stored, whichever write path stored them.
+
+search_documents keeps each body in its stored form, compressed or not
+(see database/codec.py), so compression is not undone by a plain-text copy.
+The index reads the text through the search_text view. Only a database that
+stores compressed bodies needs them decoded there: use_body_text() switches
+the view and index triggers to body_text(), which only connections that
+register it (as DatabaseManager does) can run. Otherwise they are plain SQL
+and stock SQLite can write the source tables and search.
+"""
+import re
+
+# kind -> (source table, column expressions for search_documents). {row} is
+# "new" inside the triggers and the source table name when backfilling.
+# body is the stored body column; summary is text indexed ahead of it.
+SEARCH_SOURCES = {
+    'content': ('content', {
+        'type': '{row}.type',
+        'public': '{row}.public',
+        'title': '{row}.title',
+        'summary': 'NULL',
+        'body': '{row}.content',
+        'tags': "{tags_metadata}",
+        'date': '{row}.created_date',
+    }),
+    'thought': ('thoughts', {
+        'type': "'thought'",
+        'public': '1',
+        'title': "''",
+        'summary': 'NULL',
+        'body': '{row}.content',
+        'tags': '{tags_column}',
+        'date': '{row}.timestamp',
+    }),
+    'project': ('projects', {
+        'type': '{row}.status',
+        'public': '{row}.public',
+        'title': '{row}.title',
+        'summary': "COALESCE({row}.description, '')",
+        'body': '{row}.content',
+        'tags': '{tags_column}',
+        'date': '{row}.last_edited_date',
+    }),
+    'principle': ('principles', {
+        'type': "'principle'",
+        'public': '1',
+        'title': '{row}.title',
+        'summary': 'NULL',
+        'body': '{row}.content',
+        'tags': "'[]'",
+        'date': '{row}.last_edited_date',
+    }),
+}
+
+# Tags as a JSON array of strings, from a JSON column or from metadata.tags
+# (a single string tag becomes a one-element array). Malformed JSON counts as no tags.
+_TAGS = '''(SELECT json_group_array(value) FROM json_each(
+    CASE WHEN json_valid({json}) THEN {json} ELSE '[]' END, '{path}'
+) WHERE value IS NOT NULL)'''
+
+DOCUMENT_COLUMNS = ('kind', 'source_id', 'type', 'public', 'title', 'summary', 'body', 'tags', 'date')
+
+# The indexed body text of a search_documents row, read as stored or through body_text()
+_DOCUMENT_TEXT = "COALESCE({d}.summary || char(10), '') || COALESCE({body}, '')"
+_BODY = {False: '{d}.body', True: 'body_text({d}.body)'}
+
+_TEXT_TRIGGERS = ('search_documents_ai', 'search_documents_ad', 'search_documents_au')
+
+# bm25 weights for title, body and tags
+RANK_WEIGHTS = (10.0, 1.0, 5.0)
+
+
+def _expressions(kind, row):
+    _, columns = SEARCH_SOURCES[kind]
+    fields = {
+        'row': row,
+        'tags_metadata': _TAGS.format(json=f'{row}.metadata', path='$.tags'),
+        'tags_column': _TAGS.format(json=f'{row}.tags', path='$'),
+    }
+    values = [f"'{kind}'", f'{row}.id']
+    values += [columns[column].format(**fields) for column in DOCUMENT_COLUMNS[2:]]
+    return ', '.join(values)
+
+
+def _upsert_document_sql(kind, row):
+    updates = ', '.join(f'{column} = excluded.{column}' for column in DOCUMENT_COLUMNS[2:])
+    return f'''
+        INSERT INTO search_documents ({', '.join(DOCUMENT_COLUMNS)})
+        SELECT {_expressions(kind, row)}{f' FROM {row}' if row != 'new' else ''}
+        WHERE true
+        ON CONFLICT(kind, source_id) DO UPDATE SET {updates}
+    '''
+
+
+def _document_text(d, decode):
+    return _DOCUMENT_TEXT.format(d=d, body=_BODY[decode].format(d=d))
+
+
+def create_tables(cursor, decode=False):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS search_documents (
+            rowid INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            source_id TEXT NOT NULL,
+            type TEXT,
+            public BOOLEAN,
+            title TEXT,
+            summary TEXT,
+            body TEXT,
+            tags TEXT,
+            date TEXT,
+            UNIQUE (kind, source_id)
+        )
+    ''')
+    _create_text_view(cursor, decode)
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            title, body, tags,
+            content = 'search_text',
+            content_rowid = 'rowid',
+            tokenize = 'porter unicode61'
+        )
+    ''')
+    _create_text_triggers(cursor, decode)
+
+    # Source tables feed search_documents. INSERT OR REPLACE does not fire
+    # delete triggers, but the insert trigger upserts on (kind, source_id),
+    # so a replaced row still overwrites its document.
+    for kind, (table, _) in SEARCH_SOURCES.items():
+        upsert = _upsert_document_sql(kind, 'new')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_search_ai AFTER INSERT ON {table} BEGIN
+                {upsert};
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_search_au AFTER UPDATE ON {table} BEGIN
+                DELETE FROM search_documents WHERE kind = '{kind}' AND source_id = old.id AND old.id IS NOT new.id;
+                {upsert};
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_search_ad AFTER DELETE ON {table} BEGIN
+                DELETE FROM search_documents WHERE kind = '{kind}' AND source_id = old.id;
+            END
+        ''')
+
+
+def _create_text_view(cursor, decode):
+    cursor.execute(f'''
+        CREATE VIEW IF NOT EXISTS search_text AS
+        SELECT rowid, title, {_document_text('search_documents', decode)} AS body, tags
+        FROM search_documents
+    ''')
+
+
+def _create_text_triggers(cursor, decode):
+    # Keep the external-content index in step with search_documents
+    new_text = _document_text('new', decode)
+    old_text = _document_text('old', decode)
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN
+            INSERT INTO search_index (rowid, title, body, tags)
+            VALUES (new.rowid, new.title, {new_text}, new.tags);
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN
+            INSERT INTO search_index (search_index, rowid, title, body, tags)
+            VALUES ('delete', old.rowid, old.title, {old_text}, old.tags);
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN
+            INSERT INTO search_index (search_index, rowid, title, body, tags)
+            VALUES ('delete', old.rowid, old.title, {old_text}, old.tags);
+            INSERT INTO search_index (rowid, title, body, tags)
+            VALUES (new.rowid, new.title, {new_text}, new.tags);
+        END
+    ''')
+
+
+def stores_compressed(conn):
+    """Whether any searched source row keeps its body compressed (as a BLOB)."""
+    for table, columns in SEARCH_SOURCES.values():
+        body = columns['body'].format(row=table)
+        if conn.execute(f"SELECT 1 FROM {table} WHERE typeof({body}) = 'blob' LIMIT 1").fetchone():
+            return True
+    return False
+
+
+def uses_body_text(conn):
+    """Whether the search_text view reads bodies through body_text()."""
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'view' AND name = 'search_text'").fetchone()
+    return row is not None and 'body_text(' in row[0]
+
+
+def use_body_text(conn, decode):
+    """Recreate the search_text view and index triggers with or without body_text().
+
+    Both forms read the same text from plain bodies, so the index stays valid;
+    the plain form is only correct while no source row stores a compressed body.
+    """
+    if uses_body_text(conn) == decode:
+        return
+    cursor = conn.cursor()
+    cursor.execute('DROP VIEW IF EXISTS search_text')
+    for trigger in _TEXT_TRIGGERS:
+        cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    _create_text_view(cursor, decode)
+    _create_text_triggers(cursor, decode)
+
+
+def rebuild(conn):
+    """Refill search_documents and the FTS index from the source tables."""
+    conn.execute('DELETE FROM search_documents')
+    for kind, (table, _) in SEARCH_SOURCES.items():
+        conn.execute(_upsert_document_sql(kind, table))
+    conn.execute("INSERT INTO search_index (search_index) VALUES ('rebuild')")
+
+
+def match_expression(text):
+    """Quote each word of free text so FTS5 matches documents containing all of them.
+
+    A trailing * on a word keeps it a prefix search. Query syntax such as
+    OR, NEAR or column filters is not interpreted; pass raw=True to search()
+    for that.
+    """
+    terms = []
+    for word in re.findall(r'\S+', text):
+        prefix = word.endswith('*') and len(word) > 1
+        word = word.rstrip('*') if prefix else word
+        terms.append('"' + word.replace('"', '""') + '"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+
+def search_query(text, kinds=None, types=None, tags=None, include_private=False,
+                 limit=20, raw=False, marks=('<mark>', '</mark>'), snippet_tokens=16):
+    """SQL and params for a BM25-ranked search, best match first.
+
+    kinds narrows to content, thought, project or principle; types to content
+    types (blog, book, ...) or project statuses; tags to documents carrying
+    any of the given tags.
+    """
+    unknown = set(kinds or ()) - set(SEARCH_SOURCES)
+    if unknown:
+        raise ValueError(f"Unknown search kinds: {', '.join(sorted(unknown))}")
+
+    start, end = marks
+    weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+    where = ['search_index MATCH ?']
+    params = [start, end, start, end, snippet_tokens, text if raw else match_expression(text)]
+    for column, values in (('d.kind', kinds), ('d.type', types)):
+        if values:
+            where.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    if tags:
+        where.append(f"EXISTS (SELECT 1 FROM json_each(d.tags) WHERE value IN ({', '.join('?' * len(tags))}))")
+        params.extend(tags)
+    if not include_private:
+        where.append('d.public = 1')
+    params.append(limit)
+
+    query = f'''
+        SELECT d.kind, d.source_id AS id, d.type, d.title, d.date, d.tags,
+               highlight(search_index, 0, ?, ?) AS title_highlight,
+               snippet(search_index, 1, ?, ?, '…', ?) AS snippet,
+               bm25(search_index, {weights}) AS rank
+        FROM search_index
+        JOIN search_documents d ON d.rowid = search_index.rowid
+        WHERE {' AND '.join(where)}
+        ORDER BY rank
+        LIMIT ?
+    '''
+    return query, tuple(params)
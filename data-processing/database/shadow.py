@@ -0,0 +1,64 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+SIDECAR_SUFFIXES = ('-wal', '-shm', '-journal')
+
+
+def _remove_with_sidecars(path):
+    for suffix in ('',) + SIDECAR_SUFFIXES:
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+
+def seed_from(live_path, shadow_path):
+    """Copy the live database into shadow_path with SQLite's online backup API."""
+    source = sqlite3.connect(f"{Path(live_path).resolve().as_uri()}?mode=ro", uri=True)
+    target = sqlite3.connect(shadow_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def finalize(shadow_path):
+    """Fold the WAL back into the main file so the shadow is a single self-contained file."""
+    conn = sqlite3.connect(shadow_path)
+    try:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        conn.execute('PRAGMA journal_mode = DELETE')
+    finally:
+        conn.close()
+
+
+@contextmanager
+def shadow_build(live_path, seed=True):
+    """Build a database next to live_path and swap it in only if the build succeeds.
+
+    Yields the path of a temporary database. When seed is set and the live
+    database exists, the temporary one starts as a copy of it so incremental
+    runs keep earlier rows. On a clean exit the temporary file is renamed over
+    live_path in one atomic step; if the block raises, it is deleted and the
+    live database is left untouched. Readers keep a consistent snapshot either
+    way, so exports can run against the live file during a rebuild.
+    """
+    live_path = Path(live_path)
+    live_path.parent.mkdir(parents=True, exist_ok=True)
+    shadow_path = live_path.with_name(f"{live_path.name}.building")
+    _remove_with_sidecars(shadow_path)
+
+    if seed and live_path.exists():
+        seed_from(live_path, shadow_path)
+
+    try:
+        yield shadow_path
+        finalize(shadow_path)
+    except BaseException:
+        _remove_with_sidecars(shadow_path)
+        raise
+
+    os.replace(shadow_path, live_path)
+    # Side files of the replaced database would be misread as belonging to the new one
+    for suffix in SIDECAR_SUFFIXES:
+        Path(f"{live_path}{suffix}").unlink(missing_ok=True)
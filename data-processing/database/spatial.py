@@ -0,0 +1,217 @@
+"""R*Tree spatial index over geotagged events and thoughts.
+
+places holds one row per located event or thought (R*Tree ids must be
+integers, so it also maps them to the text ids of the source rows), and
+place_index is the R*Tree over its coordinates. Triggers on events and
+thoughts keep both in step with every write.
+"""
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+
+# Zoom levels exported as clusters, and how many grid cells per map tile
+# side a cluster covers (4 cells on a 256px tile is roughly 64px apart).
+CLUSTER_ZOOMS = range(0, 15)
+CELLS_PER_TILE = 4
+# Clusters up to this size list their members so the map can show them directly
+CLUSTER_MEMBER_LIMIT = 10
+
+# kind -> (source table, latitude column, longitude column, public expression, label column)
+SPATIAL_SOURCES = {
+    'event': ('events', 'latitude', 'longitude', '{row}.public', 'title'),
+    'thought': ('thoughts', 'location_latitude', 'location_longitude', '1', 'location_city'),
+}
+
+
+def _place_statements(kind, row):
+    """SQL that adds the place of one source row, or of every row when row is the table."""
+    table, latitude, longitude, public, label = SPATIAL_SOURCES[kind]
+    source = f' FROM {table}' if row == table else ''
+    located = (f"typeof({row}.{latitude}) IN ('real', 'integer') "
+               f"AND typeof({row}.{longitude}) IN ('real', 'integer')")
+    select_source = (
+        f"WHERE kind = '{kind}' AND source_id = {row}.id" if row == 'new'
+        else f"WHERE kind = '{kind}'"
+    )
+    return (
+        f'''INSERT INTO places (kind, source_id, public, latitude, longitude, label)
+            SELECT '{kind}', {row}.id, CASE WHEN {public.format(row=row)} THEN 1 ELSE 0 END,
+                   {row}.{latitude}, {row}.{longitude}, {row}.{label}{source}
+            WHERE {located}''',
+        f'''INSERT INTO place_index (id, min_lat, max_lat, min_lon, max_lon)
+            SELECT id, latitude, latitude, longitude, longitude FROM places
+            {select_source}''',
+    )
+
+
+def _remove_statements(kind, row):
+    return (
+        f"DELETE FROM place_index WHERE id IN (SELECT id FROM places WHERE kind = '{kind}' AND source_id = {row}.id)",
+        f"DELETE FROM places WHERE kind = '{kind}' AND source_id = {row}.id",
+    )
+
+
+def create_tables(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS places (
+            id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            source_id TEXT NOT NULL,
+            public BOOLEAN,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            label TEXT,
+            UNIQUE (kind, source_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS place_index USING rtree(
+            id, min_lat, max_lat, min_lon, max_lon
+        )
+    ''')
+
+    # INSERT OR REPLACE does not fire the delete trigger for the row it
+    # replaces, so the insert trigger drops any earlier place first.
+    for kind, (table, _, _, _, _) in SPATIAL_SOURCES.items():
+        place = ';\n'.join(_place_statements(kind, 'new'))
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_places_ai AFTER INSERT ON {table} BEGIN
+                {';'.join(_remove_statements(kind, 'new'))};
+                {place};
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_places_au AFTER UPDATE ON {table} BEGIN
+                {';'.join(_remove_statements(kind, 'old'))};
+                {place};
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_places_ad AFTER DELETE ON {table} BEGIN
+                {';'.join(_remove_statements(kind, 'old'))};
+            END
+        ''')
+
+
+def rebuild(conn):
+    """Refill places and the R*Tree from the source tables."""
+    conn.execute('DELETE FROM place_index')
+    conn.execute('DELETE FROM places')
+    for kind, (table, _, _, _, _) in SPATIAL_SOURCES.items():
+        for statement in _place_statements(kind, table):
+            conn.execute(statement)
+
+
+def _filters(kinds, include_private):
+    where, params = [], []
+    if kinds:
+        unknown = set(kinds) - set(SPATIAL_SOURCES)
+        if unknown:
+            raise ValueError(f"Unknown place kinds: {', '.join(sorted(unknown))}")
+        where.append(f"p.kind IN ({', '.join('?' * len(kinds))})")
+        params.extend(kinds)
+    if not include_private:
+        where.append('p.public = 1')
+    return where, params
+
+
+def bbox_query(min_lat, min_lon, max_lat, max_lon, kinds=None, include_private=False):
+    """SQL and params for the places inside a bounding box.
+
+    A box whose min_lon is greater than its max_lon wraps across the
+    antimeridian.
+    """
+    if min_lon <= max_lon:
+        longitude = 'i.min_lon <= ? AND i.max_lon >= ?'
+        params = [max_lat, min_lat, max_lon, min_lon]
+    else:
+        longitude = '(i.min_lon <= 180 AND i.max_lon >= ?) OR (i.min_lon <= ? AND i.max_lon >= -180)'
+        params = [max_lat, min_lat, min_lon, max_lon]
+    where, filter_params = _filters(kinds, include_private)
+    where = ['i.min_lat <= ? AND i.max_lat >= ?', f'({longitude})', *where]
+    return f'''
+        SELECT p.id AS place_id, p.kind, p.source_id AS id, p.latitude, p.longitude, p.label
+        FROM place_index i
+        JOIN places p ON p.id = i.id
+        WHERE {' AND '.join(where)}
+    ''', tuple(params + filter_params)
+
+
+def all_places_query(kinds=None, include_private=False):
+    where, params = _filters(kinds, include_private)
+    return f'''
+        SELECT p.id AS place_id, p.kind, p.source_id AS id, p.latitude, p.longitude, p.label
+        FROM places p
+        {'WHERE ' + ' AND '.join(where) if where else ''}
+        ORDER BY p.id
+    ''', tuple(params)
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle (haversine) distance between two points."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bbox_around(lat, lon, radius_km):
+    """(min_lat, min_lon, max_lat, max_lon) of a box containing the circle of radius_km."""
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        # The circle reaches a pole, so it spans every longitude
+        return max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0
+    delta_lon = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(lat))))
+    if delta_lon >= 180:
+        return min_lat, -180.0, max_lat, 180.0
+    return min_lat, _wrap_longitude(lon - delta_lon), max_lat, _wrap_longitude(lon + delta_lon)
+
+
+def _wrap_longitude(value):
+    return (value + 180) % 360 - 180
+
+
+def tile_cell(lat, lon, zoom):
+    """The Web Mercator grid cell of a point at a zoom level."""
+    cells = (2 ** zoom) * CELLS_PER_TILE
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    x = (lon + 180.0) / 360.0
+    y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0
+    return min(int(x * cells), cells - 1), min(int(y * cells), cells - 1)
+
+
+def cluster(places, zooms=CLUSTER_ZOOMS):
+    """Group places into per-zoom grid clusters in one pass over places.
+
+    Returns {zoom: [{'latitude', 'longitude', 'count', 'members'?}, ...]},
+    placing each cluster at the mean position of its members.
+    """
+    zooms = list(zooms)
+    # cell -> [latitude sum, longitude sum, count, first members]
+    cells = {zoom: {} for zoom in zooms}
+    for place in places:
+        member = {'kind': place['kind'], 'id': place['id'], 'label': place['label']}
+        for zoom in zooms:
+            key = tile_cell(place['latitude'], place['longitude'], zoom)
+            cell = cells[zoom].setdefault(key, [0.0, 0.0, 0, []])
+            cell[0] += place['latitude']
+            cell[1] += place['longitude']
+            cell[2] += 1
+            if cell[2] <= CLUSTER_MEMBER_LIMIT:
+                cell[3].append(member)
+
+    clusters = {}
+    for zoom in zooms:
+        clusters[zoom] = []
+        for _, (latitude_sum, longitude_sum, count, members) in sorted(cells[zoom].items()):
+            entry = {
+                'latitude': latitude_sum / count,
+                'longitude': longitude_sum / count,
+                'count': count,
+            }
+            if count <= CLUSTER_MEMBER_LIMIT:
+                entry['members'] = members
+            clusters[zoom].append(entry)
+    return clusters
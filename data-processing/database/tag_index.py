@@ -0,0 +1,169 @@
+"""Normalized tag index over content, thoughts, events and projects.
+
+Every distinct tag gets one row in tags, and entity_tags links it to each
+tagged row of a source table. Triggers on the source tables rewrite an
+entity's links whenever the row is written, so "everything tagged X",
+tag counts and co-occurrence are indexed lookups instead of JSON scans.
+Tags are compared lowercased, without surrounding spaces or a leading #.
+"""
+
+# entity type -> (source table, JSON tags column, JSON path, public expression).
+# {row} is "new" inside the triggers and the source table name when backfilling.
+TAG_SOURCES = {
+    'content': ('content', '{row}.metadata', '$.tags', '{row}.public'),
+    'thought': ('thoughts', '{row}.tags', '$', '1'),
+    'event': ('events', '{row}.tags', '$', '{row}.public'),
+    'project': ('projects', '{row}.tags', '$', '{row}.public'),
+}
+
+_TAG_NAME = "lower(trim(CAST(j.value AS TEXT), ' #'))"
+_TAG_VALUES = "json_each(CASE WHEN json_valid({json}) THEN {json} ELSE '[]' END, '{path}') AS j"
+_TAG_FILTER = f"j.type NOT IN ('null', 'object', 'array') AND {_TAG_NAME} != ''"
+
+
+def _link_statements(entity_type, row):
+    """SQL that (re)creates the tag links of one source row, or of every row when row is the table."""
+    table, json_column, path, public = TAG_SOURCES[entity_type]
+    source = f'{table}, ' if row == table else ''
+    values = source + _TAG_VALUES.format(json=json_column.format(row=row), path=path)
+    # Duplicates are filtered out rather than left to OR IGNORE: inside a
+    # trigger, the conflict policy of the statement that fired it (the
+    # upsert's update, or INSERT OR REPLACE) overrides the trigger's own, which
+    # would fail the write or replace a tag under its other links.
+    return (
+        f'''INSERT INTO tags (name)
+            SELECT DISTINCT {_TAG_NAME} FROM {values}
+            WHERE {_TAG_FILTER} AND NOT EXISTS (SELECT 1 FROM tags t WHERE t.name = {_TAG_NAME})''',
+        f'''INSERT INTO entity_tags (tag_id, entity_type, entity_id, public)
+            SELECT DISTINCT tags.id, '{entity_type}', {row}.id, CASE WHEN {public.format(row=row)} THEN 1 ELSE 0 END
+            FROM {values}
+            JOIN tags ON tags.name = {_TAG_NAME}
+            WHERE {_TAG_FILTER}''',
+    )
+
+
+def create_tables(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tags (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS entity_tags (
+            tag_id INTEGER NOT NULL REFERENCES tags(id),
+            entity_type TEXT NOT NULL,
+            entity_id TEXT NOT NULL,
+            public BOOLEAN,
+            PRIMARY KEY (tag_id, entity_type, entity_id)
+        )
+    ''')
+
+    # The insert trigger clears old links first because INSERT OR REPLACE
+    # does not fire the delete trigger for the row it replaces.
+    for entity_type, (table, _, _, _) in TAG_SOURCES.items():
+        unlink = f"DELETE FROM entity_tags WHERE entity_type = '{entity_type}' AND entity_id = old.id"
+        link = ';\n'.join(_link_statements(entity_type, 'new'))
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_tags_ai AFTER INSERT ON {table} BEGIN
+                DELETE FROM entity_tags WHERE entity_type = '{entity_type}' AND entity_id = new.id;
+                {link};
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_tags_au AFTER UPDATE ON {table} BEGIN
+                {unlink};
+                {link};
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_tags_ad AFTER DELETE ON {table} BEGIN
+                {unlink};
+            END
+        ''')
+
+
+def rebuild(conn):
+    """Recreate every tag link from the source tables and drop unused tags."""
+    conn.execute('DELETE FROM entity_tags')
+    for entity_type, (table, _, _, _) in TAG_SOURCES.items():
+        for statement in _link_statements(entity_type, table):
+            conn.execute(statement)
+    conn.execute('DELETE FROM tags WHERE id NOT IN (SELECT tag_id FROM entity_tags)')
+
+
+def normalize(tag):
+    return str(tag).strip(' #').lower()
+
+
+def _filters(entity_type, include_private, alias='et'):
+    where, params = [], []
+    if entity_type is not None:
+        if entity_type not in TAG_SOURCES:
+            raise ValueError(f"Unknown tagged entity type: {entity_type}")
+        where.append(f'{alias}.entity_type = ?')
+        params.append(entity_type)
+    if not include_private:
+        where.append(f'{alias}.public = 1')
+    return where, params
+
+
+def _where(conditions):
+    return f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+
+def tagged_query(tag, entity_type=None, include_private=False):
+    """SQL and params for the entities carrying tag."""
+    where, params = _filters(entity_type, include_private)
+    where.insert(0, 'et.tag_id = (SELECT id FROM tags WHERE name = ?)')
+    params.insert(0, normalize(tag))
+    return f'''
+        SELECT et.entity_type, et.entity_id
+        FROM entity_tags et
+        {_where(where)}
+        ORDER BY et.entity_type, et.entity_id
+    ''', tuple(params)
+
+
+def counts_query(entity_type=None, include_private=False):
+    """SQL and params for tag frequencies, most used first."""
+    where, params = _filters(entity_type, include_private)
+    return f'''
+        SELECT t.name AS tag, COUNT(*) AS count
+        FROM entity_tags et
+        JOIN tags t ON t.id = et.tag_id
+        {_where(where)}
+        GROUP BY et.tag_id
+        ORDER BY count DESC, tag
+    ''', tuple(params)
+
+
+def related_query(tag, entity_type=None, include_private=False):
+    """SQL and params for the tags most often found on the same entities as tag."""
+    where, params = _filters(entity_type, include_private, alias='base')
+    where.insert(0, 'base.tag_id = (SELECT id FROM tags WHERE name = ?)')
+    params.insert(0, normalize(tag))
+    return f'''
+        SELECT t.name AS tag, COUNT(*) AS count
+        FROM entity_tags base
+        JOIN entity_tags other
+          ON other.entity_type = base.entity_type
+         AND other.entity_id = base.entity_id
+         AND other.tag_id != base.tag_id
+        JOIN tags t ON t.id = other.tag_id
+        {_where(where)}
+        GROUP BY other.tag_id
+        ORDER BY count DESC, tag
+    ''', tuple(params)
+
+
+def index_query(include_private=False):
+    """SQL and params for every tag link ordered by tag, for building a tag index."""
+    where, params = _filters(None, include_private)
+    return f'''
+        SELECT t.name AS tag, et.entity_type, et.entity_id
+        FROM entity_tags et
+        JOIN tags t ON t.id = et.tag_id
+        {_where(where)}
+        ORDER BY t.name, et.entity_type, et.entity_id
+    ''', tuple(params)
@@ -0,0 +1,161 @@
+"""Run parser tasks in a process pool with one process doing all the writes.
+
+Each worker gets a QueuedDatabaseManager: it reads the build database
+through a read-only connection (the file manifest, mostly) but turns every
+write into an operation on a shared queue instead of executing it. The
+calling process is the only writer. It applies each task's operations
+through its own DatabaseManager, so SQLite never sees competing writers.
+
+Operations are applied in task order: the first unfinished task's are
+written as they arrive, later tasks' are held until every earlier task has
+finished. The database therefore ends up exactly as a sequential run in the
+same order leaves it (tag ids and search rowids included), and each task's
+printed output is replayed in that order too.
+"""
+import io
+import multiprocessing
+import queue as queue_module
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+from database.schema import DatabaseManager
+
+# DatabaseManager methods that change the database
+WRITE_METHODS = ('_insert_many', '_delete_by_ids', '_write', '_touch_source', '_record_source', '_forget_sources')
+
+# Operations a worker collects before putting them on the queue
+SEND_EVERY = 64
+
+# How often the writer checks for a worker that died without reporting
+POLL_SECONDS = 0.5
+
+# Workers start fresh interpreters: a forked child would inherit the
+# writer's open SQLite connection, which SQLite does not support
+START_METHOD = 'spawn'
+
+
+class QueuedDatabaseManager(DatabaseManager):
+    """A DatabaseManager for a worker: reads the build database, queues every write."""
+
+    def __init__(self, db_path, queue, task, batch_size, manifest_mode):
+        super().__init__(db_path, batch_size=batch_size, profile='export-read',
+                         manifest_mode=manifest_mode)
+        self._queue = queue
+        self._task = task
+        self._operations = []
+
+    def send(self):
+        """Put the collected operations on the queue."""
+        if self._operations:
+            self._queue.put(('operations', self._task, self._operations))
+            self._operations = []
+
+
+def _queued(name):
+    def queue_write(self, *args):
+        # Deletes and plain writes follow earlier buffered inserts, as they do
+        # in DatabaseManager, whose _connection() and _write() flush first
+        if name in ('_delete_by_ids', '_write'):
+            self.flush()
+        self._operations.append((name, args))
+        if len(self._operations) >= SEND_EVERY:
+            self.send()
+    queue_write.__name__ = name
+    return queue_write
+
+
+for _name in WRITE_METHODS:
+    setattr(QueuedDatabaseManager, _name, _queued(_name))
+
+
+_queue = None
+
+
+def _init_worker(queue, initializer, initargs):
+    global _queue
+    _queue = queue
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def _run_task(task, function, args, db_path, batch_size, manifest_mode):
+    db_manager = QueuedDatabaseManager(db_path, _queue, task, batch_size, manifest_mode)
+    output = io.StringIO()
+    try:
+        with redirect_stdout(output), db_manager.session():
+            result = function(db_manager, *args)
+        db_manager.send()
+    except BaseException:
+        _queue.put(('failed', task, traceback.format_exc(), output.getvalue()))
+        return
+    _queue.put(('done', task, result, db_manager.source_stats, output.getvalue()))
+
+
+def _apply(writer, operations):
+    for name, args in operations:
+        getattr(writer, name)(*args)
+
+
+def _merge_source_stats(writer, source_stats):
+    for parser, stats in source_stats.items():
+        merged = writer._source_stats(parser)
+        for key, count in stats.items():
+            merged[key] += count
+
+
+def run_parallel(writer, tasks, jobs, initializer=None, initargs=()):
+    """Run tasks in jobs worker processes, writing through writer.
+
+    tasks is a list of (function, args); each runs as function(db_manager,
+    *args) in a worker and must be picklable by reference. writer must be
+    inside a session on the database the workers read. Returns the tasks'
+    results in order. A failing task fails the whole run.
+    """
+    context = multiprocessing.get_context(START_METHOD)
+    queue = context.Queue()
+    held = {task: [] for task in range(len(tasks))}
+    finished = {}
+    results = []
+    current = 0
+
+    pool = ProcessPoolExecutor(max_workers=jobs, mp_context=context,
+                               initializer=_init_worker, initargs=(queue, initializer, initargs))
+    try:
+        futures = [
+            pool.submit(_run_task, task, function, args, writer.db_path, writer.batch_size,
+                        writer.manifest_mode)
+            for task, (function, args) in enumerate(tasks)
+        ]
+        while current < len(tasks):
+            try:
+                kind, task, *payload = queue.get(timeout=POLL_SECONDS)
+            except queue_module.Empty:
+                for future in futures:
+                    if future.done() and future.exception() is not None:
+                        raise RuntimeError(f"A parser worker died: {future.exception()}")
+                continue
+
+            if kind == 'failed':
+                error, output = payload
+                print(output, end='')
+                raise RuntimeError(f"{tasks[task][0].__name__} failed:\n{error}")
+            if kind == 'operations':
+                if task == current:
+                    _apply(writer, payload[0])
+                else:
+                    held[task].extend(payload[0])
+                continue
+
+            finished[task] = payload
+            while current in finished:
+                result, source_stats, output = finished.pop(current)
+                print(output, end='')
+                _merge_source_stats(writer, source_stats)
+                results.append(result)
+                current += 1
+                if current < len(tasks):
+                    _apply(writer, held.pop(current))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return results
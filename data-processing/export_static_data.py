@@ -2,8 +2,11 @@
 
 import json
 import sys
+from itertools import groupby
 from pathlib import Path
+from database.daily_facts import SOURCES as DAILY_FACT_SOURCES
 from database.schema import DatabaseManager
+from database.tag_index import TAG_SOURCES
 from collections import defaultdict
 from datetime import datetime
 import requests
@@ -18,34 +21,180 @@ from parsers.failures_parser import FailuresParser
 from parsers.victories_parser import VictoriesParser
 
 
-def export_dailies_timeline(db_manager):
-    """Export dailies timeline data showing count of dailies written per date"""
-    habits_data = db_manager.get_habits()
+# Output file -> tables it is exported from. A partial export (see
+# export_static_data) rewrites a file only when one of its tables changed.
+EXPORT_TABLES = {
+    "content.json": ("content",),
+    "habits.json": ("habits",),
+    "financial.json": ("financial_data",),
+    "metrics.json": ("metrics",),
+    "communities.json": ("communities",),
+    "anki.json": ("anki_reviews",),
+    "blog.json": ("content",),
+    "thoughts.json": ("thoughts",),
+    # Days with a daily note, annotated with events and books being read
+    "dailies_timeline.json": ("habits", "events", "content"),
+    "rollups.json": ("habits", "metrics", "anki_reviews"),
+    "books.json": ("content",),
+    "events.json": ("events",),
+    "map_clusters.json": ("events", "thoughts"),
+    "principles.json": ("principles",),
+    "principles_tree.json": ("principles",),
+    "projects.json": ("projects",),
+    "tags.json": tuple(source[0] for source in TAG_SOURCES.values()),
+    "daily_facts.json": tuple(DAILY_FACT_SOURCES),
+}
+
+# Output file -> (config section, default path) of the vault file it is read
+# from at export time. A partial export rewrites these when named in vault_files.
+VAULT_FILES = {
+    "ideas.json": ("ideas", "projects/ideas.md"),
+    "line_dancing.json": ("line_dancing", "resources/line-dances-i-know.md"),
+    "standards.json": ("standards", "resources/standards.md"),
+    "failures.json": ("failures", "areas/self-mastery/failures.md"),
+    "victories.json": ("victories", "areas/personal-brand/website/victories.md"),
+}
+
+# Characters of each post's body that blog.json carries for the blog list
+BLOG_EXCERPT_LENGTH = 200
+
+
+def vault_file_paths(config):
+    """Output file -> full path of the vault file VAULT_FILES reads it from."""
+    return {
+        name: config.get_vault_base_path() / config.data.get(section, {}).get("file_path", default)
+        for name, (section, default) in VAULT_FILES.items()
+    }
 
-    daily_counts = defaultdict(int)
-    unique_dates = set()
+_encode_scalar = json.JSONEncoder(default=str).encode
+_record_keys = {}
+
+
+def _record_json(record):
+    """A record formatted as write_json_array formats a dict with the same items.
+
+    Scalars go straight to the encoder; only nested values take the indenting
+    path, so a record of stored strings never becomes a dict.
+    """
+    keys = _record_keys.get(type(record))
+    if keys is None:
+        keys = _record_keys[type(record)] = [f"{json.dumps(field)}: " for field in record._fields]
+    if not keys:
+        return "{}"
+    items = [
+        key + (json.dumps(value, indent=2, default=str).replace("\n", "\n    ")
+               if isinstance(value, (dict, list, tuple)) else _encode_scalar(value))
+        for key, value in zip(keys, record)
+    ]
+    return "{\n    " + ",\n    ".join(items) + "\n  }"
+
+
+def write_json_array(path, rows):
+    """Stream rows into a JSON array file, formatted like json.dump(indent=2).
+
+    Returns the number of rows written; rows can be any iterable, so large
+    tables never need to be held in memory.
+    """
+    count = 0
+    with open(path, "w") as f:
+        for row in rows:
+            f.write("[\n  " if count == 0 else ",\n  ")
+            if hasattr(row, "_fields"):
+                f.write(_record_json(row))
+            else:
+                f.write(json.dumps(row, indent=2, default=str).replace("\n", "\n  "))
+            count += 1
+        f.write("\n]" if count else "[]")
+    return count
+
+
+def write_json_object(path, items):
+    """Stream (key, value) pairs into a JSON object file, one pair per line.
+
+    Used for the id -> body files that sit next to the header-only lists.
+    """
+    count = 0
+    with open(path, "w") as f:
+        for key, value in items:
+            f.write("{\n  " if count == 0 else ",\n  ")
+            f.write(f"{json.dumps(str(key))}: {json.dumps(value, default=str)}")
+            count += 1
+        f.write("\n}" if count else "{}")
+    return count
 
-    for habit in habits_data:
-        date = habit["date"]
-        if date not in unique_dates:
-            unique_dates.add(date)
-            daily_counts[date] = 1
 
+def export_dailies_timeline(db_manager):
+    """Export dailies timeline data showing count of dailies written per date,
+    with the events and books in progress on each date"""
     timeline_data = []
-    for date in sorted(daily_counts.keys()):
+    # One habits rollup bucket per day that has a daily note
+    days = db_manager.rollup_buckets("habits", "day")
+    for date, periods in db_manager.annotate_days(days):
         timeline_data.append(
             {
                 "date": date,
-                "count": daily_counts[date],
+                "count": 1,
                 "formatted_date": datetime.strptime(date, "%Y-%m-%d").strftime(
                     "%b %d, %Y"
                 ),
+                "periods": [
+                    {"kind": period["kind"], "id": period["id"], "title": period["label"]}
+                    for period in periods
+                ],
             }
         )
 
     return timeline_data
 
 
+def export_rollups(db_manager):
+    """Export weekly and monthly habit, metric and Anki aggregates for charts"""
+    return {
+        name: {
+            period: db_manager.get_rollups(table, period)
+            for period in ("week", "month")
+        }
+        for name, table in (("habits", "habits"), ("metrics", "metrics"), ("anki", "anki_reviews"))
+    }
+
+
+def export_tag_index(db_manager):
+    """Export every public tag with the entities carrying it, most used tags first"""
+    tag_index = []
+    for tag, links in groupby(db_manager.iter_tag_links(), key=lambda link: link["tag"]):
+        entities = [{"type": link["entity_type"], "id": link["entity_id"]} for link in links]
+        tag_index.append({"tag": tag, "count": len(entities), "entities": entities})
+
+    tag_index.sort(key=lambda entry: (-entry["count"], entry["tag"]))
+    return tag_index
+
+
+def export_daily_facts(db_manager, tasks_data, github_data):
+    """Export one compact row per day combining the database's daily facts
+    with task completions and GitHub commits, which are fetched at export time"""
+    tasks_completed = defaultdict(int)
+    for task in tasks_data:
+        if task.get("status") == "completed" and task.get("completed_date"):
+            tasks_completed[task["completed_date"][:10]] += 1
+    commits = {entry["date"]: entry["count"] for entry in github_data["heatmap_data"]}
+
+    facts = {fact["date"]: fact for fact in db_manager.iter_daily_facts()}
+    columns = [
+        "date", "habit_completion", "habits_completed", "habits_total", "metrics",
+        "reviews", "review_time_ms", "captures", "tasks_completed", "commits",
+    ]
+    rows = []
+    for date in sorted(set(facts) | set(tasks_completed) | set(commits)):
+        fact = facts.get(date, {})
+        rows.append(
+            [date]
+            + [fact.get(column) for column in columns[1:8]]
+            + [tasks_completed.get(date, 0), commits.get(date, 0)]
+        )
+
+    return {"columns": columns, "rows": rows}
+
+
 def export_github_data():
     """Export GitHub commit data for static generation"""
     username = "MattHandzel"
@@ -147,12 +296,37 @@ def export_github_data():
         }
 
 
-def export_static_data():
-    """Export database data to static JSON files for Next.js static generation"""
-    print("Exporting database data to static JSON files...")
+def _read_json(path, default):
+    """The contents of a file an earlier export wrote, or default if there is none"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def export_static_data(tables=None, vault_files=()):
+    """Export database data to static JSON files for Next.js static generation
+
+    Given tables, a set of changed table names, only the files EXPORT_TABLES
+    lists as depending on one of them are written again, plus the VAULT_FILES
+    outputs named in vault_files; every other file keeps its last export.
+    """
+    full = tables is None
+
+    def wanted(name):
+        if name in VAULT_FILES:
+            return full or name in vault_files
+        return full or not tables.isdisjoint(EXPORT_TABLES[name])
+
+    if full:
+        print("Exporting database data to static JSON files...")
+    else:
+        print(f"Re-exporting data for changes in: {', '.join(sorted(tables) + sorted(vault_files))}")
 
     base_dir = Path(__file__).parent.parent
-    db_path = base_dir / "database" / "website.db"
+    config = Config()
+    db_path = config.get_database_path()
     output_dir = base_dir / "website" / "data"
 
     output_dir.mkdir(exist_ok=True)
@@ -162,228 +336,314 @@ def export_static_data():
         print("Please run 'python main.py' first to populate the database")
         sys.exit(1)
 
-    db_manager = DatabaseManager(str(db_path))
-
-    print("Exporting content data...")
-    content_data = db_manager.get_content()
-    with open(output_dir / "content.json", "w") as f:
-        json.dump(content_data, f, indent=2, default=str)
-    print(f"Exported {len(content_data)} content items")
-
-    print("Exporting habits data...")
-    habits_data = db_manager.get_habits(limit=10000)
-    with open(output_dir / "habits.json", "w") as f:
-        json.dump(habits_data, f, indent=2, default=str)
-    print(f"Exported {len(habits_data)} habit entries")
-
-    print("Exporting financial data...")
-    financial_data = db_manager.get_financial_data()
-    with open(output_dir / "financial.json", "w") as f:
-        json.dump(financial_data, f, indent=2, default=str)
-    print(f"Exported {len(financial_data)} financial entries")
-
-    print("Exporting metrics data...")
-    metrics_data = db_manager.get_metrics(limit=10000)
-    with open(output_dir / "metrics.json", "w") as f:
-        json.dump(metrics_data, f, indent=2, default=str)
-    print(f"Exported {len(metrics_data)} metric entries")
-
-    print("Exporting communities data...")
-    communities_data = db_manager.get_communities()
-    with open(output_dir / "communities.json", "w") as f:
-        json.dump(communities_data, f, indent=2, default=str)
-    print(f"Exported {len(communities_data)} community entries")
-
-    print("Exporting Anki data...")
-    anki_data = db_manager.get_anki_reviews(limit=10000)
-    with open(output_dir / "anki.json", "w") as f:
-        json.dump(anki_data, f, indent=2, default=str)
-    print(f"Exported {len(anki_data)} Anki review entries")
-
-    print("Exporting blog data...")
-    blog_data = db_manager.get_content(content_type="blog")
-    with open(output_dir / "blog.json", "w") as f:
-        json.dump(blog_data, f, indent=2, default=str)
-    print(f"Exported {len(blog_data)} blog posts")
-
-    print("Exporting thoughts data...")
-    thoughts_data = db_manager.get_thoughts(limit=10000)
-    with open(output_dir / "thoughts.json", "w") as f:
-        json.dump(thoughts_data, f, indent=2, default=str)
-    print(f"Exported {len(thoughts_data)} thoughts")
-
-    print("Exporting dailies timeline data...")
-    dailies_timeline = export_dailies_timeline(db_manager)
-    with open(output_dir / "dailies_timeline.json", "w") as f:
-        json.dump(dailies_timeline, f, indent=2, default=str)
-    print(f"Exported {len(dailies_timeline)} dailies timeline entries")
-
-    print("Exporting GitHub data...")
-    github_data = export_github_data()
-    with open(output_dir / "github.json", "w") as f:
-        json.dump(github_data, f, indent=2, default=str)
-    print(f"Exported GitHub data with {github_data['total_commits']} commits")
-
-    print("Exporting books data...")
-    books_data = db_manager.get_content(content_type="book")
-    with open(output_dir / "books.json", "w") as f:
-        json.dump(books_data, f, indent=2, default=str)
-    print(f"Exported {len(books_data)} book entries")
-
-    print("Exporting events data...")
-    events_data = db_manager.get_events(limit=10000)
-    with open(output_dir / "events.json", "w") as f:
-        json.dump(events_data, f, indent=2, default=str)
-    print(f"Exported {len(events_data)} event entries")
-
-    print("Exporting principles data...")
-    principles_data = db_manager.get_principles()
-    with open(output_dir / "principles.json", "w") as f:
-        json.dump(principles_data, f, indent=2, default=str)
-    print(f"Exported {len(principles_data)} principles")
-
-    print("Exporting projects data...")
-    projects_data = db_manager.get_projects()
-    with open(output_dir / "projects.json", "w") as f:
-        json.dump(projects_data, f, indent=2, default=str)
-    print(f"Exported {len(projects_data)} projects")
-
-    print("Exporting TaskWarrior data...")
-    # Export tasks directly from TaskWarrior
-    try:
-        taskwarrior_parser = TaskWarriorParser(db_manager)
-        tasks_data = taskwarrior_parser.export_tasks()
-    except Exception as e:
-        print(f"Error exporting TaskWarrior data: {e}")
-        tasks_data = []
-    
-    with open(output_dir / "tasks.json", "w") as f:
-        json.dump(tasks_data, f, indent=2, default=str)
-    print(f"Exported {len(tasks_data)} tasks")
-
-    print("Exporting project ideas data...")
-    # Parse ideas file directly
-    try:
-        config = Config()
-        ideas_parser = IdeasParser(db_manager)
-        ideas_file_path = config.data.get('ideas', {}).get('file_path', 'projects/ideas.md')
-        ideas_full_path = config.get_vault_base_path() / ideas_file_path
-        if ideas_full_path.exists():
-            ideas_data = ideas_parser.parse_ideas_file(ideas_full_path)
-        else:
-            print(f"Ideas file not found at {ideas_full_path}")
+    profile = config.data["database"].get("export_profile", "export-read")
+    db_manager = DatabaseManager(str(db_path), profile=profile)
+    # export_metadata.json counts, by export
+    counts = {}
+
+    if wanted("content.json"):
+        # List files carry headers only; bodies go to *_bodies.json keyed by id
+        print("Exporting content data...")
+        content_data = db_manager.get_content_headers()
+        with open(output_dir / "content.json", "w") as f:
+            json.dump(content_data, f, indent=2, default=str)
+        content_bodies_count = write_json_object(
+            output_dir / "content_bodies.json", db_manager.iter_content_bodies()
+        )
+        print(f"Exported {len(content_data)} content items and {content_bodies_count} bodies")
+        counts.update({
+            "content": len(content_data),
+            "content_bodies": content_bodies_count,
+        })
+
+    if wanted("habits.json"):
+        print("Exporting habits data...")
+        habits_count = write_json_array(
+            output_dir / "habits.json",
+            db_manager.iter_records("habits", limit=10000, parse_json=False),
+        )
+        print(f"Exported {habits_count} habit entries")
+        counts["habits"] = habits_count
+
+    if wanted("financial.json"):
+        print("Exporting financial data...")
+        financial_data = db_manager.get_financial_data()
+        with open(output_dir / "financial.json", "w") as f:
+            json.dump(financial_data, f, indent=2, default=str)
+        print(f"Exported {len(financial_data)} financial entries")
+        counts["financial"] = len(financial_data)
+
+    if wanted("metrics.json"):
+        print("Exporting metrics data...")
+        metrics_count = write_json_array(
+            output_dir / "metrics.json",
+            db_manager.iter_records("metrics", limit=10000, parse_json=False),
+        )
+        print(f"Exported {metrics_count} metric entries")
+        counts["metrics"] = metrics_count
+
+    if wanted("communities.json"):
+        print("Exporting communities data...")
+        communities_data = db_manager.get_communities()
+        with open(output_dir / "communities.json", "w") as f:
+            json.dump(communities_data, f, indent=2, default=str)
+        print(f"Exported {len(communities_data)} community entries")
+        counts["communities"] = len(communities_data)
+
+    if wanted("anki.json"):
+        print("Exporting Anki data...")
+        anki_count = write_json_array(
+            output_dir / "anki.json",
+            db_manager.iter_records("anki_reviews", limit=10000, parse_json=False),
+        )
+        print(f"Exported {anki_count} Anki review entries")
+        counts["anki"] = anki_count
+
+    if wanted("blog.json"):
+        print("Exporting blog data...")
+        blog_data = db_manager.get_content_headers(content_type="blog")
+        # The blog list previews each post, so it gets an excerpt, not the body
+        bodies = dict(db_manager.iter_content_bodies(content_type="blog"))
+        for post in blog_data:
+            post["excerpt"] = (bodies.get(post["id"]) or "")[:BLOG_EXCERPT_LENGTH]
+        with open(output_dir / "blog.json", "w") as f:
+            json.dump(blog_data, f, indent=2, default=str)
+        print(f"Exported {len(blog_data)} blog posts")
+        counts["blog"] = len(blog_data)
+
+    if wanted("thoughts.json"):
+        print("Exporting thoughts data...")
+        thoughts_count = write_json_array(
+            output_dir / "thoughts.json",
+            db_manager.iter_records("thoughts", limit=10000, parse_json=False),
+        )
+        print(f"Exported {thoughts_count} thoughts")
+        counts["thoughts"] = thoughts_count
+
+    if wanted("dailies_timeline.json"):
+        print("Exporting dailies timeline data...")
+        dailies_timeline = export_dailies_timeline(db_manager)
+        with open(output_dir / "dailies_timeline.json", "w") as f:
+            json.dump(dailies_timeline, f, indent=2, default=str)
+        print(f"Exported {len(dailies_timeline)} dailies timeline entries")
+        counts["dailies_timeline"] = len(dailies_timeline)
+
+    if wanted("rollups.json"):
+        print("Exporting rollup data...")
+        rollups_data = export_rollups(db_manager)
+        with open(output_dir / "rollups.json", "w") as f:
+            json.dump(rollups_data, f, indent=2, default=str)
+        rollups_count = sum(len(rows) for periods in rollups_data.values() for rows in periods.values())
+        print(f"Exported {rollups_count} rollup rows")
+        counts["rollups"] = rollups_count
+
+    if full:
+        print("Exporting GitHub data...")
+        github_data = export_github_data()
+        with open(output_dir / "github.json", "w") as f:
+            json.dump(github_data, f, indent=2, default=str)
+        print(f"Exported GitHub data with {github_data['total_commits']} commits")
+        counts["github_commits"] = github_data["total_commits"]
+    else:
+        # daily_facts.json reuses the commits of the last full export
+        github_data = _read_json(output_dir / "github.json", {"heatmap_data": [], "total_commits": 0})
+
+    if wanted("books.json"):
+        print("Exporting books data...")
+        books_data = db_manager.get_content_headers(content_type="book")
+        with open(output_dir / "books.json", "w") as f:
+            json.dump(books_data, f, indent=2, default=str)
+        print(f"Exported {len(books_data)} book entries")
+        counts["books"] = len(books_data)
+
+    if wanted("events.json"):
+        print("Exporting events data...")
+        events_data = db_manager.get_events(limit=10000)
+        with open(output_dir / "events.json", "w") as f:
+            json.dump(events_data, f, indent=2, default=str)
+        print(f"Exported {len(events_data)} event entries")
+        counts["events"] = len(events_data)
+
+    if wanted("map_clusters.json"):
+        print("Exporting map clusters...")
+        map_clusters = db_manager.map_clusters()
+        with open(output_dir / "map_clusters.json", "w") as f:
+            json.dump(map_clusters, f, indent=2, default=str)
+        print(f"Exported map clusters for {len(map_clusters)} zoom levels")
+
+    if wanted("principles.json"):
+        print("Exporting principles data...")
+        principles_data = db_manager.get_principles()
+        with open(output_dir / "principles.json", "w") as f:
+            json.dump(principles_data, f, indent=2, default=str)
+        print(f"Exported {len(principles_data)} principles")
+
+    if wanted("principles_tree.json"):
+        print("Exporting principles tree...")
+        principles_tree = db_manager.get_principle_tree()
+        with open(output_dir / "principles_tree.json", "w") as f:
+            json.dump(principles_tree, f, indent=2, default=str)
+        print(f"Exported {len(principles_tree)} top-level principles")
+
+    if wanted("projects.json"):
+        print("Exporting projects data...")
+        projects_data = db_manager.get_project_headers()
+        with open(output_dir / "projects.json", "w") as f:
+            json.dump(projects_data, f, indent=2, default=str)
+        project_bodies_count = write_json_object(
+            output_dir / "project_bodies.json", db_manager.iter_project_bodies()
+        )
+        print(f"Exported {len(projects_data)} projects and {project_bodies_count} bodies")
+        counts.update({
+            "projects": len(projects_data),
+            "project_bodies": project_bodies_count,
+        })
+
+    if wanted("tags.json"):
+        print("Exporting tag index...")
+        tag_index = export_tag_index(db_manager)
+        with open(output_dir / "tags.json", "w") as f:
+            json.dump(tag_index, f, indent=2, default=str)
+        print(f"Exported {len(tag_index)} tags")
+        counts["tags"] = len(tag_index)
+
+    if full:
+        print("Exporting TaskWarrior data...")
+        # Export tasks directly from TaskWarrior
+        try:
+            taskwarrior_parser = TaskWarriorParser(db_manager)
+            tasks_data = taskwarrior_parser.export_tasks()
+        except Exception as e:
+            print(f"Error exporting TaskWarrior data: {e}")
+            tasks_data = []
+        
+        with open(output_dir / "tasks.json", "w") as f:
+            json.dump(tasks_data, f, indent=2, default=str)
+        print(f"Exported {len(tasks_data)} tasks")
+        counts["tasks"] = len(tasks_data)
+    else:
+        tasks_data = _read_json(output_dir / "tasks.json", [])
+
+    # These files are read from the vault at export time, not from the database
+    vault_paths = vault_file_paths(config)
+    if wanted("ideas.json"):
+        print("Exporting project ideas data...")
+        # Parse ideas file directly
+        try:
+            ideas_parser = IdeasParser(db_manager)
+            ideas_full_path = vault_paths["ideas.json"]
+            if ideas_full_path.exists():
+                ideas_data = ideas_parser.parse_ideas_file(ideas_full_path)
+            else:
+                print(f"Ideas file not found at {ideas_full_path}")
+                ideas_data = []
+        except Exception as e:
+            print(f"Error parsing ideas: {e}")
             ideas_data = []
-    except Exception as e:
-        print(f"Error parsing ideas: {e}")
-        ideas_data = []
-    
-    with open(output_dir / "ideas.json", "w") as f:
-        json.dump(ideas_data, f, indent=2, default=str)
-    print(f"Exported {len(ideas_data)} project ideas")
-
-    print("Exporting line dancing data...")
-    # Parse line dancing file directly
-    try:
-        config = Config()
-        line_dancing_parser = LineDancingParser(db_manager)
-        line_dancing_file_path = config.data.get('line_dancing', {}).get('file_path', 'resources/line-dances-i-know.md')
-        line_dancing_full_path = config.get_vault_base_path() / line_dancing_file_path
-        if line_dancing_full_path.exists():
-            line_dancing_data = line_dancing_parser.parse_line_dancing_file(line_dancing_full_path)
-        else:
-            print(f"Line dancing file not found at {line_dancing_full_path}")
+        
+        with open(output_dir / "ideas.json", "w") as f:
+            json.dump(ideas_data, f, indent=2, default=str)
+        print(f"Exported {len(ideas_data)} project ideas")
+        counts["ideas"] = len(ideas_data)
+
+    if wanted("line_dancing.json"):
+        print("Exporting line dancing data...")
+        # Parse line dancing file directly
+        try:
+            line_dancing_parser = LineDancingParser(db_manager)
+            line_dancing_full_path = vault_paths["line_dancing.json"]
+            if line_dancing_full_path.exists():
+                line_dancing_data = line_dancing_parser.parse_line_dancing_file(line_dancing_full_path)
+            else:
+                print(f"Line dancing file not found at {line_dancing_full_path}")
+                line_dancing_data = {"dances_i_know": [], "dances_to_learn": []}
+        except Exception as e:
+            print(f"Error parsing line dancing: {e}")
             line_dancing_data = {"dances_i_know": [], "dances_to_learn": []}
-    except Exception as e:
-        print(f"Error parsing line dancing: {e}")
-        line_dancing_data = {"dances_i_know": [], "dances_to_learn": []}
-    
-    with open(output_dir / "line_dancing.json", "w") as f:
-        json.dump(line_dancing_data, f, indent=2, default=str)
-    print(f"Exported {len(line_dancing_data['dances_i_know'])} dances I know and {len(line_dancing_data['dances_to_learn'])} dances to learn")
-
-    print("Exporting standards data...")
-    # Parse standards file directly
-    try:
-        config = Config()
-        standards_parser = StandardsParser(db_manager)
-        standards_file_path = config.data.get('standards', {}).get('file_path', 'resources/standards.md')
-        standards_full_path = config.get_vault_base_path() / standards_file_path
-        if standards_full_path.exists():
-            standards_data = standards_parser.parse_standards_file(standards_full_path)
-        else:
-            print(f"Standards file not found at {standards_full_path}")
+        
+        with open(output_dir / "line_dancing.json", "w") as f:
+            json.dump(line_dancing_data, f, indent=2, default=str)
+        print(f"Exported {len(line_dancing_data['dances_i_know'])} dances I know and {len(line_dancing_data['dances_to_learn'])} dances to learn")
+        counts.update({
+            "line_dancing_known": len(line_dancing_data["dances_i_know"]),
+            "line_dancing_to_learn": len(line_dancing_data["dances_to_learn"]),
+        })
+
+    if wanted("standards.json"):
+        print("Exporting standards data...")
+        # Parse standards file directly
+        try:
+            standards_parser = StandardsParser(db_manager)
+            standards_full_path = vault_paths["standards.json"]
+            if standards_full_path.exists():
+                standards_data = standards_parser.parse_standards_file(standards_full_path)
+            else:
+                print(f"Standards file not found at {standards_full_path}")
+                standards_data = {"title": "Standards", "content": "", "created_date": "", "last_edited_date": ""}
+        except Exception as e:
+            print(f"Error parsing standards: {e}")
             standards_data = {"title": "Standards", "content": "", "created_date": "", "last_edited_date": ""}
-    except Exception as e:
-        print(f"Error parsing standards: {e}")
-        standards_data = {"title": "Standards", "content": "", "created_date": "", "last_edited_date": ""}
-    
-    with open(output_dir / "standards.json", "w") as f:
-        json.dump(standards_data, f, indent=2, default=str)
-    print(f"Exported standards document")
-
-    print("Exporting failures data...")
-    # Parse failures file directly
-    try:
-        config = Config()
-        failures_parser = FailuresParser(db_manager)
-        failures_file_path = config.data.get('failures', {}).get('file_path', 'areas/self-mastery/failures.md')
-        failures_full_path = config.get_vault_base_path() / failures_file_path
-        if failures_full_path.exists():
-            failures_data = failures_parser.parse_failures_file(failures_full_path)
-        else:
-            print(f"Failures file not found at {failures_full_path}")
+        
+        with open(output_dir / "standards.json", "w") as f:
+            json.dump(standards_data, f, indent=2, default=str)
+        print(f"Exported standards document")
+
+    if wanted("failures.json"):
+        print("Exporting failures data...")
+        # Parse failures file directly
+        try:
+            failures_parser = FailuresParser(db_manager)
+            failures_full_path = vault_paths["failures.json"]
+            if failures_full_path.exists():
+                failures_data = failures_parser.parse_failures_file(failures_full_path)
+            else:
+                print(f"Failures file not found at {failures_full_path}")
+                failures_data = []
+        except Exception as e:
+            print(f"Error parsing failures: {e}")
             failures_data = []
-    except Exception as e:
-        print(f"Error parsing failures: {e}")
-        failures_data = []
-    
-    with open(output_dir / "failures.json", "w") as f:
-        json.dump(failures_data, f, indent=2, default=str)
-    print(f"Exported {len(failures_data)} failures")
-
-    print("Exporting victories data...")
-    # Parse victories file directly
-    try:
-        config = Config()
-        victories_parser = VictoriesParser(db_manager)
-        victories_file_path = config.data.get('victories', {}).get('file_path', 'areas/personal-brand/website/victories.md')
-        victories_full_path = config.get_vault_base_path() / victories_file_path
-        if victories_full_path.exists():
-            victories_data = victories_parser.parse_victories_file(victories_full_path)
-        else:
-            print(f"Victories file not found at {victories_full_path}")
+        
+        with open(output_dir / "failures.json", "w") as f:
+            json.dump(failures_data, f, indent=2, default=str)
+        print(f"Exported {len(failures_data)} failures")
+        counts["failures"] = len(failures_data)
+
+    if wanted("victories.json"):
+        print("Exporting victories data...")
+        # Parse victories file directly
+        try:
+            victories_parser = VictoriesParser(db_manager)
+            victories_full_path = vault_paths["victories.json"]
+            if victories_full_path.exists():
+                victories_data = victories_parser.parse_victories_file(victories_full_path)
+            else:
+                print(f"Victories file not found at {victories_full_path}")
+                victories_data = []
+        except Exception as e:
+            print(f"Error parsing victories: {e}")
             victories_data = []
-    except Exception as e:
-        print(f"Error parsing victories: {e}")
-        victories_data = []
-    
-    with open(output_dir / "victories.json", "w") as f:
-        json.dump(victories_data, f, indent=2, default=str)
-    print(f"Exported {len(victories_data)} victories")
-
+        
+        with open(output_dir / "victories.json", "w") as f:
+            json.dump(victories_data, f, indent=2, default=str)
+        print(f"Exported {len(victories_data)} victories")
+        counts["victories"] = len(victories_data)
+
+    if wanted("daily_facts.json"):
+        print("Exporting daily facts...")
+        daily_facts = export_daily_facts(db_manager, tasks_data, github_data)
+        with open(output_dir / "daily_facts.json", "w") as f:
+            json.dump(daily_facts, f, separators=(",", ":"), default=str)
+        print(f"Exported facts for {len(daily_facts['rows'])} days")
+        counts["daily_facts"] = len(daily_facts["rows"])
+
+    # Files a partial export skipped keep the counts of the export that wrote them
+    export_counts = {} if full else _read_json(
+        output_dir / "export_metadata.json", {}
+    ).get("export_counts", {})
+    export_counts.update(counts)
     export_metadata = {
         "last_updated": datetime.now().isoformat(),
-        "export_counts": {
-            "content": len(content_data),
-            "habits": len(habits_data),
-            "financial": len(financial_data),
-            "metrics": len(metrics_data),
-            "communities": len(communities_data),
-            "anki": len(anki_data),
-            "blog": len(blog_data),
-            "thoughts": len(thoughts_data),
-            "dailies_timeline": len(dailies_timeline),
-            "books": len(books_data),
-            "events": len(events_data),
-            "projects": len(projects_data),
-            "tasks": len(tasks_data),
-            "ideas": len(ideas_data),
-            "line_dancing_known": len(line_dancing_data["dances_i_know"]),
-            "line_dancing_to_learn": len(line_dancing_data["dances_to_learn"]),
-            "github_commits": github_data["total_commits"],
-            "failures": len(failures_data),
-            "victories": len(victories_data),
-        },
+        "export_counts": export_counts,
     }
 
     with open(output_dir / "export_metadata.json", "w") as f:
@@ -1,12 +1,17 @@
 #!/usr/bin/env python3
 
 import sys
+import time
 import argparse
 import logging
 from pathlib import Path
 from datetime import datetime
 from config import Config
-from database.schema import DatabaseManager
+from database.codec import DEFAULT_THRESHOLD
+from database.manifest import DEFAULT_MODE as DEFAULT_MANIFEST_MODE
+from database.schema import DatabaseManager, DEFAULT_BATCH_SIZE, DEFAULT_WRITE_MODE
+from database.shadow import finalize, shadow_build
+from database.writer import run_parallel
 from parsers.content_parser import ContentParser
 from parsers.habits_parser import HabitsParser
 from parsers.financial_parser import FinancialParser
@@ -19,6 +24,8 @@ from parsers.events_parser import EventsParser
 from parsers.principles_parser import PrinciplesParser
 from parsers.projects_parser import ProjectsParser
 from parsers.ideas_parser import IdeasParser
+from parsers.vault_index import VaultIndex
+from watcher import open_watcher, wait_for_changes, vault_directories, directory_keys
 
 
 def setup_logging(enable_logging):
@@ -49,123 +56,41 @@ def parse_start_date(date_str):
             raise ValueError(f"Invalid date format: {date_str}. Use YYYY-MM-DD format.")
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Process markdown files from Obsidian vault"
-    )
-    parser.add_argument("--log", action="store_true", help="Enable detailed logging")
-    parser.add_argument(
-        "--start-date",
-        type=str,
-        help="Only process files created/modified on or after this date (YYYY-MM-DD format)",
-    )
-    args = parser.parse_args()
-
-    logger = setup_logging(args.log)
-
-    print("Starting markdown processing pipeline...")
-    if args.log:
-        logger.info("Detailed logging enabled")
-
-    start_date = None
-    if args.start_date:
-        try:
-            start_date = parse_start_date(args.start_date)
-            print(
-                f"Date filtering enabled: processing files from {start_date.strftime('%Y-%m-%d')} onwards"
-            )
-            if args.log:
-                logger.info(f"Start date filter: {start_date}")
-        except ValueError as e:
-            logger.error(f"Date parsing error: {e}")
-            print(f"Error: {e}")
-            sys.exit(1)
-
-    try:
-        logger.debug("Loading configuration...")
-        config = Config()
-        print(f"Loaded config from {config.config_path}")
-        print(f"Vault base path: {config.get_vault_base_path()}")
-        logger.debug(f"Config data: {config.data}")
-
-        for dir_key in config.data["vault"]["directories"]:
-            dir_path = config.get_directory_path(dir_key)
-            logger.debug(
-                f"Directory '{dir_key}' -> {dir_path} (exists: {dir_path.exists()})"
-            )
-
-    except FileNotFoundError as e:
-        logger.error(f"Configuration error: {e}")
-        print(f"Error: {e}")
-        sys.exit(1)
-
-    logger.debug(f"Database path: {config.get_database_path()}")
-    db_manager = DatabaseManager(str(config.get_database_path()))
-    print("Database initialized")
-
-    content_parser = ContentParser(
-        db_manager, start_date=start_date, logger=logger if args.log else None
-    )
-    habits_parser = HabitsParser(
-        db_manager, start_date=start_date, logger=logger if args.log else None
-    )
-    financial_parser = FinancialParser(
-        db_manager, start_date=start_date, logger=logger if args.log else None
-    )
-    metrics_parser = MetricsParser(
-        db_manager, start_date=start_date, logger=logger if args.log else None
-    )
-    communities_parser = CommunitiesParser(
-        db_manager, start_date=start_date, logger=logger if args.log else None
-    )
-    anki_parser = AnkiParser(
-        db_manager, start_date=start_date, logger=logger if args.log else None
-    )
-    thoughts_parser = ThoughtsParser(
-        db_manager, start_date=start_date, logger=logger if args.log else None
-    )
-    books_parser = BooksParser(
-        db_manager, start_date=start_date, logger=logger if args.log else None
-    )
-    events_parser = EventsParser(config)
-    principles_parser = PrinciplesParser(
-        db_manager, start_date=start_date, logger=logger if args.log else None
-    )
-    excluded_projects = config.data.get('projects', {}).get('excluded_folders', [])
-    projects_parser = ProjectsParser(
-        db_manager, 
-        excluded_folders=excluded_projects,
-        start_date=start_date, 
-        logger=logger if args.log else None
-    )
-    ideas_parser = IdeasParser(
-        db_manager,
-        logger=logger if args.log else None
-    )
-
+# Each step runs one parser: step(db_manager, config, vault_index,
+# start_date, logger, parser_logger). They live at module level so --jobs can
+# send them to worker processes.
+def parse_content(db_manager, config, vault_index, start_date, logger, parser_logger):
     print("\nProcessing content files...")
     content_dir = config.get_directory_path("content")
     logger.debug(f"Content directory: {content_dir}")
-    if content_dir.exists():
+    if vault_index.exists(content_dir):
         logger.info(f"Found content directory at {content_dir}")
-        files_found = list(content_dir.glob("*.md"))
+        files_found = vault_index.files(content_dir, "*.md")
         logger.debug(f"Found {len(files_found)} markdown files in content directory")
         for file in files_found:
             logger.debug(f"  - {file.name}")
+        content_parser = ContentParser(
+            db_manager, start_date=start_date, logger=parser_logger, vault_index=vault_index
+        )
         content_parser.parse_content_files(content_dir)
     else:
         logger.warning(f"Content directory not found at {content_dir}")
         print(f"Warning: Content directory not found at {content_dir}")
 
+
+def parse_blog(db_manager, config, vault_index, start_date, logger, parser_logger):
     print("\nProcessing blog files...")
     blog_dir = config.get_directory_path("blog")
     logger.debug(f"Blog directory: {blog_dir}")
-    if blog_dir.exists():
+    if vault_index.exists(blog_dir):
         logger.info(f"Found blog directory at {blog_dir}")
-        files_found = list(blog_dir.glob("*.md"))
+        files_found = vault_index.files(blog_dir, "*.md")
         logger.debug(f"Found {len(files_found)} markdown files in blog directory")
         for file in files_found:
             logger.debug(f"  - {file.name}")
+        content_parser = ContentParser(
+            db_manager, start_date=start_date, logger=parser_logger, vault_index=vault_index
+        )
         content_parser.parse_blog_files(blog_dir)
     else:
         logger.warning(f"Blog directory not found at {blog_dir}")
@@ -174,15 +99,20 @@ def main():
             "Create the directory and add your blog posts to enable blog functionality"
         )
 
+
+def parse_habits(db_manager, config, vault_index, start_date, logger, parser_logger):
     print("\nProcessing habits files...")
     dailies_dir = config.get_directory_path("dailies")
     logger.debug(f"Dailies directory: {dailies_dir}")
-    if dailies_dir.exists():
+    if vault_index.exists(dailies_dir):
         logger.info(f"Found dailies directory at {dailies_dir}")
-        files_found = list(dailies_dir.glob("*.md"))
+        files_found = vault_index.files(dailies_dir, "*.md")
         logger.debug(f"Found {len(files_found)} markdown files in dailies directory")
         for file in files_found:
             logger.debug(f"  - {file.name}")
+        habits_parser = HabitsParser(
+            db_manager, start_date=start_date, logger=parser_logger, vault_index=vault_index
+        )
         habits_parser.parse_dailies_files(dailies_dir)
     else:
         logger.warning(f"Dailies directory not found at {dailies_dir}")
@@ -191,60 +121,80 @@ def main():
             "Create the directory and add your daily notes to enable habits functionality"
         )
 
+
+def parse_financial(db_manager, config, vault_index, start_date, logger, parser_logger):
     print("\nProcessing financial files...")
     financial_dir = config.get_directory_path("financial")
     logger.debug(f"Financial directory: {financial_dir}")
-    if financial_dir.exists():
+    if vault_index.exists(financial_dir):
         logger.info(f"Found financial directory at {financial_dir}")
-        files_found = list(financial_dir.glob("*.md"))
+        files_found = vault_index.files(financial_dir, "*.md")
         logger.debug(f"Found {len(files_found)} markdown files in financial directory")
         for file in files_found:
             logger.debug(f"  - {file.name}")
+        financial_parser = FinancialParser(
+            db_manager, start_date=start_date, logger=parser_logger, vault_index=vault_index
+        )
         financial_parser.parse_financial_files(financial_dir)
     else:
         logger.warning(f"Financial directory not found at {financial_dir}")
         print(f"Warning: Financial directory not found at {financial_dir}")
 
+
+def parse_metrics(db_manager, config, vault_index, start_date, logger, parser_logger):
     print("\nProcessing metrics files...")
     metrics_dir = config.get_directory_path("metrics")
     logger.debug(f"Metrics directory: {metrics_dir}")
-    if metrics_dir.exists():
+    if vault_index.exists(metrics_dir):
         logger.info(f"Found metrics directory at {metrics_dir}")
-        files_found = list(metrics_dir.glob("*.md"))
+        files_found = vault_index.files(metrics_dir, "*.md")
         logger.debug(f"Found {len(files_found)} markdown files in metrics directory")
         for file in files_found:
             logger.debug(f"  - {file.name}")
+        metrics_parser = MetricsParser(
+            db_manager, start_date=start_date, logger=parser_logger, vault_index=vault_index
+        )
         metrics_parser.parse_metrics_files(metrics_dir)
     else:
         logger.warning(f"Metrics directory not found at {metrics_dir}")
         print(f"Warning: Metrics directory not found at {metrics_dir}")
 
+
+def parse_communities(db_manager, config, vault_index, start_date, logger, parser_logger):
     print("\nProcessing communities files...")
     content_dir = config.get_directory_path("content")
     logger.debug(f"Communities using content directory: {content_dir}")
-    if content_dir.exists():
+    if vault_index.exists(content_dir):
         logger.info(f"Found content directory for communities at {content_dir}")
-        community_files = list(content_dir.glob("communities-i-am-a-part-of.md"))
+        community_files = vault_index.files(content_dir, "communities-i-am-a-part-of.md")
         logger.debug(f"Found {len(community_files)} community files")
         for file in community_files:
             logger.debug(f"  - {file.name}")
+        communities_parser = CommunitiesParser(
+            db_manager, start_date=start_date, logger=parser_logger, vault_index=vault_index
+        )
         communities_parser.parse_communities_files(content_dir)
     else:
         logger.warning(f"Content directory not found at {content_dir}")
         print(f"Warning: Content directory not found at {content_dir}")
 
+
+def parse_anki(db_manager, config, vault_index, start_date, logger, parser_logger):
     print("\nProcessing Anki files...")
     anki_dir = config.get_directory_path("anki")
     logger.debug(f"Anki directory: {anki_dir}")
-    if anki_dir.exists():
+    if vault_index.exists(anki_dir):
         logger.info(f"Found anki directory at {anki_dir}")
-        txt_files = list(anki_dir.glob("*.txt"))
-        db_files = list(anki_dir.glob("*.anki2"))
+        txt_files = vault_index.files(anki_dir, "*.txt")
+        db_files = vault_index.files(anki_dir, "*.anki2")
         logger.debug(
             f"Found {len(txt_files)} .txt files and {len(db_files)} .anki2 files"
         )
         for file in txt_files + db_files:
             logger.debug(f"  - {file.name}")
+        anki_parser = AnkiParser(
+            db_manager, start_date=start_date, logger=parser_logger, vault_index=vault_index
+        )
         anki_parser.parse_anki_files(anki_dir)
     else:
         logger.warning(f"Anki directory not found at {anki_dir}")
@@ -253,15 +203,20 @@ def main():
             "Create the directory and add your Anki exports to enable Anki functionality"
         )
 
+
+def parse_thoughts(db_manager, config, vault_index, start_date, logger, parser_logger):
     print("\nProcessing thoughts files...")
     thoughts_dir = config.get_directory_path("thoughts")
     logger.debug(f"Thoughts directory: {thoughts_dir}")
-    if thoughts_dir.exists():
+    if vault_index.exists(thoughts_dir):
         logger.info(f"Found thoughts directory at {thoughts_dir}")
-        files_found = list(thoughts_dir.glob("*.md"))
+        files_found = vault_index.files(thoughts_dir, "*.md")
         logger.debug(f"Found {len(files_found)} markdown files in thoughts directory")
         for file in files_found:
             logger.debug(f"  - {file.name}")
+        thoughts_parser = ThoughtsParser(
+            db_manager, start_date=start_date, logger=parser_logger, vault_index=vault_index
+        )
         thoughts_parser.parse_thoughts_files(thoughts_dir)
     else:
         logger.warning(f"Thoughts directory not found at {thoughts_dir}")
@@ -270,29 +225,39 @@ def main():
             "Create the directory and add your captured thoughts to enable thoughts functionality"
         )
 
+
+def parse_books(db_manager, config, vault_index, start_date, logger, parser_logger):
     print("\nProcessing books files...")
     books_dir = config.get_directory_path("books")
     logger.debug(f"Books directory: {books_dir}")
-    if books_dir.exists():
+    if vault_index.exists(books_dir):
         logger.info(f"Found books directory at {books_dir}")
-        book_dirs = [d for d in books_dir.iterdir() if d.is_dir()]
+        book_dirs = vault_index.subdirs(books_dir)
         logger.debug(f"Found {len(book_dirs)} book directories")
         for book_dir in book_dirs:
             logger.debug(f"  - {book_dir.name}")
+        books_parser = BooksParser(
+            db_manager, start_date=start_date, logger=parser_logger, vault_index=vault_index
+        )
         books_parser.parse_books_files(books_dir)
     else:
         logger.warning(f"Books directory not found at {books_dir}")
         print(f"Warning: Books directory not found at {books_dir}")
 
+
+def parse_principles(db_manager, config, vault_index, start_date, logger, parser_logger):
     print("\nProcessing principles files...")
     principles_dir = config.get_directory_path("principles")
     logger.debug(f"Principles directory: {principles_dir}")
-    if principles_dir.exists():
+    if vault_index.exists(principles_dir):
         logger.info(f"Found principles directory at {principles_dir}")
-        files_found = list(principles_dir.glob("*.md"))
+        files_found = vault_index.files(principles_dir, "*.md")
         logger.debug(f"Found {len(files_found)} markdown files in principles directory")
         for file in files_found:
             logger.debug(f"  - {file.name}")
+        principles_parser = PrinciplesParser(
+            db_manager, start_date=start_date, logger=parser_logger, vault_index=vault_index
+        )
         principles_parser.parse_principles_files(principles_dir)
     else:
         logger.warning(f"Principles directory not found at {principles_dir}")
@@ -301,22 +266,33 @@ def main():
             "Create the directory and add your book notes to enable books functionality"
         )
 
+
+def parse_events(db_manager, config, vault_index, start_date, logger, parser_logger):
     print("\nProcessing events files...")
-    events_data = events_parser.parse_events()
-    logger.debug(f"Found {len(events_data)} events")
+    events_data = EventsParser(config, db_manager, vault_index=vault_index).parse_events()
+    logger.debug(f"Stored {len(events_data)} new or changed events")
     for event in events_data:
-        logger.debug(f"  - {event['title']} ({event['location']})")
-        db_manager.insert_event(event)
+        logger.debug(f"  - {event.title} ({event.location})")
 
+
+def parse_projects(db_manager, config, vault_index, start_date, logger, parser_logger):
     print("\nProcessing projects...")
     projects_dir = config.get_directory_path("projects")
     logger.debug(f"Projects directory: {projects_dir}")
-    if projects_dir.exists():
+    if vault_index.exists(projects_dir):
         logger.info(f"Found projects directory at {projects_dir}")
-        subdirs = [d for d in projects_dir.iterdir() if d.is_dir()]
+        subdirs = vault_index.subdirs(projects_dir)
         logger.debug(f"Found {len(subdirs)} project folders")
         for subdir in subdirs:
             logger.debug(f"  - {subdir.name}")
+        excluded_projects = config.data.get('projects', {}).get('excluded_folders', [])
+        projects_parser = ProjectsParser(
+            db_manager,
+            excluded_folders=excluded_projects,
+            start_date=start_date,
+            logger=parser_logger,
+            vault_index=vault_index
+        )
         projects_parser.parse_projects(projects_dir)
     else:
         logger.warning(f"Projects directory not found at {projects_dir}")
@@ -325,46 +301,320 @@ def main():
             "Create the directory and add your project folders to enable projects functionality"
         )
 
+
+def parse_ideas(db_manager, config, vault_index, start_date, logger, parser_logger):
     print("\nProcessing project ideas...")
     ideas_file_path = config.data.get('ideas', {}).get('file_path', 'projects/ideas.md')
     ideas_full_path = config.get_vault_base_path() / ideas_file_path
     logger.debug(f"Ideas file path: {ideas_full_path}")
-    if ideas_full_path.exists():
+    if vault_index.exists(ideas_full_path):
         logger.info(f"Found ideas file at {ideas_full_path}")
-        ideas_data = ideas_parser.parse_ideas_file(ideas_full_path)
-        # Store ideas in a global variable for export
-        db_manager.ideas_data = ideas_data
+        return IdeasParser(
+            db_manager, logger=parser_logger, vault_index=vault_index
+        ).parse_ideas_file(ideas_full_path)
     else:
         logger.warning(f"Ideas file not found at {ideas_full_path}")
         print(f"Warning: Ideas file not found at {ideas_full_path}")
-        db_manager.ideas_data = []
+        return []
+
+
+PARSE_STEPS = [
+    parse_content,
+    parse_blog,
+    parse_habits,
+    parse_financial,
+    parse_metrics,
+    parse_communities,
+    parse_anki,
+    parse_thoughts,
+    parse_books,
+    parse_principles,
+    parse_events,
+    parse_projects,
+    parse_ideas,
+]
+
+# Vault directory each step reads, so --watch re-runs only the steps whose
+# directory changed. The ideas file is read again by every full export.
+STEP_DIRECTORIES = {
+    parse_content: "content",
+    parse_blog: "blog",
+    parse_habits: "dailies",
+    parse_financial: "financial",
+    parse_metrics: "metrics",
+    parse_communities: "content",
+    parse_anki: "anki",
+    parse_thoughts: "thoughts",
+    parse_books: "books",
+    parse_principles: "principles",
+    parse_events: "events",
+    parse_projects: "projects",
+}
+
+
+def build_database(config, db_path, start_date, args, logger, steps=PARSE_STEPS, manifest_mode=None,
+                   atomic=False):
+    """Run the parser steps against the database at db_path and return its write_stats
+
+    With atomic, nothing is committed unless every step succeeds.
+    """
+    batch_size = config.data["database"].get("batch_size", DEFAULT_BATCH_SIZE)
+    write_mode = config.data["database"].get("write_mode", DEFAULT_WRITE_MODE)
+    profile = config.data["database"].get("build_profile", "bulk-build")
+    compression = config.data["database"].get("compression")
+    compression_threshold = config.data["database"].get("compression_threshold", DEFAULT_THRESHOLD)
+    logger.debug(f"Database profile: {profile}")
+    # A date-filtered run only sees part of the vault, so it leaves the
+    # manifest alone; --full parses everything but still records it
+    if manifest_mode is None:
+        if start_date:
+            manifest_mode = "off"
+        elif args.full:
+            manifest_mode = "full"
+        else:
+            manifest_mode = DEFAULT_MANIFEST_MODE
+    logger.debug(f"Manifest mode: {manifest_mode}")
+    db_manager = DatabaseManager(
+        str(db_path),
+        batch_size=batch_size,
+        write_mode=write_mode,
+        profile=profile,
+        compression=compression,
+        compression_threshold=compression_threshold,
+        manifest_mode=manifest_mode,
+    )
+    print("Database initialized")
+
+    # The vault is listed once here; parsers query the index instead of globbing
+    vault_index = VaultIndex.build(config)
+    logger.debug(f"Indexed {vault_index.count()} vault entries")
+
+    parser_logger = logger if args.log else None
+    tasks = [
+        (step, (config, vault_index, start_date, logger, parser_logger)) for step in steps
+    ]
+
+    # One session for the whole run: parsers reuse its connection and writes
+    # are committed in batches instead of once per row (or once, if atomic).
+    # With --jobs the parsers run in worker processes and this process does
+    # the writing.
+    with db_manager.session(atomic=atomic):
+        if args.jobs > 1:
+            print(f"Running parsers in {args.jobs} processes")
+            results = run_parallel(
+                db_manager, tasks, args.jobs, initializer=setup_logging, initargs=(args.log,)
+            )
+        else:
+            results = []
+            for step, step_args in tasks:
+                results.append(step(db_manager, *step_args))
+                # Write each parser's buffered rows before the next one starts,
+                # as a worker does, so both paths assign tag and search ids alike
+                db_manager.flush()
+        # Store ideas for export
+        if parse_ideas in steps:
+            db_manager.ideas_data = results[steps.index(parse_ideas)]
 
     print("\nProcessing complete!")
 
+    print("\nWrite summary:")
+    for table, stats in db_manager.write_stats.items():
+        print(
+            f"- {table}: {stats['inserted']} inserted, {stats['updated']} updated, "
+            f"{stats['unchanged']} unchanged, {stats['deleted']} deleted"
+        )
+
+    if db_manager.source_stats:
+        print("\nSource file summary:")
+        for parser_name, stats in db_manager.source_stats.items():
+            print(
+                f"- {parser_name}: {stats['new']} new, {stats['changed']} changed, "
+                f"{stats['unchanged']} unchanged, {stats['removed']} removed"
+            )
+
+    return db_manager.write_stats
+
+
+def changed_tables(write_stats):
+    """Tables a build inserted, updated or deleted rows in"""
+    return {
+        table for table, stats in write_stats.items()
+        if stats['inserted'] or stats['updated'] or stats['deleted']
+    }
+
+
+def watch(config, live_db_path, args, logger, write_stats):
+    """Rebuild and re-export after every burst of vault edits until interrupted
+
+    Each pass re-runs only the steps whose vault directory changed, in one
+    transaction on the live database that a failed pass rolls back, with the
+    manifest skipping their unchanged files. It then re-exports only the JSON
+    files that read the tables the pass wrote, and the files the export reads
+    straight from the vault (VAULT_FILES) when they changed.
+    """
+    # Imported here so a plain build does not need the exporter's dependencies
+    from export_static_data import export_static_data, vault_file_paths
+
+    if (Path(__file__).parent.parent / "website" / "data" / "export_metadata.json").exists():
+        tables = changed_tables(write_stats)
+        if tables:
+            export_static_data(tables)
+    else:
+        export_static_data()
+
+    directories = vault_directories(config)
+    vault_files = vault_file_paths(config)
+    watcher = open_watcher(
+        list(directories.values()) + [path.parent for path in vault_files.values()]
+    )
+    print(f"\nWatching the vault ({watcher.kind}), Ctrl+C to stop")
+    try:
+        while True:
+            changed = wait_for_changes(watcher)
+            started = time.perf_counter()
+            logger.debug(f"Changed: {sorted(str(path) for path in changed)}")
+            keys = directory_keys(directories, changed)
+            steps = [step for step in PARSE_STEPS if STEP_DIRECTORIES.get(step) in keys]
+            files = {name for name, path in vault_files.items() if path in changed}
+            if not steps and not files:
+                continue
+
+            tables = set()
+            if steps:
+                print(f"\nChanges in {', '.join(sorted(keys))}, re-running {len(steps)} parsers")
+                # Passes parse every changed file, whatever --start-date and
+                # --full said for the first build: the manifest keeps them cheap
+                try:
+                    write_stats = build_database(
+                        config, live_db_path, None, args, logger, steps,
+                        manifest_mode=DEFAULT_MANIFEST_MODE, atomic=True,
+                    )
+                except Exception as e:
+                    logger.error(f"Build failed: {e}")
+                    print(f"Error: build failed: {e}")
+                    continue
+                tables = changed_tables(write_stats)
+
+            if tables or files:
+                export_static_data(tables, files)
+            print(
+                f"\nUpdated {', '.join(sorted(tables) + sorted(files)) or 'nothing'} "
+                f"in {time.perf_counter() - started:.2f}s"
+            )
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        watcher.close()
+        # Passes write the live file under the build profile (WAL); leave it a
+        # single self-contained file again, as a build does
+        finalize(live_db_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Process markdown files from Obsidian vault"
+    )
+    parser.add_argument("--log", action="store_true", help="Enable detailed logging")
+    parser.add_argument(
+        "--start-date",
+        type=str,
+        help="Only process files created/modified on or after this date (YYYY-MM-DD format)",
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Build from an empty database instead of a copy of the current one",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-parse every source file instead of only those changed since the last build",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Run the parsers in this many processes; one process still does all the writes",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After the build, keep watching the vault and rebuild and re-export what changes; "
+        "changed files are parsed whatever --start-date says",
+    )
+    parser.add_argument(
+        "--check-query-plans",
+        action="store_true",
+        help="Fail if any getter query needs a full table scan or temp B-tree sort",
+    )
+    args = parser.parse_args()
+
+    logger = setup_logging(args.log)
+
+    print("Starting markdown processing pipeline...")
+    if args.log:
+        logger.info("Detailed logging enabled")
+
+    start_date = None
+    if args.start_date:
+        try:
+            start_date = parse_start_date(args.start_date)
+            print(
+                f"Date filtering enabled: processing files from {start_date.strftime('%Y-%m-%d')} onwards"
+            )
+            if args.log:
+                logger.info(f"Start date filter: {start_date}")
+        except ValueError as e:
+            logger.error(f"Date parsing error: {e}")
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    try:
+        logger.debug("Loading configuration...")
+        config = Config()
+        print(f"Loaded config from {config.config_path}")
+        print(f"Vault base path: {config.get_vault_base_path()}")
+        logger.debug(f"Config data: {config.data}")
+
+        for dir_key in config.data["vault"]["directories"]:
+            dir_path = config.get_directory_path(dir_key)
+            logger.debug(
+                f"Directory '{dir_key}' -> {dir_path} (exists: {dir_path.exists()})"
+            )
+
+    except FileNotFoundError as e:
+        logger.error(f"Configuration error: {e}")
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    live_db_path = config.get_database_path()
+    logger.debug(f"Database path: {live_db_path}")
+    try:
+        # Build into a shadow copy; the live database is only replaced on success
+        with shadow_build(live_db_path, seed=not args.fresh) as build_path:
+            logger.debug(f"Building into {build_path}")
+            write_stats = build_database(config, build_path, start_date, args, logger)
+    except Exception as e:
+        logger.error(f"Build failed: {e}")
+        print(f"Error: build failed, {live_db_path} was left unchanged: {e}")
+        sys.exit(1)
+    print(f"\nDatabase swapped into place at {live_db_path}")
+
+    profile = config.data["database"].get("export_profile", "export-read")
+    db_manager = DatabaseManager(str(live_db_path), profile=profile)
+
     print("\nDatabase summary:")
-    content_items = db_manager.get_content()
-    blog_items = db_manager.get_content(content_type="blog")
-    habits_items = db_manager.get_habits(limit=1000000)
-    financial_items = db_manager.get_financial_data()
-    metrics_items = db_manager.get_metrics(limit=1000000)
-    communities_items = db_manager.get_communities()
-    anki_items = db_manager.get_anki_reviews(limit=1000000)
-    thoughts_items = db_manager.get_thoughts(limit=1000000)
-    books_items = db_manager.get_content(content_type="book")
-    events_items = db_manager.get_events(limit=1000000)
-    projects_items = db_manager.get_projects()
-
-    print(f"- Content items: {len(content_items)}")
-    print(f"- Blog posts: {len(blog_items)}")
-    print(f"- Habit entries: {len(habits_items)}")
-    print(f"- Financial entries: {len(financial_items)}")
-    print(f"- Metric entries: {len(metrics_items)}")
-    print(f"- Community entries: {len(communities_items)}")
-    print(f"- Anki review entries: {len(anki_items)}")
-    print(f"- Thought entries: {len(thoughts_items)}")
-    print(f"- Book entries: {len(books_items)}")
-    print(f"- Event entries: {len(events_items)}")
-    print(f"- Project entries: {len(projects_items)}")
+    print(f"- Content items: {db_manager.count('content')}")
+    print(f"- Blog posts: {db_manager.count('content_by_type', ('blog',))}")
+    print(f"- Habit entries: {db_manager.count('habits')}")
+    print(f"- Financial entries: {db_manager.count('financial_data')}")
+    print(f"- Metric entries: {db_manager.count('metrics')}")
+    print(f"- Community entries: {db_manager.count('communities')}")
+    print(f"- Anki review entries: {db_manager.count('anki_reviews')}")
+    print(f"- Thought entries: {db_manager.count('thoughts')}")
+    print(f"- Book entries: {db_manager.count('content_by_type', ('book',))}")
+    print(f"- Event entries: {db_manager.count('events')}")
+    print(f"- Project entries: {db_manager.count('projects')}")
 
     print("\n--- Principles in Database ---")
     principles = db_manager.get_principles()
@@ -375,6 +625,19 @@ def main():
         print("No principles found in the database.")
     print("-----------------------------")
 
+    if args.check_query_plans:
+        print("\n--- Query plan check ---")
+        problems = db_manager.check_query_plans()
+        for name, details in problems.items():
+            print(f"- {name}: {'; '.join(details)}")
+        if problems:
+            print(f"{len(problems)} getter queries are not served by an index")
+            sys.exit(1)
+        print("All getter queries use an index")
+
+    if args.watch:
+        watch(config, live_db_path, args, logger, write_stats)
+
 
 if __name__ == "__main__":
     main()
@@ -1,53 +1,65 @@
 import csv
-import json
 import sqlite3
 from pathlib import Path
 from datetime import datetime
+from database.records import AnkiReview
+from .utils import file_modified_date
+from .vault_index import VaultIndex
 
 class AnkiParser:
-    def __init__(self, db_manager, start_date=None, logger=None):
+    def __init__(self, db_manager, start_date=None, logger=None, vault_index=None):
         self.db_manager = db_manager
         self.start_date = start_date
         self.logger = logger
+        self.vault_index = vault_index or VaultIndex()
     
     def parse_anki_files(self, anki_dir):
         anki_path = Path(anki_dir)
         
-        for file_path in anki_path.glob("*.txt"):
-            try:
-                self.parse_text_export(file_path)
-            except Exception as e:
-                print(f"Error processing {file_path}: {e}")
+        with self.db_manager.scan('anki', self.vault_index):
+            for file_path in self.vault_index.files(anki_path, "*.txt"):
+                try:
+                    with self.db_manager.source(file_path) as source:
+                        if source.unchanged:
+                            continue
+                        self.parse_text_export(file_path)
+                except Exception as e:
+                    print(f"Error processing {file_path}: {e}")
         
-        for file_path in anki_path.glob("*.db"):
-            try:
-                self.parse_anki_database(file_path)
-            except Exception as e:
-                print(f"Error processing {file_path}: {e}")
+            for file_path in self.vault_index.files(anki_path, "*.db"):
+                try:
+                    with self.db_manager.source(file_path) as source:
+                        if source.unchanged:
+                            continue
+                        self.parse_anki_database(file_path)
+                except Exception as e:
+                    print(f"Error processing {file_path}: {e}")
     
     def parse_text_export(self, file_path):
         print(f"Processing Anki text export: {file_path.name}")
         
+        exported_date = file_modified_date(file_path)
+        
         with open(file_path, 'r', encoding='utf-8') as f:
             reader = csv.reader(f, delimiter='\t')
             
             for i, row in enumerate(reader):
                 if len(row) >= 2:
-                    card_data = {
-                        'id': f"{file_path.stem}_{i}",
-                        'card_id': f"text_export_{i}",
-                        'deck_name': file_path.stem,
-                        'note_content': ' | '.join(row),
-                        'review_date': datetime.now().isoformat(),
-                        'created_date': datetime.now().isoformat(),
-                        'metadata': {
+                    card = AnkiReview(
+                        id=f"{file_path.stem}_{i}",
+                        card_id=f"text_export_{i}",
+                        deck_name=file_path.stem,
+                        note_content=' | '.join(row),
+                        review_date=exported_date,
+                        created_date=datetime.now().isoformat(),
+                        metadata={
                             'source_file': str(file_path),
                             'export_type': 'text',
                             'field_count': len(row)
-                        }
-                    }
+                        },
+                    )
                     
-                    self.db_manager.insert_anki_review(card_data)
+                    self.db_manager.buffer_insert('anki_reviews', card)
     
     def parse_anki_database(self, db_path):
         print(f"Processing Anki database: {db_path.name}")
@@ -76,26 +88,26 @@ class AnkiParser:
                 if self._should_skip_review(review_date):
                     continue
                 
-                review_data = {
-                    'id': str(review_id),
-                    'card_id': str(card_id),
-                    'deck_name': f"deck_{deck_id}" if deck_id else "unknown",
-                    'note_content': note_fields[:200] if note_fields else "",
-                    'review_date': review_date.isoformat(),
-                    'ease_button': ease,
-                    'interval_days': interval if interval > 0 else None,
-                    'previous_interval_days': last_interval if last_interval > 0 else None,
-                    'ease_factor': factor,
-                    'time_spent_ms': time_ms,
-                    'review_type': review_type,
-                    'created_date': datetime.now().isoformat(),
-                    'metadata': {
+                review = AnkiReview(
+                    id=str(review_id),
+                    card_id=str(card_id),
+                    deck_name=f"deck_{deck_id}" if deck_id else "unknown",
+                    note_content=note_fields[:200] if note_fields else "",
+                    review_date=review_date.isoformat(),
+                    ease_button=ease,
+                    interval_days=interval if interval > 0 else None,
+                    previous_interval_days=last_interval if last_interval > 0 else None,
+                    ease_factor=factor,
+                    time_spent_ms=time_ms,
+                    review_type=review_type,
+                    created_date=datetime.now().isoformat(),
+                    metadata={
                         'source_file': str(db_path),
                         'export_type': 'database'
-                    }
-                }
+                    },
+                )
                 
-                self.db_manager.insert_anki_review(review_data)
+                self.db_manager.buffer_insert('anki_reviews', review)
             
             conn.close()
             print(f"Processed {len(reviews)} Anki reviews")
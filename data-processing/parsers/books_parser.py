@@ -1,94 +1,130 @@
-import frontmatter
 import os
+from itertools import islice
 from pathlib import Path
 from datetime import datetime
-from .utils import strip_html_comments
+from database.records import Content
+from .file_map import load_post, map_files
+from .utils import strip_html_comments, file_modified_date, date_string
+from .vault_index import VaultIndex
 
 
 class BooksParser:
-    def __init__(self, db_manager, start_date=None, logger=None):
+    def __init__(self, db_manager, start_date=None, logger=None, vault_index=None):
         self.db_manager = db_manager
         self.start_date = start_date
         self.logger = logger
+        self.vault_index = vault_index or VaultIndex()
 
     def parse_books_files(self, books_dir):
         books_path = Path(books_dir)
 
-        if not books_path.exists():
+        if not self.vault_index.exists(books_path):
             print(f"Books directory not found at {books_path}")
             return
 
-        for book_dir in books_path.iterdir():
-            if not book_dir.is_dir():
-                continue
-
-            book_title = book_dir.name.replace("-", " ").title()
-            book_notes = []
-            has_public_notes = False
-
-            for md_file in book_dir.glob("*.md"):
-                try:
-                    with open(md_file, "r", encoding="utf-8") as f:
-                        post = frontmatter.load(f)
-
-                    public = post.metadata.get("public", False)
-                    if public:
-                        has_public_notes = True
-
-                    note_data = {
-                        "id": f"{book_dir.name}-{md_file.stem}",
-                        "title": post.metadata.get(
-                            "title", md_file.stem.replace("-", " ").title()
-                        ),
-                        "type": "book",
-                        "public": public,
-                        "created_date": post.metadata.get(
-                            "created_date", datetime.now().isoformat()
-                        ),
-                        "last_edited_date": post.metadata.get(
-                            "last_edited_date", datetime.now().isoformat()
-                        ),
-                        "content": strip_html_comments(post.content) if public else "",
-                        "metadata": {
-                            "file_path": str(md_file),
-                            "book_title": post.metadata.get("book_title", book_title),
-                            "author": post.metadata.get("author", ""),
-                            "rating": post.metadata.get("rating"),
-                            "status": post.metadata.get("status", ""),
-                            "tags": post.metadata.get("tags", []),
+        books = [
+            (book_dir, sorted(self.vault_index.files(book_dir, "*.md")))
+            for book_dir in self.vault_index.subdirs(books_path)
+        ]
+
+        with self.db_manager.scan("books", self.vault_index):
+            unchanged = {
+                book_dir
+                for book_dir, md_files in books
+                if self.db_manager.source_unchanged(book_dir, md_files)
+            }
+            # Notes of changed books are read and parsed ahead on a worker
+            # pool, in book and file order
+            loaded = map_files(
+                load_post,
+                [md_file for _, md_files in books for md_file in md_files],
+                skip=lambda md_file: md_file.parent in unchanged,
+            )
+            for book_dir, md_files in books:
+                posts = [future for _, future in islice(loaded, len(md_files))]
+
+                with self.db_manager.source(book_dir, md_files) as source:
+                    if source.unchanged:
+                        continue
+
+                    book_title = book_dir.name.replace("-", " ").title()
+                    book_notes = []
+                    has_public_notes = False
+                    reading_starts = []
+                    reading_ends = []
+
+                    for md_file, future in zip(source.files, posts):
+                        try:
+                            post = future.result() if future is not None else load_post(md_file)
+
+                            public = post.metadata.get("public", False)
+                            if public:
+                                has_public_notes = True
+
+                            note = Content(
+                                id=f"{book_dir.name}-{md_file.stem}",
+                                title=post.metadata.get(
+                                    "title", md_file.stem.replace("-", " ").title()
+                                ),
+                                type="book",
+                                public=public,
+                                created_date=post.metadata.get(
+                                    "created_date", datetime.now().isoformat()
+                                ),
+                                last_edited_date=post.metadata.get(
+                                    "last_edited_date", file_modified_date(md_file)
+                                ),
+                                content=strip_html_comments(post.content) if public else "",
+                                metadata={
+                                    "file_path": str(md_file),
+                                    "book_title": post.metadata.get("book_title", book_title),
+                                    "author": post.metadata.get("author", ""),
+                                    "rating": post.metadata.get("rating"),
+                                    "status": post.metadata.get("status", ""),
+                                    "tags": post.metadata.get("tags", []),
+                                    "book_directory": book_dir.name,
+                                    "note_type": md_file.stem,
+                                },
+                            )
+
+                            book_notes.append(note)
+
+                            # Optional start_date/end_date frontmatter marks when the book was read
+                            if post.metadata.get("start_date"):
+                                reading_starts.append(date_string(post.metadata["start_date"]))
+                            if post.metadata.get("end_date"):
+                                reading_ends.append(date_string(post.metadata["end_date"]))
+
+                        except Exception as e:
+                            print(f"Error processing {md_file}: {e}")
+
+                    if book_notes or True:
+                        book_metadata = {
                             "book_directory": book_dir.name,
-                            "note_type": md_file.stem,
-                        },
-                    }
-
-                    book_notes.append(note_data)
-
-                except Exception as e:
-                    print(f"Error processing {md_file}: {e}")
-
-            if book_notes or True:
-                book_entry = {
-                    "id": f"book-{book_dir.name}",
-                    "title": book_title,
-                    "type": "book",
-                    "public": has_public_notes,
-                    "created_date": datetime.now().isoformat(),
-                    "last_edited_date": datetime.now().isoformat(),
-                    "content": f"Book: {book_title}",
-                    "metadata": {
-                        "book_directory": book_dir.name,
-                        "has_public_notes": has_public_notes,
-                        "notes_count": len(book_notes),
-                    },
-                }
-
-                self.db_manager.insert_content(book_entry)
-                print(
-                    f"Processed book: {book_title} ({len(book_notes)} notes, {has_public_notes and 'has {} public notes' or 'no public notes'})"
-                )
-
-                for note in book_notes:
-                    self.db_manager.insert_content(note)
+                            "has_public_notes": has_public_notes,
+                            "notes_count": len(book_notes),
+                        }
+                        if reading_starts:
+                            book_metadata["reading_start"] = min(reading_starts)
+                            book_metadata["reading_end"] = max(reading_ends) if reading_ends else None
+
+                        book_entry = Content(
+                            id=f"book-{book_dir.name}",
+                            title=book_title,
+                            type="book",
+                            public=has_public_notes,
+                            created_date=datetime.now().isoformat(),
+                            last_edited_date=file_modified_date(book_dir),
+                            content=f"Book: {book_title}",
+                            metadata=book_metadata,
+                        )
+
+                        self.db_manager.insert_many("content", [book_entry] + book_notes)
+                        print(
+                            f"Processed book: {book_title} ({len(book_notes)} notes, {has_public_notes and 'has {} public notes' or 'no public notes'})"
+                        )
+            # Shut the worker pool down
+            loaded.close()
 
     def _should_skip_file(self, metadata, filename):
         if not self.start_date:
@@ -2,47 +2,55 @@ import frontmatter
 import re
 from pathlib import Path
 from datetime import datetime
+from database.records import Community
 from .utils import strip_html_comments
+from .vault_index import VaultIndex
 
 class CommunitiesParser:
-    def __init__(self, db_manager, start_date=None, logger=None):
+    def __init__(self, db_manager, start_date=None, logger=None, vault_index=None):
         self.db_manager = db_manager
         self.start_date = start_date
         self.logger = logger
+        self.vault_index = vault_index or VaultIndex()
     
     def parse_communities_files(self, content_dir):
         content_path = Path(content_dir)
         
-        for md_file in content_path.glob("*communities*.md"):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    post = frontmatter.load(f)
+        with self.db_manager.scan('communities', self.vault_index):
+            for md_file in self.vault_index.files(content_path, "*communities*.md"):
+                try:
+                    with self.db_manager.source(md_file) as source:
+                        if source.unchanged:
+                            continue
+                    
+                        with open(md_file, 'r', encoding='utf-8') as f:
+                            post = frontmatter.load(f)
                 
-                if self._should_skip_file(post.metadata, md_file.name):
-                    continue
+                        if self._should_skip_file(post.metadata, md_file.name):
+                            continue
                 
-                communities = self.extract_communities_table(strip_html_comments(post.content))
+                        communities = self.extract_communities_table(strip_html_comments(post.content))
                 
-                for community in communities:
-                    community_data = {
-                        'id': f"{post.metadata.get('id', md_file.stem)}_{community['name'].lower().replace(' ', '_')}",
-                        'community_name': community['name'],
-                        'description': community['description'],
-                        'personal_affiliation': community['affiliation'],
-                        'what_ive_done': community['what_ive_done'],
-                        'created_date': post.metadata.get('created_date', datetime.now().isoformat()),
-                        'metadata': {
-                            'source_file': str(md_file),
-                            'file_id': post.metadata.get('id', md_file.stem)
-                        }
-                    }
+                        for community in communities:
+                            record = Community(
+                                id=f"{post.metadata.get('id', md_file.stem)}_{community['name'].lower().replace(' ', '_')}",
+                                community_name=community['name'],
+                                description=community['description'],
+                                personal_affiliation=community['affiliation'],
+                                what_ive_done=community['what_ive_done'],
+                                created_date=post.metadata.get('created_date', datetime.now().isoformat()),
+                                metadata={
+                                    'source_file': str(md_file),
+                                    'file_id': post.metadata.get('id', md_file.stem)
+                                },
+                            )
                     
-                    self.db_manager.insert_community(community_data)
+                            self.db_manager.buffer_insert('communities', record)
                 
-                print(f"Processed {len(communities)} communities from {md_file.name}")
+                        print(f"Processed {len(communities)} communities from {md_file.name}")
                 
-            except Exception as e:
-                print(f"Error processing {md_file}: {e}")
+                except Exception as e:
+                    print(f"Error processing {md_file}: {e}")
     
     def _should_skip_file(self, metadata, filename):
         """Check if file should be skipped based on start_date filter"""
@@ -2,92 +2,105 @@ import frontmatter
 import re
 from pathlib import Path
 from datetime import datetime
-from .utils import strip_html_comments
+from database.records import Content
+from .utils import strip_html_comments, file_modified_date
+from .vault_index import VaultIndex
 
 class ContentParser:
-    def __init__(self, db_manager, start_date=None, logger=None):
+    def __init__(self, db_manager, start_date=None, logger=None, vault_index=None):
         self.db_manager = db_manager
         self.start_date = start_date
         self.logger = logger
+        self.vault_index = vault_index or VaultIndex()
     
     def parse_content_files(self, content_dir):
         content_path = Path(content_dir)
         
-        for md_file in content_path.glob("*.md"):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    post = frontmatter.load(f)
+        with self.db_manager.scan('content', self.vault_index):
+            for md_file in self.vault_index.files(content_path, "*.md"):
+                try:
+                    with self.db_manager.source(md_file) as source:
+                        if source.unchanged:
+                            continue
+                    
+                        with open(md_file, 'r', encoding='utf-8') as f:
+                            post = frontmatter.load(f)
                 
-                if self._should_skip_file(post.metadata, md_file.name):
-                    continue
+                        if self._should_skip_file(post.metadata, md_file.name):
+                            continue
                 
-                content_data = {
-                    'id': post.metadata.get('id', md_file.stem),
-                    'title': post.metadata.get('title', md_file.stem.replace('-', ' ').title()),
-                    'type': post.metadata.get('type', 'content'),
-                    'public': post.metadata.get('public', True),
-                    'created_date': post.metadata.get('created_date', datetime.now().isoformat()),
-                    'last_edited_date': post.metadata.get('last_edited_date', datetime.now().isoformat()),
-                    'content': strip_html_comments(post.content),
-                    'metadata': {
-                        'file_path': str(md_file),
-                        'aliases': post.metadata.get('aliases', []),
-                        'tags': post.metadata.get('tags', [])
-                    }
-                }
+                        entry = Content(
+                            id=post.metadata.get('id', md_file.stem),
+                            title=post.metadata.get('title', md_file.stem.replace('-', ' ').title()),
+                            type=post.metadata.get('type', 'content'),
+                            public=post.metadata.get('public', True),
+                            created_date=post.metadata.get('created_date', datetime.now().isoformat()),
+                            last_edited_date=post.metadata.get('last_edited_date', file_modified_date(md_file)),
+                            content=strip_html_comments(post.content),
+                            metadata={
+                                'file_path': str(md_file),
+                                'aliases': post.metadata.get('aliases', []),
+                                'tags': post.metadata.get('tags', [])
+                            },
+                        )
                 
-                self.db_manager.insert_content(content_data)
-                print(f"Processed content: {content_data['title']}")
-                if md_file.name == "about-this-site.md":
-                    print("SUCCESS: about-this-site.md was parsed and added to the database.")
+                        self.db_manager.insert_content(entry)
+                        print(f"Processed content: {entry.title}")
+                        if md_file.name == "about-this-site.md":
+                            print("SUCCESS: about-this-site.md was parsed and added to the database.")
                 
-            except Exception as e:
-                print(f"Error processing {md_file}: {e}")
+                except Exception as e:
+                    print(f"Error processing {md_file}: {e}")
     
     def parse_blog_files(self, blog_dir):
         blog_path = Path(blog_dir)
         
-        for md_file in blog_path.glob("*.md"):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    post = frontmatter.load(f)
+        with self.db_manager.scan('blog', self.vault_index):
+            for md_file in self.vault_index.files(blog_path, "*.md"):
+                try:
+                    with self.db_manager.source(md_file) as source:
+                        if source.unchanged:
+                            continue
+                    
+                        with open(md_file, 'r', encoding='utf-8') as f:
+                            post = frontmatter.load(f)
                 
-                public = post.metadata.get('public', False)
-                if not public:
-                    print(f"Skipping private blog post: {md_file.name}")
-                    continue
+                        public = post.metadata.get('public', False)
+                        if not public:
+                            print(f"Skipping private blog post: {md_file.name}")
+                            continue
                 
-                if self._should_skip_file(post.metadata, md_file.name):
-                    continue
+                        if self._should_skip_file(post.metadata, md_file.name):
+                            continue
                 
-                content_data = {
-                    'id': post.metadata.get('id', md_file.stem),
-                    'title': post.metadata.get('title', md_file.stem.replace('-', ' ').title()),
-                    'type': 'blog',
-                    'public': public,
-                    'created_date': post.metadata.get('created_date', datetime.now().isoformat()),
-                    'last_edited_date': post.metadata.get('last_edited_date', datetime.now().isoformat()),
-                    'content': strip_html_comments(post.content),
-                    'metadata': {
-                        'file_path': str(md_file),
-                        'aliases': post.metadata.get('aliases', []),
-                        'tags': post.metadata.get('tags', []),
-                        'author': post.metadata.get('author', ''),
-                        'status': post.metadata.get('status', 'draft'),
-                        'reading_time_minutes': post.metadata.get('reading_time_minutes'),
-                        'excerpt': post.metadata.get('excerpt', ''),
-                        'featured_image': post.metadata.get('featured_image', ''),
-                        'seo_title': post.metadata.get('seo_title', ''),
-                        'seo_description': post.metadata.get('seo_description', ''),
-                        'revision_history': post.metadata.get('revision_history', [])
-                    }
-                }
+                        entry = Content(
+                            id=post.metadata.get('id', md_file.stem),
+                            title=post.metadata.get('title', md_file.stem.replace('-', ' ').title()),
+                            type='blog',
+                            public=public,
+                            created_date=post.metadata.get('created_date', datetime.now().isoformat()),
+                            last_edited_date=post.metadata.get('last_edited_date', file_modified_date(md_file)),
+                            content=strip_html_comments(post.content),
+                            metadata={
+                                'file_path': str(md_file),
+                                'aliases': post.metadata.get('aliases', []),
+                                'tags': post.metadata.get('tags', []),
+                                'author': post.metadata.get('author', ''),
+                                'status': post.metadata.get('status', 'draft'),
+                                'reading_time_minutes': post.metadata.get('reading_time_minutes'),
+                                'excerpt': post.metadata.get('excerpt', ''),
+                                'featured_image': post.metadata.get('featured_image', ''),
+                                'seo_title': post.metadata.get('seo_title', ''),
+                                'seo_description': post.metadata.get('seo_description', ''),
+                                'revision_history': post.metadata.get('revision_history', [])
+                            },
+                        )
                 
-                self.db_manager.insert_content(content_data)
-                print(f"Processed blog post: {content_data['title']}")
+                        self.db_manager.insert_content(entry)
+                        print(f"Processed blog post: {entry.title}")
                 
-            except Exception as e:
-                print(f"Error processing {md_file}: {e}")
+                except Exception as e:
+                    print(f"Error processing {md_file}: {e}")
     
     def extract_content_sections(self, content):
         sections = {}
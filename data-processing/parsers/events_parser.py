@@ -2,26 +2,37 @@ import os
 import yaml
 from pathlib import Path
 from datetime import datetime
+from database.records import Event
+from .vault_index import VaultIndex
 
 class EventsParser:
-    def __init__(self, config):
+    def __init__(self, config, db_manager, vault_index=None):
         self.config = config
+        self.db_manager = db_manager
+        self.vault_index = vault_index or VaultIndex()
         self.events_dir = config.get_directory_path('events')
     
     def parse_events(self):
+        """Store the events of every new or changed event file and return them."""
         events = []
         
-        if not self.events_dir.exists():
+        if not self.vault_index.exists(self.events_dir):
             print(f"Events directory not found: {self.events_dir}")
             return events
         
-        for file_path in self.events_dir.glob("*.md"):
-            try:
-                event_data = self._parse_event_file(file_path)
-                if event_data:
-                    events.append(event_data)
-            except Exception as e:
-                print(f"Error parsing event file {file_path}: {e}")
+        with self.db_manager.scan('events', self.vault_index):
+            for file_path in self.vault_index.files(self.events_dir, "*.md"):
+                try:
+                    with self.db_manager.source(file_path) as source:
+                        if source.unchanged:
+                            continue
+
+                        event_data = self._parse_event_file(file_path)
+                        if event_data:
+                            self.db_manager.insert_event(event_data)
+                            events.append(event_data)
+                except Exception as e:
+                    print(f"Error parsing event file {file_path}: {e}")
         
         return events
     
@@ -42,24 +53,22 @@ class EventsParser:
         if not frontmatter.get('public', False):
             return None
         
-        event_data = {
-            'id': frontmatter.get('id', file_path.stem),
-            'title': frontmatter.get('title', ''),
-            'location': frontmatter.get('location', ''),
-            'start_date': frontmatter.get('start_date', ''),
-            'end_date': frontmatter.get('end_date', ''),
-            'latitude': frontmatter.get('latitude'),
-            'longitude': frontmatter.get('longitude'),
-            'event_type': frontmatter.get('event_type', ''),
-            'tags': frontmatter.get('tags', []),
-            'public': frontmatter.get('public', False),
-            'content': body,
-            'created_date': frontmatter.get('created_date', ''),
-            'last_edited_date': frontmatter.get('last_edited_date', ''),
-            'metadata': {
+        return Event(
+            id=frontmatter.get('id', file_path.stem),
+            title=frontmatter.get('title', ''),
+            location=frontmatter.get('location', ''),
+            start_date=frontmatter.get('start_date', ''),
+            end_date=frontmatter.get('end_date', ''),
+            latitude=frontmatter.get('latitude'),
+            longitude=frontmatter.get('longitude'),
+            event_type=frontmatter.get('event_type', ''),
+            tags=frontmatter.get('tags', []),
+            public=frontmatter.get('public', False),
+            content=body,
+            created_date=frontmatter.get('created_date', ''),
+            last_edited_date=frontmatter.get('last_edited_date', ''),
+            metadata={
                 'file_path': str(file_path),
                 'file_name': file_path.name
-            }
-        }
-        
-        return event_data
+            },
+        )
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import os
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import frontmatter
+
+# Directories smaller than this are read in-process; starting workers costs
+# more than it saves
+MIN_PARALLEL_FILES = 64
+
+# Worker processes, and how many files each may have queued at once
+WORKERS = min(8, os.cpu_count() or 1)
+IN_FLIGHT_PER_WORKER = 4
+
+# Fresh interpreters, so workers never inherit the build's SQLite connection
+START_METHOD = 'spawn'
+
+
+def load_post(path):
+    """
+    Read a markdown file and parse its frontmatter.
+
+    Args:
+        path: Path to the markdown file
+
+    Returns:
+        frontmatter.Post with the file's metadata and content
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return frontmatter.load(f)
+
+
+def _done(function, item):
+    future = Future()
+    try:
+        future.set_result(function(item))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def map_files(function, items, skip=None):
+    """
+    Run function over items on a process pool, yielding results in input order.
+
+    At most WORKERS * IN_FLIGHT_PER_WORKER items are submitted ahead of the
+    one being consumed, so a large directory never piles up parsed files in
+    memory. Fewer than MIN_PARALLEL_FILES items are run in-process instead.
+
+    Args:
+        function: Picklable top-level function taking one item, e.g. load_post
+        items: Iterable of picklable items, usually file paths
+        skip: Optional predicate; items it accepts are not run at all (e.g.
+            files the manifest already reports unchanged)
+
+    Yields:
+        (item, future) pairs in the order of items. future.result() returns
+        function's result or raises its exception; future is None for
+        skipped items.
+    """
+    items = list(items)
+    skipped = [bool(skip and skip(item)) for item in items]
+    wanted = [item for item, skip_item in zip(items, skipped) if not skip_item]
+
+    if len(wanted) < MIN_PARALLEL_FILES or WORKERS < 2:
+        for item, skip_item in zip(items, skipped):
+            yield item, None if skip_item else _done(function, item)
+        return
+
+    context = multiprocessing.get_context(START_METHOD)
+    with ProcessPoolExecutor(max_workers=WORKERS, mp_context=context) as pool:
+        # Futures in submission order, topped up as the caller consumes them
+        in_flight = deque(
+            pool.submit(function, item) for item in wanted[:WORKERS * IN_FLIGHT_PER_WORKER]
+        )
+        submitted = len(in_flight)
+        for item, skip_item in zip(items, skipped):
+            if skip_item:
+                yield item, None
+                continue
+            future = in_flight.popleft()
+            if submitted < len(wanted):
+                in_flight.append(pool.submit(function, wanted[submitted]))
+                submitted += 1
+            yield item, future
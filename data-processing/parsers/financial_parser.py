@@ -2,29 +2,37 @@ import frontmatter
 import re
 from pathlib import Path
 from datetime import datetime
+from database.records import FinancialEntry
+from .vault_index import VaultIndex
 
 class FinancialParser:
-    def __init__(self, db_manager, start_date=None, logger=None):
+    def __init__(self, db_manager, start_date=None, logger=None, vault_index=None):
         self.db_manager = db_manager
         self.start_date = start_date
         self.logger = logger
+        self.vault_index = vault_index or VaultIndex()
     
     def parse_financial_files(self, financial_dir):
         financial_path = Path(financial_dir)
         
-        for md_file in financial_path.glob("*.md"):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    post = frontmatter.load(f)
+        with self.db_manager.scan('financial', self.vault_index):
+            for md_file in self.vault_index.files(financial_path, "*.md"):
+                try:
+                    with self.db_manager.source(md_file) as source:
+                        if source.unchanged:
+                            continue
+                    
+                        with open(md_file, 'r', encoding='utf-8') as f:
+                            post = frontmatter.load(f)
                 
-                if self._should_skip_file(post.metadata, md_file.name):
-                    continue
+                        if self._should_skip_file(post.metadata, md_file.name):
+                            continue
                 
-                self.extract_budget_data(post.content, post.metadata)
-                print(f"Processed financial file: {md_file.name}")
+                        self.extract_budget_data(post.content, post.metadata)
+                        print(f"Processed financial file: {md_file.name}")
                 
-            except Exception as e:
-                print(f"Error processing {md_file}: {e}")
+                except Exception as e:
+                    print(f"Error processing {md_file}: {e}")
     
     def extract_budget_data(self, content, metadata):
         lines = content.split('\n')
@@ -47,20 +55,20 @@ class FinancialParser:
                     try:
                         amount = float(amount_str)
                         
-                        financial_data = {
-                            'id': f"{month}_{current_section.lower().replace(' ', '_')}_{item_name.lower().replace(' ', '_')}",
-                            'month': month,
-                            'category': current_section,
-                            'subcategory': item_name,
-                            'amount': amount,
-                            'type': self.categorize_financial_type(current_section),
-                            'created_date': metadata.get('created_date', datetime.now().isoformat()),
-                            'metadata': {
+                        entry = FinancialEntry(
+                            id=f"{month}_{current_section.lower().replace(' ', '_')}_{item_name.lower().replace(' ', '_')}",
+                            month=month,
+                            category=current_section,
+                            subcategory=item_name,
+                            amount=amount,
+                            type=self.categorize_financial_type(current_section),
+                            created_date=metadata.get('created_date', datetime.now().isoformat()),
+                            metadata={
                                 'source_file': metadata.get('id', 'unknown')
-                            }
-                        }
+                            },
+                        )
                         
-                        self.db_manager.insert_financial_data(financial_data)
+                        self.db_manager.buffer_insert('financial_data', entry)
                         
                     except ValueError:
                         continue
@@ -83,26 +91,12 @@ class FinancialParser:
             return 'other'
     
     def calculate_financial_summary(self, month):
-        financial_data = self.db_manager.get_financial_data(month)
-        
-        summary = {
-            'total_income': 0,
-            'total_expenses': 0,
-            'total_savings': 0,
-            'net_worth_change': 0
-        }
-        
-        for item in financial_data:
-            if item['type'] == 'income':
-                summary['total_income'] += item['amount']
-            elif item['type'] == 'expense':
-                summary['total_expenses'] += item['amount']
-            elif item['type'] == 'savings':
-                summary['total_savings'] += item['amount']
-        
-        summary['net_worth_change'] = summary['total_income'] - summary['total_expenses']
-        
-        return summary
+        summaries = self.db_manager.financial_summary(month)
+        if not summaries:
+            return {'total_income': 0, 'total_expenses': 0, 'total_savings': 0, 'net_worth_change': 0}
+
+        summary = summaries[0]
+        return {key: summary[key] for key in ('total_income', 'total_expenses', 'total_savings', 'net_worth_change')}
     
     def _should_skip_file(self, metadata, filename):
         """Check if file should be skipped based on start_date filter"""
@@ -1,30 +1,40 @@
-import frontmatter
 import re
 from pathlib import Path
 from datetime import datetime
+from database.records import Habit
+from .file_map import load_post, map_files
+from .vault_index import VaultIndex
 
 class HabitsParser:
-    def __init__(self, db_manager, start_date=None, logger=None):
+    def __init__(self, db_manager, start_date=None, logger=None, vault_index=None):
         self.db_manager = db_manager
         self.start_date = start_date
         self.logger = logger
+        self.vault_index = vault_index or VaultIndex()
     
     def parse_dailies_files(self, dailies_dir):
         dailies_path = Path(dailies_dir)
         
-        for md_file in dailies_path.glob("*.md"):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    post = frontmatter.load(f)
+        with self.db_manager.scan('habits', self.vault_index):
+            # Files are read and parsed ahead on a worker pool, in directory order
+            for md_file, loaded in map_files(
+                load_post, self.vault_index.files(dailies_path, "*.md"), skip=self.db_manager.source_unchanged
+            ):
+                try:
+                    with self.db_manager.source(md_file) as source:
+                        if source.unchanged:
+                            continue
+                    
+                        post = loaded.result() if loaded is not None else load_post(md_file)
                 
-                if self._should_skip_file(post.metadata, md_file.stem):
-                    continue
+                        if self._should_skip_file(post.metadata, md_file.stem):
+                            continue
                 
-                self.extract_daily_habits(post.content, post.metadata, md_file.stem)
-                print(f"Processed daily file: {md_file.name}")
+                        self.extract_daily_habits(post.content, post.metadata, md_file.stem)
+                        print(f"Processed daily file: {md_file.name}")
                 
-            except Exception as e:
-                print(f"Error processing {md_file}: {e}")
+                except Exception as e:
+                    print(f"Error processing {md_file}: {e}")
     
     def extract_daily_habits(self, content, metadata, date_str):
         lines = content.split('\n')
@@ -54,38 +64,20 @@ class HabitsParser:
                         if duration_match:
                             duration = int(duration_match.group(1))
                     
-                    habit_data = {
-                        'id': f"{date_str}_{habit_name.lower().replace(' ', '_').replace(',', '').replace('.', '')}",
-                        'date': date_str,
-                        'habit_name': habit_name,
-                        'completed': completed,
-                        'duration': duration,
-                        'notes': duration_str if duration_str else '',
-                        'created_date': metadata.get('created_date', datetime.now().isoformat())
-                    }
+                    habit = Habit(
+                        id=f"{date_str}_{habit_name.lower().replace(' ', '_').replace(',', '').replace('.', '')}",
+                        date=date_str,
+                        habit_name=habit_name,
+                        completed=completed,
+                        duration=duration,
+                        notes=duration_str if duration_str else '',
+                        created_date=metadata.get('created_date', datetime.now().isoformat()),
+                    )
                     
-                    self.db_manager.insert_habit(habit_data)
+                    self.db_manager.buffer_insert('habits', habit)
     
     def calculate_habit_streaks(self, habit_name):
-        habits = self.db_manager.get_habits()
-        habit_records = [h for h in habits if h['habit_name'] == habit_name]
-        habit_records.sort(key=lambda x: x['date'])
-        
-        current_streak = 0
-        max_streak = 0
-        
-        for record in habit_records:
-            if record['completed']:
-                current_streak += 1
-                max_streak = max(max_streak, current_streak)
-            else:
-                current_streak = 0
-        
-        return {
-            'current_streak': current_streak,
-            'max_streak': max_streak,
-            'completion_rate': len([r for r in habit_records if r['completed']]) / len(habit_records) if habit_records else 0
-        }
+        return self.db_manager.habit_streaks(habit_name)
     
     def _should_skip_file(self, metadata, date_str):
         """Check if file should be skipped based on start_date filter"""
@@ -3,20 +3,22 @@ import re
 from pathlib import Path
 from datetime import datetime
 from .utils import strip_html_comments
+from .vault_index import VaultIndex
 
 
 class IdeasParser:
     """Parser for the ideas.md file that contains a numbered list of project ideas"""
     
-    def __init__(self, db_manager, logger=None):
+    def __init__(self, db_manager, logger=None, vault_index=None):
         self.db_manager = db_manager
         self.logger = logger
+        self.vault_index = vault_index or VaultIndex()
     
     def parse_ideas_file(self, ideas_file_path):
         """Parse the ideas markdown file and extract individual ideas from the numbered list"""
         ideas_path = Path(ideas_file_path)
         
-        if not ideas_path.exists():
+        if not self.vault_index.exists(ideas_path):
             print(f"Ideas file not found at {ideas_path}")
             if self.logger:
                 self.logger.warning(f"Ideas file not found at {ideas_path}")
@@ -2,31 +2,43 @@ import frontmatter
 import re
 from pathlib import Path
 from datetime import datetime
+from database.records import Metric
+from .vault_index import VaultIndex
+from .utils import file_modified_date, date_string
 
 class MetricsParser:
-    def __init__(self, db_manager, start_date=None, logger=None):
+    def __init__(self, db_manager, start_date=None, logger=None, vault_index=None):
         self.db_manager = db_manager
         self.start_date = start_date
         self.logger = logger
+        self.vault_index = vault_index or VaultIndex()
     
     def parse_metrics_files(self, metrics_dir):
         metrics_path = Path(metrics_dir)
         
-        for md_file in metrics_path.glob("*.md"):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    post = frontmatter.load(f)
+        with self.db_manager.scan('metrics', self.vault_index):
+            for md_file in self.vault_index.files(metrics_path, "*.md"):
+                try:
+                    with self.db_manager.source(md_file) as source:
+                        if source.unchanged:
+                            continue
+                    
+                        with open(md_file, 'r', encoding='utf-8') as f:
+                            post = frontmatter.load(f)
                 
-                if self._should_skip_file(post.metadata, md_file.name):
-                    continue
+                        if self._should_skip_file(post.metadata, md_file.name):
+                            continue
                 
-                self.extract_physiological_metrics(post.content, post.metadata)
-                print(f"Processed metrics file: {md_file.name}")
+                        # Current values are as of the file's last edit, so an
+                        # untouched file parses to the same rows on every run
+                        edited = post.metadata.get('last_edited_date') or file_modified_date(md_file)
+                        self.extract_physiological_metrics(post.content, post.metadata, date_string(edited))
+                        print(f"Processed metrics file: {md_file.name}")
                 
-            except Exception as e:
-                print(f"Error processing {md_file}: {e}")
+                except Exception as e:
+                    print(f"Error processing {md_file}: {e}")
     
-    def extract_physiological_metrics(self, content, metadata):
+    def extract_physiological_metrics(self, content, metadata, file_date):
         lines = content.split('\n')
         current_section = None
         
@@ -38,9 +50,9 @@ class MetricsParser:
                 continue
             
             if current_section and line.startswith('- '):
-                self.parse_metric_line(line, current_section, metadata)
+                self.parse_metric_line(line, current_section, metadata, file_date)
     
-    def parse_metric_line(self, line, section, metadata):
+    def parse_metric_line(self, line, section, metadata, file_date):
         date_value_patterns = [
             r'- (\d{4}-\d{2}-\d{2}): ([\d.]+) hours?, (\d+)% quality',
             r'- (\d{4}-\d{2}-\d{2}): ([\d.]+) hours?',
@@ -56,32 +68,32 @@ class MetricsParser:
                     value = float(match.group(2))
                     unit = 'hours' if 'hours' in line else ''
                     
-                    metric_data = {
-                        'id': f"{date}_{section.lower().replace(' ', '_')}",
-                        'date': date,
-                        'metric_type': 'physiological',
-                        'metric_name': section,
-                        'value': value,
-                        'unit': unit,
-                        'metadata': {'section': section},
-                        'created_date': metadata.get('created_date', datetime.now().isoformat())
-                    }
+                    metric = Metric(
+                        id=f"{date}_{section.lower().replace(' ', '_')}",
+                        date=date,
+                        metric_type='physiological',
+                        metric_name=section,
+                        value=value,
+                        unit=unit,
+                        metadata={'section': section},
+                        created_date=metadata.get('created_date', file_date),
+                    )
                     
-                    self.db_manager.insert_metric(metric_data)
+                    self.db_manager.buffer_insert('metrics', metric)
                     
                     if len(match.groups()) > 2 and match.group(3):
                         quality_value = float(match.group(3))
-                        quality_metric = {
-                            'id': f"{date}_{section.lower().replace(' ', '_')}_quality",
-                            'date': date,
-                            'metric_type': 'physiological',
-                            'metric_name': f"{section} Quality",
-                            'value': quality_value,
-                            'unit': '%',
-                            'metadata': {'section': section, 'type': 'quality'},
-                            'created_date': metadata.get('created_date', datetime.now().isoformat())
-                        }
-                        self.db_manager.insert_metric(quality_metric)
+                        quality_metric = Metric(
+                            id=f"{date}_{section.lower().replace(' ', '_')}_quality",
+                            date=date,
+                            metric_type='physiological',
+                            metric_name=f"{section} Quality",
+                            value=quality_value,
+                            unit='%',
+                            metadata={'section': section, 'type': 'quality'},
+                            created_date=metadata.get('created_date', file_date),
+                        )
+                        self.db_manager.buffer_insert('metrics', quality_metric)
                 
                 else:
                     metric_name = match.group(1).strip()
@@ -91,18 +103,18 @@ class MetricsParser:
                     try:
                         value = float(value_str)
                         
-                        metric_data = {
-                            'id': f"current_{metric_name.lower().replace(' ', '_')}",
-                            'date': datetime.now().strftime('%Y-%m-%d'),
-                            'metric_type': 'physiological',
-                            'metric_name': metric_name,
-                            'value': value,
-                            'unit': unit,
-                            'metadata': {'section': section, 'type': 'current'},
-                            'created_date': metadata.get('created_date', datetime.now().isoformat())
-                        }
+                        metric = Metric(
+                            id=f"current_{metric_name.lower().replace(' ', '_')}",
+                            date=file_date,
+                            metric_type='physiological',
+                            metric_name=metric_name,
+                            value=value,
+                            unit=unit,
+                            metadata={'section': section, 'type': 'current'},
+                            created_date=metadata.get('created_date', file_date),
+                        )
                         
-                        self.db_manager.insert_metric(metric_data)
+                        self.db_manager.buffer_insert('metrics', metric)
                         
                     except ValueError:
                         continue
@@ -110,25 +122,7 @@ class MetricsParser:
                 break
     
     def calculate_metric_trends(self, metric_name, days=7):
-        metrics = self.db_manager.get_metrics(limit=days*2)
-        relevant_metrics = [m for m in metrics if m['metric_name'] == metric_name]
-        relevant_metrics.sort(key=lambda x: x['date'])
-        
-        if len(relevant_metrics) < 2:
-            return {'trend': 'insufficient_data', 'change': 0}
-        
-        recent_avg = sum(m['value'] for m in relevant_metrics[-days:]) / min(len(relevant_metrics), days)
-        older_avg = sum(m['value'] for m in relevant_metrics[:-days]) / max(1, len(relevant_metrics) - days)
-        
-        change = recent_avg - older_avg
-        trend = 'improving' if change > 0 else 'declining' if change < 0 else 'stable'
-        
-        return {
-            'trend': trend,
-            'change': change,
-            'recent_average': recent_avg,
-            'previous_average': older_avg
-        }
+        return self.db_manager.metric_trends(metric_name, days)
     
     def _should_skip_file(self, metadata, filename):
         """Check if file should be skipped based on start_date filter"""
@@ -3,35 +3,50 @@ import re
 from pathlib import Path
 from datetime import datetime
 import hashlib
-from .utils import strip_html_comments
+from database.records import Principle
+from .utils import strip_html_comments, file_modified_date
+from .vault_index import VaultIndex
 
 def generate_principle_id(title, level, parent_id='root'):
     return hashlib.md5(f"{parent_id}-{title}-{level}".encode()).hexdigest()
 
 class PrinciplesParser:
-    def __init__(self, db_manager, start_date=None, logger=None):
+    def __init__(self, db_manager, start_date=None, logger=None, vault_index=None):
         self.db_manager = db_manager
         self.start_date = start_date
         self.logger = logger
+        self.vault_index = vault_index or VaultIndex()
 
     def parse_principles_files(self, principles_dir):
-        self.db_manager.clear_principles()
-        principles_path = Path(principles_dir)
+        with self.db_manager.scan('principles', self.vault_index):
+            principles_path = Path(principles_dir)
+            stored_ids = []
 
-        for md_file in principles_path.glob("*.md"):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    post = frontmatter.load(f)
+            for md_file in self.vault_index.files(principles_path, "*.md"):
+                try:
+                    with self.db_manager.source(md_file) as source:
+                        if source.unchanged:
+                            # Keep the principles of files that were not parsed again
+                            stored_ids.extend(row_id for _, row_id in source.previous)
+                            continue
 
-                if self._should_skip_file(post.metadata, md_file.name):
-                    continue
+                        with open(md_file, 'r', encoding='utf-8') as f:
+                            post = frontmatter.load(f)
 
-                self._parse_and_store_principles(post)
+                        if self._should_skip_file(post.metadata, md_file.name):
+                            continue
 
-            except Exception as e:
-                print(f"Error processing {md_file}: {e}")
+                        stored_ids.extend(
+                            self._parse_and_store_principles(post, file_modified_date(md_file))
+                        )
 
-    def _parse_and_store_principles(self, post):
+                except Exception as e:
+                    print(f"Error processing {md_file}: {e}")
+
+            # Remove principles that no longer appear in any file
+            self.db_manager.delete_missing('principles', stored_ids)
+
+    def _parse_and_store_principles(self, post, modified_date):
         lines = post.content.split('\n')
         principles = []
         current_principle = None
@@ -49,7 +64,7 @@ class PrinciplesParser:
                     'level': level,
                     'content': '',
                     'created_date': post.metadata.get('created_date', datetime.now().isoformat()),
-                    'last_edited_date': post.metadata.get('last_edited_date', datetime.now().isoformat()),
+                    'last_edited_date': post.metadata.get('last_edited_date', modified_date),
                 }
             elif current_principle:
                 current_principle['content'] += line + '\n'
@@ -58,6 +73,7 @@ class PrinciplesParser:
             principles.append(current_principle)
 
         parent_stack = []
+        stored_ids = []
         for p in principles:
             if p['title'].lower() == 'principles':
                 continue
@@ -70,9 +86,12 @@ class PrinciplesParser:
             p['id'] = generate_principle_id(p['title'], p['level'], parent_id)
             p['content'] = strip_html_comments(p['content'].strip())
             
-            self.db_manager.insert_principle(p)
+            self.db_manager.insert_principle(Principle(**p))
+            stored_ids.append(p['id'])
             parent_stack.append(p)
 
+        return stored_ids
+
     def _should_skip_file(self, metadata, filename):
         """Check if file should be skipped based on start_date filter"""
         if not self.start_date:
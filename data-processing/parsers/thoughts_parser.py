@@ -1,21 +1,23 @@
-import frontmatter
 import re
-import json
 from pathlib import Path
 from datetime import datetime
-from .utils import strip_html_comments
+from database.records import Thought
+from .file_map import load_post, map_files
+from .utils import strip_html_comments, file_modified_date
+from .vault_index import VaultIndex
 
 
 class ThoughtsParser:
-    def __init__(self, db_manager, start_date=None, logger=None):
+    def __init__(self, db_manager, start_date=None, logger=None, vault_index=None):
         self.db_manager = db_manager
         self.start_date = start_date
         self.logger = logger
+        self.vault_index = vault_index or VaultIndex()
 
     def parse_thoughts_files(self, thoughts_dir):
         thoughts_path = Path(thoughts_dir)
 
-        if not thoughts_path.exists():
+        if not self.vault_index.exists(thoughts_path):
             print(f"Thoughts directory not found: {thoughts_path}")
             return
 
@@ -23,62 +25,77 @@ class ThoughtsParser:
             r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d+\+\d{2}:\d{2}\.md$"
         )
 
-        for md_file in thoughts_path.glob("*.md"):
-            if not pattern.match(md_file.name):
-                print(f"Skipping file with invalid pattern: {md_file.name}")
-                continue
-
-            try:
-                with open(md_file, "r", encoding="utf-8") as f:
-                    post = frontmatter.load(f)
-
-                if not post.metadata.get("capture_id"):
-                    print(f"Skipping file without capture_id: {md_file.name}")
-                    continue
-
-                tags = post.metadata.get("tags", [])
-                if "public" not in tags:
-                    print(f"Skipping private thought: {md_file.name}")
+        with self.db_manager.scan("thoughts", self.vault_index):
+            md_files = []
+            for md_file in self.vault_index.files(thoughts_path, "*.md"):
+                if not pattern.match(md_file.name):
+                    print(f"Skipping file with invalid pattern: {md_file.name}")
                     continue
-
-                if self._should_skip_file(post.metadata, md_file.name):
-                    continue
-
-                content = post.content
-                header = "## Content\n"
-                if content.startswith(header):
-                    content = content[len(header) :]
-
-                thought_data = {
-                    "id": post.metadata.get("id", md_file.stem),
-                    "capture_id": post.metadata.get("capture_id"),
-                    "timestamp": post.metadata.get("timestamp"),
-                    "content": strip_html_comments(content.strip()),
-                    "modalities": post.metadata.get("modalities", []),
-                    "context": post.metadata.get("context", []),
-                    "sources": post.metadata.get("sources", []),
-                    "tags": tags,
-                    "location": post.metadata.get("location", {}),
-                    "processing_status": post.metadata.get("processing_status", "raw"),
-                    "created_date": post.metadata.get(
-                        "created_date", datetime.now().isoformat()
-                    ),
-                    "last_edited_date": post.metadata.get(
-                        "last_edited_date", datetime.now().isoformat()
-                    ),
-                    "metadata": self._serialize_metadata(
-                        {
-                            "file_path": str(md_file),
-                            "aliases": post.metadata.get("aliases", []),
-                        }
-                    ),
-                }
-
-                self.db_manager.insert_thought(thought_data)
-                print(f"Processed thought: {thought_data['capture_id']}")
-
-            except Exception as e:
-                print(f"Error processing {md_file}: {e}")
+                md_files.append(md_file)
+
+            # Files are read and parsed ahead on a worker pool, in directory order
+            for md_file, loaded in map_files(
+                load_post, md_files, skip=self.db_manager.source_unchanged
+            ):
+                try:
+                    with self.db_manager.source(md_file) as source:
+                        if source.unchanged:
+                            continue
+
+                        post = loaded.result() if loaded is not None else load_post(md_file)
+
+                        if not post.metadata.get("capture_id"):
+                            print(f"Skipping file without capture_id: {md_file.name}")
+                            continue
+
+                        tags = post.metadata.get("tags", [])
+                        if "public" not in tags:
+                            print(f"Skipping private thought: {md_file.name}")
+                            continue
+
+                        if self._should_skip_file(post.metadata, md_file.name):
+                            continue
+
+                        content = post.content
+                        header = "## Content\n"
+                        if content.startswith(header):
+                            content = content[len(header) :]
+
+                        location = post.metadata.get("location", {})
+                        thought = Thought(
+                            id=post.metadata.get("id", md_file.stem),
+                            capture_id=post.metadata.get("capture_id"),
+                            timestamp=post.metadata.get("timestamp"),
+                            content=strip_html_comments(content.strip()),
+                            modalities=post.metadata.get("modalities", []),
+                            context=post.metadata.get("context", []),
+                            sources=post.metadata.get("sources", []),
+                            tags=tags,
+                            location_latitude=location.get("latitude"),
+                            location_longitude=location.get("longitude"),
+                            location_city=location.get("city"),
+                            location_country=location.get("country"),
+                            location_timezone=location.get("timezone"),
+                            processing_status=post.metadata.get("processing_status", "raw"),
+                            created_date=post.metadata.get(
+                                "created_date", datetime.now().isoformat()
+                            ),
+                            last_edited_date=post.metadata.get(
+                                "last_edited_date", file_modified_date(md_file)
+                            ),
+                            metadata=self._serialize_metadata(
+                                {
+                                    "file_path": str(md_file),
+                                    "aliases": post.metadata.get("aliases", []),
+                                }
+                            ),
+                        )
+
+                        self.db_manager.buffer_insert('thoughts', thought)
+                        print(f"Processed thought: {thought.capture_id}")
+
+                except Exception as e:
+                    print(f"Error processing {md_file}: {e}")
 
     def _should_skip_file(self, metadata, filename):
         """Check if file should be skipped based on start_date filter"""
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 
 import re
+from datetime import datetime
+from pathlib import Path
 
 
 def strip_html_comments(content):
@@ -25,3 +27,37 @@ def strip_html_comments(content):
     cleaned = re.sub(r'<!--.*?-->', '', content, flags=re.DOTALL)
     
     return cleaned
+
+
+def file_modified_date(path):
+    """
+    Return a file's modification time as an ISO timestamp.
+    
+    Used as the fallback for last_edited_date when frontmatter has none, so
+    an untouched file parses to the same row on every run.
+    
+    Args:
+        path: Path to the file or directory
+        
+    Returns:
+        ISO 8601 string of the last modification time
+    """
+    return datetime.fromtimestamp(Path(path).stat().st_mtime).isoformat()
+
+
+def date_string(value):
+    """
+    Return a frontmatter date as a YYYY-MM-DD string.
+    
+    YAML turns unquoted dates into date or datetime objects, which cannot be
+    stored in JSON metadata; strings are passed through trimmed to the day.
+    
+    Args:
+        value: date, datetime or string
+        
+    Returns:
+        ISO 8601 date string
+    """
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()[:10]
+    return str(value).strip()[:10]
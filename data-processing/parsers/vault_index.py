@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+import os
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+
+class Entry(NamedTuple):
+    path: Path
+    # Vault directory key (see config.yaml) the entry was listed under
+    key: Optional[str]
+    is_dir: bool
+    extension: str
+    stat: os.stat_result
+
+
+class VaultIndex:
+    """
+    In-memory listing of the vault, built with one os.scandir pass per run.
+
+    build() lists every configured vault directory and its immediate
+    subdirectories (book and project folders), and main.py hands the result
+    to every parser, so they query it instead of globbing and statting the
+    same directories again. A directory outside the index is listed on first
+    use and cached.
+    """
+
+    def __init__(self):
+        # directory -> {name: Entry} in directory order, or None when missing
+        self._listings = {}
+
+    @classmethod
+    def build(cls, config):
+        """
+        List the configured vault directories.
+
+        Args:
+            config: Config whose vault.directories are indexed
+
+        Returns:
+            VaultIndex of each directory and its subdirectories
+        """
+        index = cls()
+        for key in config.data['vault']['directories']:
+            for entry in index._list(config.get_directory_path(key), key).values():
+                if entry.is_dir:
+                    index._list(entry.path, key)
+        return index
+
+    def _list(self, directory, key=None):
+        directory = str(Path(directory))
+        if directory in self._listings:
+            return self._listings[directory] or {}
+
+        listing = {}
+        try:
+            with os.scandir(directory) as entries:
+                for dir_entry in entries:
+                    try:
+                        listing[dir_entry.name] = Entry(
+                            path=Path(dir_entry.path),
+                            key=key,
+                            is_dir=dir_entry.is_dir(),
+                            extension=os.path.splitext(dir_entry.name)[1],
+                            stat=dir_entry.stat(),
+                        )
+                    except OSError:
+                        # A dangling symlink cannot be read either way
+                        continue
+        except (FileNotFoundError, NotADirectoryError):
+            self._listings[directory] = None
+            return {}
+        self._listings[directory] = listing
+        return listing
+
+    def entry(self, path):
+        """
+        Look up one file or directory.
+
+        Args:
+            path: Path inside an indexed directory
+
+        Returns:
+            Entry, or None if path does not exist
+        """
+        path = Path(path)
+        return self._list(path.parent).get(path.name)
+
+    def exists(self, path):
+        directory = str(Path(path))
+        if directory in self._listings:
+            return self._listings[directory] is not None
+        return self.entry(path) is not None
+
+    def files(self, directory, pattern='*'):
+        """
+        Files directly inside directory whose name matches pattern.
+
+        Matches like Path.glob(pattern): in directory order, case-sensitive,
+        and hidden files only when the pattern starts with a dot.
+
+        Args:
+            directory: Directory to list
+            pattern: Shell-style name pattern, e.g. "*.md"
+
+        Returns:
+            List of file Paths
+        """
+        return [
+            entry.path
+            for name, entry in self._list(directory).items()
+            if not entry.is_dir
+            and fnmatchcase(name, pattern)
+            and (pattern.startswith('.') or not name.startswith('.'))
+        ]
+
+    def entries(self, directory):
+        """Entries (files and subdirectories) directly inside directory, in directory order."""
+        return list(self._list(directory).values())
+
+    def subdirs(self, directory):
+        """Subdirectories directly inside directory, in directory order."""
+        return [entry.path for entry in self._list(directory).values() if entry.is_dir]
+
+    def count(self):
+        """Number of entries listed so far."""
+        return sum(len(listing) for listing in self._listings.values() if listing)
@@ -0,0 +1,59 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database.records import Content
+from database.schema import DatabaseManager
+
+
+def _post(post_id, body):
+    return Content(
+        id=post_id,
+        title=post_id.title(),
+        type='blog',
+        public=True,
+        created_date='2025-08-01',
+        last_edited_date='2025-08-01',
+        content=body,
+        metadata={},
+    )
+
+
+def _stock_search(db_path, word):
+    # A connection without body_text() registered, like the sqlite3 shell
+    conn = sqlite3.connect(db_path)
+    try:
+        return [row[0] for row in conn.execute(
+            'SELECT d.source_id FROM search_index JOIN search_documents d ON d.rowid = search_index.rowid '
+            'WHERE search_index MATCH ? ORDER BY d.source_id', (word,)
+        )]
+    finally:
+        conn.close()
+
+
+def test_uncompressed_database_is_writable_with_stock_sqlite(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    DatabaseManager(db_path).insert_content(_post('first', 'walrus notes'))
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE content SET content = 'walrus and narwhal notes' WHERE id = 'first'")
+    conn.execute("INSERT INTO content (id, title, type, public, content) VALUES ('second', 'Second', 'blog', 1, 'narwhal')")
+    conn.execute("INSERT INTO search_index (search_index) VALUES ('integrity-check')")
+    conn.commit()
+    conn.close()
+
+    assert _stock_search(db_path, 'narwhal') == ['first', 'second']
+
+
+def test_compressed_bodies_are_searchable_until_stored_plain_again(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    db = DatabaseManager(db_path, compression='zlib', compression_threshold=16)
+    db.insert_content(_post('long', 'walrus ' * 50))
+
+    assert [result['id'] for result in db.search('walrus')] == ['long']
+
+    plain = DatabaseManager(db_path)
+    assert plain.recompress_bodies() == 1
+    assert _stock_search(db_path, 'walrus') == ['long']
@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from database.records import Content
+from database.schema import DatabaseManager
+
+
+def _post(post_id):
+    return Content(
+        id=post_id,
+        title=post_id.title(),
+        type='blog',
+        public=True,
+        created_date='2025-08-01',
+        last_edited_date='2025-08-01',
+        content=f'{post_id} body',
+        metadata={},
+    )
+
+
+@pytest.mark.parametrize('atomic, kept', [(False, ['a', 'b']), (True, [])])
+def test_failed_session_keeps_only_batches_committed_before_the_error(tmp_path, atomic, kept):
+    db = DatabaseManager(str(tmp_path / 'test.db'), batch_size=1)
+    with pytest.raises(RuntimeError):
+        with db.session(atomic=atomic):
+            db.insert_content(_post('a'))
+            db.insert_content(_post('b'))
+            db.flush()
+            raise RuntimeError('parser failed')
+
+    assert [row['id'] for row in db.get_content()] == kept
@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from database.records import Content
+from database.schema import DatabaseManager
+
+
+def _post(body):
+    return Content(
+        id='post',
+        title='Post',
+        type='blog',
+        public=True,
+        created_date='2025-08-01',
+        last_edited_date='2025-08-01',
+        content=body,
+        metadata={'tags': ['Python', '#sqlite']},
+    )
+
+
+@pytest.mark.parametrize('write_mode', ['upsert', 'replace'])
+def test_rewriting_a_changed_tagged_row_keeps_its_tags(tmp_path, write_mode):
+    db = DatabaseManager(str(tmp_path / 'test.db'), write_mode=write_mode)
+    db.insert_content(_post('first'))
+    db.insert_content(_post('second'))
+    db.insert_content(_post('third'))
+
+    assert [row['entity_id'] for row in db.get_tagged('python')] == ['post']
+    assert {row['tag']: row['count'] for row in db.tag_counts()} == {'python': 1, 'sqlite': 1}
+    with db._connection() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM tags').fetchone()[0] == 2
@@ -0,0 +1,224 @@
+"""Watch the vault directories for edits.
+
+open_watcher() returns an InotifyWatcher on Linux and a PollingWatcher
+anywhere inotify is unavailable. Both watch the given directories (the
+configured vault directories, plus the folders of the files the export reads
+directly) and their immediate subdirectories (book and project folders), the
+same depth VaultIndex lists, and report changed paths through
+wait_for_changes(), which waits out a burst of edits before returning. A
+directory that does not exist yet is reported once it is created.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+
+from parsers.vault_index import VaultIndex
+
+# Quiet time that ends a burst of edits (an editor's save is often several events)
+DEBOUNCE_SECONDS = 0.2
+
+# How often the polling fallback lists the vault again
+POLL_SECONDS = 0.5
+
+# inotify(7) event bits
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+_EVENT = struct.Struct('iIII')
+
+
+def vault_directories(config):
+    """{directory key: path} for every configured vault directory."""
+    return {key: config.get_directory_path(key) for key in config.data['vault']['directories']}
+
+
+class InotifyWatcher:
+    """Watches the vault directories through the kernel's inotify API."""
+
+    kind = 'inotify'
+
+    def __init__(self, directories):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        # Missing on systems without inotify; open_watcher() falls back to polling
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._roots = [Path(directory) for directory in directories]
+        # watch descriptor -> watched directory
+        self._watches = {}
+        # Roots that do not exist (yet), and watch descriptor -> the nearest
+        # existing parent of one, whose events only serve to spot it appearing
+        self._pending = set()
+        self._parents = {}
+        for root in self._roots:
+            self._add_root(root)
+
+    def _watch(self, directory, watches=None):
+        wd = self._add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            return False
+        (self._watches if watches is None else watches)[wd] = directory
+        return True
+
+    def _add_root(self, root):
+        """Watch root and its subdirectories, or its nearest existing parent until it exists."""
+        if self._watch(root):
+            self._pending.discard(root)
+            for entry in os.scandir(root):
+                if entry.is_dir():
+                    self._watch(Path(entry.path))
+            return True
+        self._pending.add(root)
+        parent = root.parent
+        while not self._watch(parent, self._parents) and parent != parent.parent:
+            parent = parent.parent
+        return False
+
+    def _add_pending(self):
+        """Watch the pending roots that exist now and return them."""
+        return {root for root in sorted(self._pending) if self._add_root(root)}
+
+    def changes(self, timeout):
+        """Changed paths seen within timeout seconds; empty if there were none."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = set()
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+            offset += _EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped: treat every watched directory as changed
+                changed.update(self._watches.values())
+                changed |= self._add_pending()
+                continue
+            if wd in self._parents:
+                if mask & IN_IGNORED:
+                    # The parent went away: wait on whichever one exists now
+                    del self._parents[wd]
+                    changed |= self._add_pending()
+                elif self._pending and mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    # A missing root, or a folder on the way to one, was created
+                    changed |= self._add_pending()
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._watches[wd]
+                # A removed root is watched for again, like one missing at startup
+                if directory in self._roots:
+                    self._add_root(directory)
+                continue
+            path = directory / os.fsdecode(name) if name else directory
+            changed.add(path)
+            # A new book or project folder is watched like the existing ones
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and directory in self._roots:
+                self._watch(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Lists the vault every POLL_SECONDS and reports what differs."""
+
+    kind = 'polling'
+
+    def __init__(self, directories):
+        self._directories = directories
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self):
+        index = VaultIndex()
+        snapshot = {}
+        for directory in self._directories:
+            for entry in index.entries(directory):
+                snapshot[entry.path] = (entry.stat.st_size, entry.stat.st_mtime_ns)
+                if entry.is_dir:
+                    for child in index.entries(entry.path):
+                        snapshot[child.path] = (child.stat.st_size, child.stat.st_mtime_ns)
+        return snapshot
+
+    def changes(self, timeout):
+        """Changed paths seen within timeout seconds; empty if there were none."""
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self._take_snapshot()
+            changed = {
+                path for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(POLL_SECONDS, remaining))
+
+    def close(self):
+        pass
+
+
+def open_watcher(directories, polling=False):
+    """An InotifyWatcher for directories, or a PollingWatcher if inotify is unavailable."""
+    directories = sorted({Path(directory) for directory in directories})
+    if not polling:
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError, TypeError):
+            pass
+    return PollingWatcher(directories)
+
+
+def wait_for_changes(watcher, debounce=DEBOUNCE_SECONDS):
+    """Block until something changes, then until debounce seconds pass quietly.
+
+    Returns every path changed during the burst.
+    """
+    changed = set()
+    while not changed:
+        changed = watcher.changes(None if watcher.kind == 'inotify' else POLL_SECONDS)
+    while True:
+        more = watcher.changes(debounce)
+        if not more:
+            return changed
+        changed |= more
+
+
+def directory_keys(directories, paths):
+    """The vault directory keys whose files or folders are among paths."""
+    keys = set()
+    for path in paths:
+        path = Path(path)
+        for key, directory in directories.items():
+            directory = Path(directory)
+            if path == directory or directory in path.parents:
+                keys.add(key)
+    return keys
@@ -3,19 +3,21 @@
 
 echo "🔄 Starting complete data reset..."
 
-echo "📁 Removing existing database..."
-rm -f database/website.db
-
-echo "📁 Removing existing JSON data files..."
-rm -f website/data/*.json
-
 echo "📁 Clearing Next.js build cache..."
 rm -rf website/.next
 
 cd data-processing
 
+# --fresh rebuilds from an empty database; the old one is only replaced
+# once the pipeline succeeds, so a failed run leaves the current data intact.
 echo "⚙️  Running data processing pipeline..."
-python main.py --start-date 2025-07-14
+if ! python main.py --fresh --start-date 2025-07-14; then
+    echo "❌ Data processing failed, keeping the existing database and JSON files."
+    exit 1
+fi
+
+echo "📁 Removing existing JSON data files..."
+rm -f ../website/data/*.json
 
 echo "📤 Exporting static data..."
 python export_static_data.py
@@ -6,7 +6,8 @@ import { useHighlightFromHash } from '../lib/useHighlightFromHash'
 interface BlogPost {
   id: string
   title: string
-  content: string
+  excerpt?: string
+  content?: string
   type: string
   created_date: string
   last_edited_date: string
@@ -69,7 +70,7 @@ export default function BlogRenderer({ blog }: BlogRendererProps) {
       <div className="space-y-6">
         {sortedPosts.map((post) => {
           const metadata = getMetadata(post)
-          const excerpt = metadata.excerpt || post.content.substring(0, 200) + '...'
+          const excerpt = metadata.excerpt || (post.excerpt ?? post.content ?? '').substring(0, 200) + '...'
           
           return (
             <LinkableItem key={post.id} id={`blog-${post.id}`}>
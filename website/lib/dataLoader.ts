@@ -39,6 +39,26 @@ export async function loadJsonDataSafe<T = any>(filename: string): Promise<T[]>
   }
 }
 
+/**
+ * Put bodies back on header-only list rows (content.json, blog.json,
+ * books.json, projects.json) from the matching id -> body file, for pages
+ * that show full bodies (a blog post, book notes and project sections,
+ * which expand in place); the blog list uses blog.json's excerpts instead
+ * @param rows - Rows from a list file
+ * @param bodiesFilename - Body file (e.g., 'content_bodies.json')
+ * @returns The rows with their content field filled in; rows that already
+ * carry a body keep it, so older exports still work
+ */
+export async function withBodies<T extends { id: string; content?: string }>(
+  rows: T[],
+  bodiesFilename: string
+): Promise<T[]> {
+  const dataDir = path.join(process.cwd(), 'data')
+  const fileContent = await fs.readFile(path.join(dataDir, bodiesFilename), 'utf8').catch(() => '{}')
+  const bodies: Record<string, string> = JSON.parse(fileContent)
+  return rows.map((row) => ({ ...row, content: bodies[row.id] ?? row.content ?? '' }))
+}
+
 /**
  * Create a standardized getStaticProps function for data loading
  * @param filename - Name of the JSON file to load
@@ -3,6 +3,7 @@ import Head from 'next/head'
 import { promises as fs } from 'fs'
 import path from 'path'
 import Navigation from '@/components/Navigation'
+import { withBodies } from '@/lib/dataLoader'
 import Link from 'next/link'
 import React from 'react'
 
@@ -219,14 +220,16 @@ export const getStaticProps: GetStaticProps = async ({ params }) => {
     const blogData = await fs.readFile(path.join(dataDir, 'blog.json'), 'utf8').catch(() => '[]')
     const blog: BlogPost[] = JSON.parse(blogData)
 
-    const post = blog.find((p) => p.id === params?.id)
+    const header = blog.find((p) => p.id === params?.id)
 
-    if (!post) {
+    if (!header) {
       return {
         notFound: true
       }
     }
 
+    const [post] = await withBodies([header], 'content_bodies.json')
+
     return {
       props: {
         post
@@ -39,6 +39,7 @@ export const getStaticProps: GetStaticProps = async () => {
   try {
     const dataDir = path.join(process.cwd(), 'data')
     const blogData = await fs.readFile(path.join(dataDir, 'blog.json'), 'utf8').catch(() => '[]')
+    // The list shows excerpts, which blog.json carries; bodies stay on the post pages
     const blog = JSON.parse(blogData)
 
     return {
@@ -3,7 +3,7 @@ import { motion } from 'framer-motion';
 import Navigation from '../components/Navigation';
 import BucketListRenderer, { BucketListItem } from '../components/BucketListRenderer';
 import FlowDivider from '../components/FlowDivider';
-import contentData from '../data/content.json';
+import { loadJsonDataSafe, withBodies } from '../lib/dataLoader';
 import { GetStaticProps } from 'next';
 
 // Helper function to parse bucket list items
@@ -102,8 +102,11 @@ const BucketListPage: React.FC<BucketListPageProps> = ({ sortedItems, introConte
 };
 
 export const getStaticProps: GetStaticProps = async () => {
-  const allContent: Content[] = contentData as Content[];
-  const bucketListItemData = allContent.find(item => item.id === 'bucket-list');
+  const allContent = await loadJsonDataSafe<Content>('content.json');
+  const bucketListHeader = allContent.find(item => item.id === 'bucket-list');
+  const [bucketListItemData] = bucketListHeader
+    ? await withBodies([bucketListHeader], 'content_bodies.json')
+    : [];
   
   let intro = '';
   let items: BucketListItem[] = [];
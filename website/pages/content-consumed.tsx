@@ -4,6 +4,7 @@ import { promises as fs } from 'fs'
 import path from 'path'
 import Navigation from '@/components/Navigation'
 import BooksRenderer from '@/components/BooksRenderer'
+import { withBodies } from '@/lib/dataLoader'
 
 interface ContentConsumedProps {
   books: any[]
@@ -45,7 +46,7 @@ export const getStaticProps: GetStaticProps = async () => {
       fs.readFile(path.join(dataDir, 'export_metadata.json'), 'utf8').catch(() => '{"last_updated":""}')
     ])
 
-    const books = JSON.parse(booksData)
+    const books = await withBodies(JSON.parse(booksData), 'content_bodies.json')
     const exportMetadataParsed = JSON.parse(exportMetadata)
 
     const booksWithParsedMetadata = books.map((book: any) => ({
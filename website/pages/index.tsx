@@ -5,6 +5,7 @@ import path from 'path'
 import { useState, useEffect } from 'react'
 import Navigation from '@/components/Navigation'
 import ContentRenderer from '@/components/ContentRenderer'
+import { withBodies } from '@/lib/dataLoader'
 import ForceGraphMesh from '@/components/ForceGraphMesh'
 import FlowDivider from '@/components/FlowDivider'
 import { motion } from 'framer-motion'
@@ -83,7 +84,10 @@ export const getStaticProps: GetStaticProps = async () => {
   try {
     const dataDir = path.join(process.cwd(), 'data')
     const contentData = await fs.readFile(path.join(dataDir, 'content.json'), 'utf8')
-    const content = JSON.parse(contentData)
+    const content = await withBodies(
+      JSON.parse(contentData).filter((c: any) => c.id === 'about-this-site'),
+      'content_bodies.json'
+    )
 
     return {
       props: {
@@ -1,7 +1,7 @@
 import { GetStaticProps } from 'next'
 import PageLayout from '@/components/PageLayout'
 import ProjectsRenderer from '@/components/ProjectsRenderer'
-import { loadJsonDataSafe } from '@/lib/dataLoader'
+import { loadJsonDataSafe, withBodies } from '@/lib/dataLoader'
 
 interface ProjectsProps {
   projects: any[]
@@ -21,7 +21,7 @@ export default function Projects({ projects }: ProjectsProps) {
 }
 
 export const getStaticProps: GetStaticProps = async () => {
-  const projects = await loadJsonDataSafe('projects.json')
+  const projects = await withBodies(await loadJsonDataSafe('projects.json'), 'project_bodies.json')
   return {
     props: { projects }
   }